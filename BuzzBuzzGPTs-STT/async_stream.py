@@ -0,0 +1,256 @@
+"""
+asyncio API for live transcription.
+
+    async with TranscriptionStream() as stream:
+        async for event in stream:
+            print(event.source, event.is_final, event.text)
+
+The transcriber threads hand events to the event loop with
+``call_soon_threadsafe``; they never block on the consumer and the loop
+never blocks on them. Events wait in a bounded buffer whose overflow
+policy is explicit:
+
+- ``drop_partials`` (default): the oldest buffered partial is discarded
+  (a later partial supersedes it); an incoming final displaces the
+  oldest final only when the buffer holds nothing but finals
+- ``drop_oldest``: the oldest buffered event is discarded
+- ``drop_newest``: the incoming event is discarded
+- ``raise``: iteration raises StreamOverflowError once the consumer
+  reaches the overflow point
+
+Dropped events are counted in ``stream.dropped_events``.
+"""
+
+import asyncio
+from collections import deque
+from config import Config
+from logger_config import get_logger
+from typing import Optional
+
+logger = get_logger(__name__)
+
+OVERFLOW_POLICIES = ("drop_partials", "drop_oldest", "drop_newest", "raise")
+
+
+class StreamOverflowError(Exception):
+    """The consumer fell further behind than the event buffer allows (overflow='raise')."""
+    pass
+
+
+class TranscriptionEvent:
+    """One live (partial) or final transcription result."""
+
+    __slots__ = ("text", "latency", "timestamp", "is_final", "source")
+
+    def __init__(self, text: str, latency: float, timestamp: float, is_final: bool = False,
+                 source: Optional[str] = None):
+        self.text = text
+        self.latency = latency  # Decode latency in seconds
+        self.timestamp = timestamp  # Wall-clock time of the result
+        self.is_final = is_final
+        self.source = source  # Capture source ('loopback', 'mic', 'mix') or None
+
+    def __repr__(self) -> str:
+        kind = "final" if self.is_final else "partial"
+        return f"TranscriptionEvent({kind}, source={self.source!r}, text={self.text!r})"
+
+
+class EventBuffer:
+    """Bounded event buffer owned by one event loop.
+
+    ``push_threadsafe`` may be called from any thread; the buffer itself is
+    only touched on the loop thread, so it needs no lock.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_events: int, overflow: str):
+        """
+        Initialize the buffer.
+
+        Args:
+            loop: Event loop the consumer runs on
+            max_events: Events buffered before the overflow policy applies
+            overflow: One of OVERFLOW_POLICIES
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.loop = loop
+        self.max_events = max(1, max_events)
+        self.overflow = overflow
+        self.dropped_events = 0
+        self._events: deque = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._overflowed = False
+        self._closed = False
+
+    def push_threadsafe(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._push, event)
+        except RuntimeError:
+            pass  # Loop already closed; nobody is listening
+
+    def close_threadsafe(self):
+        self.push_threadsafe(self._CLOSED)
+
+    def _push(self, event):
+        if self._closed:
+            return
+        if event is self._CLOSED:
+            self._closed = True
+        elif len(self._events) >= self.max_events and not self._make_room(event):
+            return
+        else:
+            self._events.append(event)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _make_room(self, event) -> bool:
+        """Apply the overflow policy; returns whether ``event`` should still be appended."""
+        self.dropped_events += 1
+        if self.overflow == "drop_newest":
+            return False
+        if self.overflow == "raise":
+            self._overflowed = True
+            self._closed = True
+            return False
+        if self.overflow == "drop_partials":
+            for i, queued in enumerate(self._events):
+                if not queued.is_final:
+                    del self._events[i]
+                    return True
+            if not event.is_final:
+                return False  # Only finals are buffered; the incoming partial goes
+        self._events.popleft()
+        return True
+
+    async def get(self):
+        """Next event; raises StopAsyncIteration once closed and drained."""
+        while not self._events:
+            if self._overflowed:
+                raise StreamOverflowError(
+                    f"Consumer fell more than {self.max_events} events behind"
+                )
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._events.popleft()
+
+    def qsize(self) -> int:
+        return len(self._events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
+class TranscriptionStream:
+    """Async context manager running capture + transcription, iterated for events.
+
+    Startup (device and model loading) and shutdown run in the default
+    executor, so neither blocks the event loop. Leaving the ``async with``
+    block stops the pipeline; iteration ends after the remaining events.
+    """
+
+    def __init__(self, sources: Optional[str] = None, device_name: Optional[str] = None,
+                 max_events: Optional[int] = None, overflow: Optional[str] = None):
+        """
+        Initialize the stream (nothing starts until ``async with``).
+
+        Args:
+            sources: Capture sources, e.g. 'loopback,mic' (Config.CAPTURE_SOURCES if None)
+            device_name: Loopback (or sole mic) device name (default device if None)
+            max_events: Buffered events before overflow (Config.EVENT_BUFFER_SIZE if None)
+            overflow: Overflow policy (Config.EVENT_OVERFLOW if None)
+        """
+        self.sources = sources or Config.CAPTURE_SOURCES
+        self.device_name = device_name
+        self.max_events = max_events or Config.EVENT_BUFFER_SIZE
+        self.overflow = overflow or Config.EVENT_OVERFLOW
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{self.overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.capture = None
+        self.transcriber = None
+        self._buffer: Optional[EventBuffer] = None
+        self._stopping = False
+
+    @property
+    def dropped_events(self) -> int:
+        return self._buffer.dropped_events if self._buffer is not None else 0
+
+    def _on_text(self, text, latency, timestamp, is_final=False, source=None):
+        # Transcriber thread: hand off without blocking
+        self._buffer.push_threadsafe(TranscriptionEvent(text, latency, timestamp, is_final, source))
+
+    def _build(self):
+        """Create the capture and transcriber components (blocking)."""
+        from multi_source import CaptureGroup, MultiSourceTranscriber, parse_sources
+
+        sources = parse_sources(self.sources)
+        if len(sources) > 1:
+            transcriber = MultiSourceTranscriber(sources, self._on_text, Config.MULTI_SOURCE_MODE)
+            capture = CaptureGroup(transcriber.inputs, {"loopback": self.device_name, "mic": Config.MIC_DEVICE})
+            return capture, transcriber
+
+        from audio_capture import AudioCapture
+        from audio_ring import create_audio_ring
+        from transcriber import WhisperTranscriber
+
+        source = sources[0]
+        ring = create_audio_ring()
+        device_name = self.device_name or (Config.MIC_DEVICE if source == "mic" else None) or None
+        capture = AudioCapture(ring, device_name, source=source)
+        transcriber = WhisperTranscriber(
+            ring, lambda text, latency, timestamp, is_final=False:
+                self._on_text(text, latency, timestamp, is_final, source)
+        )
+        return capture, transcriber
+
+    def _start(self):
+        self.capture, self.transcriber = self._build()
+        if not self.transcriber.start():
+            raise RuntimeError("Failed to start transcriber")
+        if not self.capture.start():
+            self.transcriber.stop()
+            raise RuntimeError("Failed to start audio capture")
+
+    def _stop(self):
+        if self.capture is not None:
+            self.capture.stop()
+        if self.transcriber is not None:
+            self.transcriber.stop()  # Pending finals are delivered before this returns
+
+    async def __aenter__(self) -> "TranscriptionStream":
+        loop = asyncio.get_running_loop()
+        self._buffer = EventBuffer(loop, self.max_events, self.overflow)
+        await loop.run_in_executor(None, self._start)
+        logger.info(f"Transcription stream started ({self.sources})")
+        return self
+
+    async def aclose(self):
+        """Stop capture and transcription; iteration ends after the remaining events."""
+        if self._buffer is None or self._stopping:
+            return
+        self._stopping = True
+        await asyncio.get_running_loop().run_in_executor(None, self._stop)
+        self._buffer.close_threadsafe()
+        if self.dropped_events:
+            logger.warning(f"Transcription stream dropped {self.dropped_events} events ({self.overflow})")
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> TranscriptionEvent:
+        if self._buffer is None:
+            raise RuntimeError("Use 'async with TranscriptionStream()' before iterating")
+        return await self._buffer.get()
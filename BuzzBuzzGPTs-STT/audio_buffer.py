@@ -0,0 +1,112 @@
+"""
+Preallocated audio ring buffer for the transcription pipeline.
+Appends are O(chunk) and reads return zero-copy views.
+"""
+
+import numpy as np
+from typing import Optional
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 ring buffer with zero-copy reads.
+
+    The backing store is allocated once and each sample is written once.
+    The transcriber clears the buffer after every utterance, so its samples
+    start at index 0 and every read is a plain ndarray view. Only after the
+    ring has overflowed can a read span the end of the array; that span is
+    linearized into a new array (a copy of just the samples asked for).
+
+    ``np.zeros`` maps its pages lazily, so the memory actually in use grows
+    with the longest utterance seen, not with ``capacity``.
+
+    Views are only valid until the next ``append``; callers that need the
+    data to outlive further writes must copy it.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            capacity: Maximum number of samples held before the oldest are overwritten
+            dtype: Sample dtype (float32 for Whisper input)
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=dtype)
+        self._start = 0  # Index of the oldest sample (0 <= _start < capacity)
+        self._size = 0
+        self.overwritten_samples = 0  # Samples lost to overflow since last clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        return self._size == self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the backing array (address space reserved, not necessarily touched)."""
+        return self._data.nbytes
+
+    def append(self, chunk: np.ndarray):
+        """Append samples, overwriting the oldest ones if the buffer is full.
+
+        Args:
+            chunk: 1-D array of samples
+        """
+        n = len(chunk)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the newest `capacity` samples survive
+            self.overwritten_samples += self._size + n - self.capacity
+            self._start = 0
+            self._size = self.capacity
+            self._data[:] = chunk[-self.capacity:]
+            return
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            self.overwritten_samples += overflow
+
+        write_pos = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - write_pos)
+        self._data[write_pos:write_pos + first] = chunk[:first]
+        if first < n:
+            self._data[:n - first] = chunk[first:]
+        self._size += n
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Return samples [start, stop) counted from the oldest sample.
+
+        A zero-copy view unless the span wraps around the end of the ring.
+        """
+        if stop is None or stop > self._size:
+            stop = self._size
+        start = max(0, min(start, stop))
+        base = (self._start + start) % self.capacity
+        end = base + (stop - start)
+        if end <= self.capacity:
+            return self._data[base:end]
+        return np.concatenate((self._data[base:], self._data[:end - self.capacity]))
+
+    def tail(self, num_samples: int) -> np.ndarray:
+        """Return the newest ``num_samples`` samples (see ``view``)."""
+        return self.view(max(0, self._size - num_samples))
+
+    def consume(self, num_samples: int):
+        """Discard the oldest ``num_samples`` samples."""
+        num_samples = max(0, min(num_samples, self._size))
+        self._start = (self._start + num_samples) % self.capacity
+        self._size -= num_samples
+
+    def clear(self):
+        """Drop all samples (memory stays allocated)."""
+        self._start = 0
+        self._size = 0
+        self.overwritten_samples = 0
@@ -3,6 +3,10 @@ System audio capture module using soundcard for loopback recording.
 Production-ready with proper logging, error handling, and thread safety.
 """
 
+import re
+import shutil
+import subprocess
+import sys
 import numpy as np
 import soundcard as sc
 import threading
@@ -10,6 +14,10 @@ import queue
 import time
 from config import Config
 from logger_config import get_logger
+from vad import SpeechGate, create_vad
+from device_monitor import create_device_watcher
+from audio_dsp import PolyphaseResampler, downmix_into, rms
+from metrics_registry import metrics_registry
 from typing import Optional
 
 logger = get_logger(__name__)
@@ -20,22 +28,70 @@ class AudioCaptureError(Exception):
     pass
 
 
+def query_device_rate(mic) -> Optional[int]:
+    """The sample rate ``mic`` runs at, where the backend can tell (None otherwise).
+
+    soundcard does not expose it, so it is read from the audio server:
+    ``pactl list short sources`` on PulseAudio/PipeWire and the shared-mode
+    mix format on WASAPI. Replay devices report ``sample_rate`` directly.
+    """
+    rate = getattr(mic, "sample_rate", None)
+    if isinstance(rate, int) and rate > 0:
+        return rate
+    backend = type(mic).__module__
+    try:
+        if backend.endswith("pulseaudio") and shutil.which("pactl"):
+            return _pulse_source_rate(mic.id)
+        if backend.endswith("mediafoundation"):
+            return _wasapi_mix_rate(mic)
+    except Exception as e:
+        logger.debug(f"Could not query the sample rate of {mic.name}: {e}")
+    return None
+
+
+def _pulse_source_rate(source_name: str) -> Optional[int]:
+    # e.g. "57\talsa_output.pci.analog-stereo.monitor\tmodule-alsa-card.c\ts16le 2ch 48000Hz\tIDLE"
+    listing = subprocess.run(["pactl", "list", "short", "sources"], capture_output=True, text=True, timeout=2.0)
+    for line in listing.stdout.splitlines():
+        fields = line.split("\t")
+        if len(fields) >= 4 and fields[1] == source_name:
+            match = re.search(r"(\d+)Hz", fields[3])
+            return int(match.group(1)) if match else None
+    return None
+
+
+def _wasapi_mix_rate(mic) -> Optional[int]:
+    # The shared-mode mix format is the rate the Windows audio engine runs the endpoint at
+    backend = sys.modules[type(mic).__module__]
+    client = mic._audio_client()
+    try:
+        mix_format = backend._ffi.new("WAVEFORMATEXTENSIBLE**")
+        backend._com.check_error(client[0][0].lpVtbl.GetMixFormat(client[0], mix_format))
+        rate = int(mix_format[0][0].Format.nSamplesPerSec)
+        backend._ole32.CoTaskMemFree(mix_format[0])
+        return rate
+    finally:
+        backend._com.release(client)
+
+
 class AudioCapture:
-    """Captures system audio (loopback) in real-time with robust error handling."""
+    """Captures system audio (loopback) or a microphone in real-time with robust error handling."""
     
-    def __init__(self, audio_queue: queue.Queue, device_name: Optional[str] = None):
+    def __init__(self, audio_queue: queue.Queue, device_name: Optional[str] = None, source: str = "loopback"):
         """
         Initialize audio capture.
         
         Args:
             audio_queue: Queue to push captured audio chunks
-            device_name: Name of audio device (None for default loopback)
+            device_name: Name of audio device (None for the source's default device)
+            source: 'loopback' (system audio) or 'mic' (default microphone)
             
         Raises:
             AudioCaptureError: If audio device initialization fails
         """
         self.audio_queue = audio_queue
         self.device_name = device_name
+        self.source = source
         self.is_running = False
         self.capture_thread = None
         self.monitor_thread = None
@@ -43,6 +99,44 @@ class AudioCapture:
         self._lock = threading.Lock()  # Thread safety
         self.error_count = 0
         
+        # Voice activity detection stage (None when ENABLE_VAD is off)
+        self.vad = create_vad()
+        self.speech_gate = SpeechGate(self.vad, Config.VAD_HANGOVER_CHUNKS)
+        self.chunks_gated = 0  # Chunks the VAD kept away from the transcriber
+        self.chunks_passed = 0
+        self.chunks_dropped = 0  # Chunks lost to a full audio queue
+        
+        # Stage metrics (recorded lock-free from the capture thread)
+        self._enqueue_latency = metrics_registry.histogram(
+            "capture_to_enqueue_seconds", "Time from recorder.record() returning to the chunk being queued"
+        )
+        self._chunks_dropped = metrics_registry.counter(
+            "audio_chunks_dropped_total", "Chunks dropped because the audio queue was full"
+        )
+        # Queues that copy on put (SPSCAudioRing, shared-memory rings) let the
+        # capture loop reuse one scratch chunk; others get a fresh copy each time
+        self._reuse_chunks = getattr(audio_queue, "copies_items", False)
+        self.last_rms = 0.0
+        # Recording format, set when a recorder opens (see _configure_format)
+        self.capture_rate = Config.SAMPLE_RATE
+        self.capture_frames = Config.BUFFER_SIZE
+        self.resampler: Optional[PolyphaseResampler] = None
+        self.processed_until = 0.0  # perf_counter() time up to which audio was gated or queued
+        
+        # Device hot-swap (the monitor thread sets _pending_mic, the capture loop switches)
+        self._watcher = None
+        self._pending_mic = None
+        self.device_switches = 0
+        self.last_switch_gap: Optional[float] = None  # Seconds of audio lost in the last switch
+        self._switch_gap = metrics_registry.histogram(
+            "device_switch_gap_seconds", "Audio lost while moving capture to a new device"
+        )
+        
+        # Copying sinks (SPSCAudioRing, shared-memory rings, the mixer) time chunks
+        # themselves or hand them to another process; plain queues get a FIFO of stamps
+        self._enqueue_stamps = None if self._reuse_chunks else \
+            metrics_registry.stamps(audio_queue)
+        
         # Initialize audio device
         try:
             self.mic = self._initialize_device(device_name)
@@ -53,6 +147,11 @@ class AudioCapture:
     
     def _initialize_device(self, device_name: Optional[str] = None):
         """Initialize and return the audio device."""
+        if self.source == "mic" and not device_name:
+            mic = sc.default_microphone()
+            if mic is None:
+                raise AudioCaptureError("No microphone found. Please check your audio settings.")
+            return mic
         if device_name:
             # Find specific device by name
             mics = sc.all_microphones(include_loopback=True)
@@ -98,6 +197,7 @@ class AudioCapture:
                 return True
                 
             self.is_running = True
+            self._watcher = create_device_watcher(Config.DEVICE_POLL_INTERVAL)
             self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
             self.monitor_thread = threading.Thread(target=self._monitor_devices, daemon=True)
             
@@ -115,6 +215,8 @@ class AudioCapture:
             self.is_running = False
         
         logger.info("Stopping audio capture...")
+        if self._watcher is not None:
+            self._watcher.stop()  # Wakes the monitor thread
         
         # Wait for threads to finish
         if self.capture_thread:
@@ -131,72 +233,181 @@ class AudioCapture:
         """Main capture loop running in background thread."""
         logger.info(f"Starting capture loop with mic: {self.mic.name}")
         
+        recorder = None
         try:
-            with self.mic.recorder(
-                samplerate=Config.SAMPLE_RATE,
-                channels=None,
-                blocksize=Config.BUFFER_SIZE
-            ) as recorder:
-                logger.debug("Recorder opened, listening for audio...")
-                chunk_count = 0
-                
-                while self.is_running:
+            capture_rate = self._capture_rate(self.mic)
+            recorder = self._open_recorder(self.mic, capture_rate)
+            self._configure_format(capture_rate)
+            logger.debug("Recorder opened, listening for audio...")
+            chunk_count = 0
+            captured_at = time.perf_counter()
+            # Mono scratch reused for every chunk (downmix writes into it in place)
+            scratch = np.empty(self.capture_frames, dtype=np.float32)
+            
+            while self.is_running:
+                try:
+                    # Device switch requested by the monitor: swap recorders between chunks
+                    if self._pending_mic is not None:
+                        recorder = self._switch_recorder(recorder, captured_at)
+                    
+                    # Record a chunk of audio
+                    audio_data = recorder.record(numframes=self.capture_frames)
+                    captured_at = time.perf_counter()
+                    
+                    # float32 mono, converted and averaged in one pass
+                    if len(audio_data) > len(scratch):
+                        scratch = np.empty(len(audio_data), dtype=np.float32)
+                    audio_chunk = downmix_into(audio_data, scratch)
+                    if self.resampler is not None:
+                        audio_chunk = self.resampler.process(audio_chunk)
+                    
+                    # One RMS per chunk, shared by level monitoring and the energy VAD
+                    level = rms(audio_chunk)
+                    self.last_rms = level
+                    chunk_count += 1
+                    if chunk_count % 50 == 0:
+                        logger.debug(f"Audio chunk #{chunk_count}, RMS level: {level:.6f}")
+                    
+                    # Voice Activity Detection: non-speech chunks never reach the
+                    # transcriber, so they cost no decode and count toward the
+                    # finalization pause. A short hangover keeps word tails.
+                    if not self.speech_gate.admit(audio_chunk, level):
+                        self.chunks_gated += 1
+                        self.processed_until = captured_at
+                        continue  # Skip non-speech chunks
+                    self.chunks_passed += 1
+                    
+                    # Put audio chunk in queue (stamped first so the consumer can
+                    # measure queue wait as soon as it takes the chunk)
+                    if not self._reuse_chunks:
+                        audio_chunk = audio_chunk.copy()  # The queue keeps a reference
+                    if self._enqueue_stamps is not None:
+                        self._enqueue_stamps.append(time.perf_counter())
                     try:
-                        # Record a chunk of audio
-                        audio_data = recorder.record(numframes=Config.BUFFER_SIZE)
-                        
-                        # Ensure it's float32
-                        audio_fp32 = audio_data.astype(np.float32)
-                        
-                        # Convert to mono if multi-channel
-                        if len(audio_fp32.shape) > 1 and audio_fp32.shape[1] > 1:
-                            audio_chunk = np.mean(audio_fp32, axis=1)
-                        else:
-                            audio_chunk = audio_fp32.flatten()
-                        
-                        # Periodic audio level monitoring
-                        chunk_count += 1
-                        if chunk_count % 50 == 0:
-                            rms = np.sqrt(np.mean(audio_chunk**2))
-                            logger.debug(f"Audio chunk #{chunk_count}, RMS level: {rms:.6f}")
-                        
-                        # Voice Activity Detection
-                        if Config.ENABLE_VAD:
-                            rms = np.sqrt(np.mean(audio_chunk**2))
-                            if rms < Config.VAD_THRESHOLD:
-                                continue  # Skip silent chunks
-                        
-                        # Put audio chunk in queue
-                        try:
-                            self.audio_queue.put(audio_chunk, timeout=0.1)
-                        except queue.Full:
-                            logger.warning("Audio queue full, dropping chunk to prevent latency")
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing audio chunk: {e}")
-                        self.error_count += 1
+                        self.audio_queue.put(audio_chunk, timeout=0.1)
+                        self._enqueue_latency.observe(time.perf_counter() - captured_at)
+                    except queue.Full:
+                        if self._enqueue_stamps is not None:
+                            self._enqueue_stamps.pop()
+                        self.chunks_dropped += 1
+                        self._chunks_dropped.inc()
+                        logger.warning("Audio queue full, dropping chunk to prevent latency")
+                    self.processed_until = captured_at
                         
+                except Exception as e:
+                    logger.error(f"Error processing audio chunk: {e}")
+                    self.error_count += 1
+                    
         except Exception as e:
             logger.critical(f"Fatal error in capture loop: {e}", exc_info=True)
             self.last_error = e
             self.is_running = False
         finally:
+            if recorder is not None:
+                recorder.__exit__(None, None, None)
             logger.info("Capture loop ended")
 
+    @staticmethod
+    def _capture_rate(mic) -> int:
+        """Rate to record ``mic`` at.
+
+        Native-rate capture (CAPTURE_SAMPLE_RATE set) records at the rate the
+        device reports, with CAPTURE_SAMPLE_RATE as the fallback for devices
+        that cannot report one; otherwise the backend delivers SAMPLE_RATE.
+        """
+        if not Config.CAPTURE_SAMPLE_RATE:
+            return Config.SAMPLE_RATE
+        rate = query_device_rate(mic)
+        if rate is None:
+            logger.warning(f"Sample rate of {mic.name} unknown, assuming CAPTURE_SAMPLE_RATE={Config.CAPTURE_SAMPLE_RATE}")
+        return rate or Config.CAPTURE_SAMPLE_RATE
+
+    def _configure_format(self, capture_rate: int):
+        """Set the chunk size and resampler for a recorder running at ``capture_rate``.
+
+        Native-rate capture records the device's rate and channel count as-is
+        and converts to SAMPLE_RATE mono here instead of in the backend. The
+        resampler is rebuilt for a new rate and otherwise reset, so no filter
+        history carries over from a previous recorder.
+        """
+        self.capture_rate = capture_rate
+        self.capture_frames = self._frames_at(capture_rate)
+        if capture_rate == Config.SAMPLE_RATE:
+            self.resampler = None
+        elif self.resampler is not None and self.resampler.in_rate == capture_rate:
+            self.resampler.reset()
+        else:
+            self.resampler = PolyphaseResampler(capture_rate, Config.SAMPLE_RATE, max_block=self.capture_frames)
+            logger.info(f"Capturing at {capture_rate} Hz, resampling to {Config.SAMPLE_RATE} Hz "
+                        f"({self.resampler.taps} taps x {self.resampler.up} phases)")
+
+    @staticmethod
+    def _frames_at(capture_rate: int) -> int:
+        return round(Config.BUFFER_SIZE * capture_rate / Config.SAMPLE_RATE)
+
+    @classmethod
+    def _open_recorder(cls, mic, capture_rate: int):
+        """Open (enter) a recorder on ``mic``; the caller closes it with __exit__."""
+        recorder = mic.recorder(samplerate=capture_rate, channels=None, blocksize=cls._frames_at(capture_rate))
+        recorder.__enter__()
+        return recorder
+
+    def _switch_recorder(self, recorder, last_read_at: float):
+        """Move capture to the pending device with a bounded, measured gap.
+
+        The new recorder is opened, and starts buffering, before the old one
+        is closed, so the only audio lost is what the old device buffered
+        after the last chunk was read (``switch_gap``, measured per switch).
+
+        Returns:
+            The recorder to read from (the old one if the new device fails to open)
+        """
+        with self._lock:
+            new_mic, self._pending_mic = self._pending_mic, None
+        try:
+            capture_rate = self._capture_rate(new_mic)
+            new_recorder = self._open_recorder(new_mic, capture_rate)
+        except Exception as e:
+            logger.error(f"Could not open {new_mic.name}, staying on {self.mic.name}: {e}")
+            self.error_count += 1
+            return recorder
+        opened_at = time.perf_counter()
+        
+        try:
+            recorder.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error closing previous recorder: {e}")
+        old_name, self.mic = self.mic.name, new_mic
+        # New stream: no resampler history, VAD state or hangover from the old device
+        self._configure_format(capture_rate)
+        self.speech_gate.reset()
+        self.device_switches += 1
+        self.last_switch_gap = opened_at - last_read_at
+        self._switch_gap.observe(self.last_switch_gap)
+        logger.info(f"Switched capture from {old_name} to {new_mic.name} "
+                    f"(gap {1000 * self.last_switch_gap:.1f} ms)")
+        return new_recorder
+
     def _monitor_devices(self):
-        """Monitor for default device changes (hot-swapping)."""
-        logger.debug("Device monitor thread started")
+        """Watch for default device changes (hot-swapping).
+
+        Woken by audio server notifications where available (see
+        device_monitor), otherwise every DEVICE_POLL_INTERVAL seconds.
+        """
+        logger.debug(f"Device monitor thread started ({self._watcher.backend})")
         
         while self.is_running:
-            time.sleep(5.0)  # Check every 5 seconds
-            
-            if self.device_name:
+            notified = self._watcher.wait()
+            if not self.is_running:
+                break
+            if self.device_name or self.source != "loopback":
                 continue  # Don't hot-swap if specific device was requested
             
             try:
                 new_default = sc.default_speaker().name
                 if self.mic and new_default not in self.mic.name:
-                    logger.info(f"Default device changed to: {new_default}. Attempting restart...")
+                    source = "notification" if notified else "poll"
+                    logger.info(f"Default device changed to: {new_default} ({source}). Switching capture...")
                     self._restart_capture()
             except Exception as e:
                 logger.debug(f"Device monitor check error: {e}")
@@ -204,7 +415,7 @@ class AudioCapture:
         logger.debug("Device monitor thread ended")
 
     def _restart_capture(self):
-        """Restart the capture process with updated default device."""
+        """Ask the capture loop to move to the default speaker's loopback device."""
         try:
             default_speaker = sc.default_speaker()
             mics = sc.all_microphones(include_loopback=True)
@@ -216,8 +427,9 @@ class AudioCapture:
                     break
             
             if new_mic and new_mic.name != self.mic.name:
-                self.mic = new_mic
-                logger.info(f"Switched to new device: {self.mic.name}")
+                # The capture loop opens it before closing the current recorder
+                with self._lock:
+                    self._pending_mic = new_mic
         except Exception as e:
             logger.error(f"Failed to restart capture: {e}")
             
@@ -253,9 +465,17 @@ class AudioCapture:
         """
         return {
             "is_running": self.is_running,
+            "source": self.source,
             "device_name": self.mic.name if self.mic else None,
             "error_count": self.error_count,
             "last_error": str(self.last_error) if self.last_error else None,
+            "chunks_gated": self.chunks_gated,
+            "chunks_passed": self.chunks_passed,
+            "chunks_dropped": self.chunks_dropped,
+            "device_switches": self.device_switches,
+            "last_switch_gap": self.last_switch_gap,
+            "device_watcher": self._watcher.backend if self._watcher else None,
             "queue_size": self.audio_queue.qsize(),
-            "queue_full": self.audio_queue.full()
+            "queue_full": self.audio_queue.full(),
+            **(self.audio_queue.get_status() if hasattr(self.audio_queue, "get_status") else {})
         }
@@ -0,0 +1,143 @@
+"""
+Allocation-free per-chunk signal processing for the capture loop.
+"""
+
+import numpy as np
+
+
+def downmix_into(frames: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Average the channels of ``frames`` into the preallocated ``out``.
+
+    Any input dtype is converted while it is summed, so no intermediate
+    float32 copy or mono array is allocated.
+
+    Args:
+        frames: Recorded block, shape (n,) or (n, channels)
+        out: float32 scratch buffer with at least n samples
+
+    Returns:
+        View of the first n samples of ``out``
+    """
+    n = frames.shape[0]
+    mono = out[:n]
+    if frames.ndim == 1 or frames.shape[1] == 1:
+        np.copyto(mono, frames.reshape(n), casting="same_kind")
+        return mono
+    channels = frames.shape[1]
+    np.add(frames[:, 0], frames[:, 1], out=mono, casting="same_kind")
+    for channel in range(2, channels):
+        np.add(mono, frames[:, channel], out=mono, casting="same_kind")
+    mono *= np.float32(1.0 / channels)
+    return mono
+
+
+def rms(chunk: np.ndarray) -> float:
+    """Root mean square level (a dot product, so ``chunk**2`` is never materialized)."""
+    n = len(chunk)
+    return float(np.sqrt(np.dot(chunk, chunk) / n)) if n else 0.0
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler (windowed-sinc polyphase FIR).
+
+    The rate change ``in_rate -> out_rate`` is reduced to ``up / down``.
+    A Kaiser-windowed low-pass prototype at ``up * in_rate`` is split into
+    ``up`` phases of ``taps`` coefficients, and every output sample is one
+    phase dotted with the latest ``taps`` inputs. Outputs that share a phase
+    are ``down`` inputs apart, so each phase is a single matrix-vector
+    product over a strided window view of the input: no per-sample Python
+    loop and no zero-stuffed upsampled signal.
+
+    The last ``taps - 1`` inputs and the output position carry over between
+    calls, so chunk boundaries are seamless. Work buffers are preallocated
+    for blocks of up to ``max_block`` input samples (and grown if a larger
+    block arrives).
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, max_block: int,
+                 zero_crossings: int = 16, rolloff: float = 0.94, beta: float = 8.6):
+        """
+        Initialize the resampler.
+
+        Args:
+            in_rate: Input sample rate in Hz
+            out_rate: Output sample rate in Hz
+            max_block: Expected largest input block passed to process()
+            zero_crossings: Sinc zero crossings on each side of the center (quality vs. CPU)
+            rolloff: Cutoff as a fraction of the lower Nyquist frequency
+            beta: Kaiser window shape (8.6 gives about 80 dB stopband attenuation)
+        """
+        if in_rate <= 0 or out_rate <= 0:
+            raise ValueError(f"Sample rates must be positive, got {in_rate} -> {out_rate}")
+        divisor = np.gcd(int(in_rate), int(out_rate))
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.up = self.out_rate // divisor
+        self.down = self.in_rate // divisor
+
+        # Cutoff in cycles per sample at the upsampled rate
+        cutoff = 0.5 * rolloff / max(self.up, self.down)
+        self.taps = 2 * int(np.ceil(zero_crossings * max(1.0, self.down / self.up)))
+        length = self.taps * self.up
+        t = np.arange(length) - (length - 1) / 2.0
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, beta)
+        prototype *= self.up / prototype.sum()  # Unity DC gain (each phase sums to ~1)
+
+        # bank[p] holds h[p], h[p + up], ...; reversed so it dots with x[n - taps + 1 .. n]
+        bank = prototype.reshape(self.taps, self.up).T
+        self._bank = np.ascontiguousarray(bank[:, ::-1], dtype=np.float32)
+
+        self._history = self.taps - 1
+        self._allocate(int(max_block))
+        self.reset()
+
+    def _allocate(self, max_block: int):
+        buffer = np.zeros(self._history + max_block, dtype=np.float32)
+        if hasattr(self, "_buffer"):
+            buffer[:self._history] = self._buffer[:self._history]
+        self._buffer = buffer
+        self._out = np.empty(max_block * self.up // self.down + 2, dtype=np.float32)
+        self.max_block = max_block
+
+    @property
+    def delay(self) -> float:
+        """Group delay in seconds (constant, from the linear-phase filter)."""
+        return (self.taps * self.up - 1) / 2.0 / (self.up * self.in_rate)
+
+    def reset(self):
+        """Forget stream state (e.g. after a device switch)."""
+        self._buffer[:self._history] = 0.0
+        self._consumed = 0  # Input samples processed so far
+        self._produced = 0  # Output samples produced so far
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample the next block of mono samples.
+
+        Returns:
+            View of the output scratch buffer, valid until the next call
+        """
+        n = len(block)
+        if n > self.max_block:
+            self._allocate(n)  # Unexpectedly large block: grow once and keep going
+        up, down, taps = self.up, self.down, self.taps
+        buffer = self._buffer
+        buffer[self._history:self._history + n] = block
+        start = self._consumed - self._history  # Input index of buffer[0]
+        self._consumed += n
+
+        # Output m needs input (m * down) // up, which must already be here
+        first = self._produced
+        end = -(-self._consumed * up // down)
+        count = end - first
+        out = self._out[:count]
+        windows = np.lib.stride_tricks.sliding_window_view(buffer[:self._history + n], taps)
+        for offset in range(min(up, count)):
+            m = first + offset
+            row = (m * down) // up - taps + 1 - start
+            rows = windows[row:row + (count - 1 - offset) // up * down + 1:down]
+            np.matmul(rows, self._bank[(m * down) % up], out=out[offset::up])
+        self._produced = end
+
+        # Keep the newest taps - 1 inputs for the next block
+        buffer[:self._history] = buffer[n:n + self._history]
+        return out
@@ -0,0 +1,317 @@
+"""
+Single-producer/single-consumer audio hand-off between capture and
+transcription, replacing the per-chunk queue.Queue.
+"""
+
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+import numpy as np
+from config import Config
+from logger_config import get_logger
+from typing import List, Optional, Tuple
+
+logger = get_logger(__name__)
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "drop_newest", "spill")
+
+
+class SPSCAudioRing:
+    """Preallocated float32 ring with sequence numbers and backpressure.
+
+    Every accepted sample gets a monotonic sequence number. The backing
+    array is mirrored (each sample is stored in both halves), so any span of
+    up to ``capacity`` unread samples is one contiguous view: the consumer
+    ``acquire()``s a span, uses it without copying and ``release()``s it.
+    Samples in an acquired span are never overwritten.
+
+    When the ring is full the ``policy`` decides:
+
+    - ``block``: the producer waits for space, up to put()'s ``timeout``
+      (forever without one; not at all for put_nowait()). On expiry the
+      chunk is rejected with queue.Full
+    - ``drop_oldest``: unread samples at the head are discarded to make room.
+      While the consumer holds an acquired span those samples cannot be
+      touched, so the incoming chunk is rejected instead (queue.Full,
+      counted in ``dropped_newest_samples``)
+    - ``drop_newest``: the incoming chunk is rejected with queue.Full
+    - ``spill``: chunks overflow to a temporary file and are moved back
+      into the ring, in order, as space frees up (up to ``spill_max_samples``)
+
+    The producer copies and publishes under one short lock; the consumer
+    works on its span outside it. The queue.Queue methods used by AudioCapture and WhisperTranscriber
+    (put/get/get_nowait/qsize/empty/full) are provided so the ring is a
+    drop-in replacement.
+    """
+
+    copies_items = True  # put() copies, so producers may reuse their buffers
+
+    def __init__(self, capacity: int, policy: str = "drop_newest", chunk_size: int = 1,
+                 spill_dir: Optional[str] = None, spill_max_samples: int = 0):
+        """
+        Initialize the ring.
+
+        Args:
+            capacity: Ring size in samples
+            policy: One of BACKPRESSURE_POLICIES
+            chunk_size: Nominal chunk length (qsize() is reported in chunks)
+            spill_dir: Directory for the spill file (system temp dir if None)
+            spill_max_samples: Spill size limit in samples (0 = unlimited)
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy '{policy}', expected one of {BACKPRESSURE_POLICIES}")
+        self.capacity = int(capacity)
+        self.policy = policy
+        self.chunk_size = max(1, int(chunk_size))
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+
+        self.write_seq = 0  # Sequence number of the next sample written to the ring
+        self.read_seq = 0  # Sequence number of the oldest unread sample
+        self._claimed_seq = 0  # End of the span held by the consumer (== read_seq when none)
+        self._stamps: deque = deque()  # (end_seq, enqueue time) per accepted chunk
+        self._cond = threading.Condition(threading.Lock())
+
+        # Exact loss accounting (samples)
+        self.dropped_oldest_samples = 0
+        self.dropped_newest_samples = 0
+        self.spilled_samples = 0
+
+        self.spill_dir = spill_dir
+        self.spill_max_samples = spill_max_samples
+        self._spill = None
+        self._spill_read = 0  # Sample offsets inside the spill file
+        self._spill_write = 0
+
+    # --- Producer -----------------------------------------------------------
+
+    def put(self, chunk: np.ndarray, block: bool = True, timeout: Optional[float] = None):
+        """Hand a chunk to the consumer, applying the backpressure policy.
+
+        Raises:
+            queue.Full: If the chunk was dropped (drop_newest, or a full spill)
+        """
+        n = len(chunk)
+        if n == 0:
+            return
+        if n > self.capacity:
+            raise ValueError(f"Chunk of {n} samples exceeds ring capacity {self.capacity}")
+
+        with self._cond:
+            if self._spill_pending:
+                self._restore_spill()
+            if self._spill_pending or self._free < n:
+                self._make_room(chunk, block, timeout)
+            else:
+                self._write(chunk)
+            # Stamped by stream position, so spilled chunks keep their enqueue time
+            self._stamps.append((self.write_seq + self._spill_pending, self._stamp()))
+
+    def put_nowait(self, chunk: np.ndarray):
+        self.put(chunk, block=False)
+
+    def _stamp(self) -> float:
+        """Enqueue time recorded for a chunk (returned by ``release()``)."""
+        return time.perf_counter()
+
+    def _make_room(self, chunk: np.ndarray, block: bool, timeout: Optional[float]):
+        """Full ring (lock held): apply the policy to ``chunk``."""
+        n = len(chunk)
+        if self.policy == "block":
+            deadline = None if block and timeout is None else time.monotonic() + (timeout if block else 0.0)
+            while self._free < n:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.dropped_newest_samples += n
+                    raise queue.Full
+                self._cond.wait(remaining)
+            self._write(chunk)
+        elif self.policy == "spill" and not self._spill_full(n):
+            try:
+                self._spill_chunk(chunk)
+            except OSError as e:
+                logger.error(f"Audio spill failed, dropping chunk: {e}")
+                self.dropped_newest_samples += n
+                raise queue.Full from e
+        elif self.policy == "drop_oldest" and self._claimed_seq == self.read_seq:
+            drop = n - self._free
+            self.read_seq += drop
+            self._claimed_seq = self.read_seq
+            self.dropped_oldest_samples += drop
+            while self._stamps and self._stamps[0][0] <= self.read_seq:
+                self._stamps.popleft()
+            self._write(chunk)
+        else:
+            self.dropped_newest_samples += n
+            raise queue.Full
+
+    def _write(self, chunk: np.ndarray):
+        """Copy into both mirror halves and publish (lock held, space checked)."""
+        n = len(chunk)
+        pos = self.write_seq % self.capacity
+        first = min(n, self.capacity - pos)
+        data = self._data
+        data[pos:pos + first] = chunk[:first]
+        data[pos + self.capacity:pos + self.capacity + first] = chunk[:first]
+        if first < n:
+            rest = n - first
+            data[:rest] = chunk[first:]
+            data[self.capacity:self.capacity + rest] = chunk[first:]
+        self.write_seq += n
+        self._cond.notify_all()
+
+    # --- Spill --------------------------------------------------------------
+
+    @property
+    def _spill_pending(self) -> int:
+        return self._spill_write - self._spill_read
+
+    def _spill_full(self, n: int) -> bool:
+        return bool(self.spill_max_samples) and self._spill_pending + n > self.spill_max_samples
+
+    def _spill_chunk(self, chunk: np.ndarray):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="stt-spill-", dir=self.spill_dir)
+            logger.warning(f"Audio ring full, spilling to disk ({self.spill_dir or tempfile.gettempdir()})")
+        self._spill.seek(4 * self._spill_write)
+        self._spill.write(np.ascontiguousarray(chunk, dtype=np.float32).tobytes())
+        self._spill_write += len(chunk)
+        self.spilled_samples += len(chunk)
+
+    def _restore_spill(self):
+        """Move spilled samples back into free ring space, oldest first (lock held)."""
+        n = min(self._spill_pending, self._free)
+        if n <= 0:
+            return
+        self._spill.seek(4 * self._spill_read)
+        self._write(np.frombuffer(self._spill.read(4 * n), dtype=np.float32))
+        self._spill_read += n
+        if not self._spill_pending:
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = self._spill_write = 0
+
+    # --- Consumer -----------------------------------------------------------
+
+    def acquire(self, max_samples: Optional[int] = None, block: bool = True,
+                timeout: Optional[float] = None) -> Tuple[int, np.ndarray]:
+        """Claim the unread samples as one zero-copy view.
+
+        The view stays valid until ``release()``.
+
+        Returns:
+            (sequence number of the first sample, view)
+
+        Raises:
+            queue.Empty: If no samples arrive in time
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            self._release_locked()
+            while self.write_seq == self.read_seq:
+                if self._spill_pending:
+                    self._restore_spill()
+                    continue
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Empty
+                self._cond.wait(remaining)
+            n = self.write_seq - self.read_seq
+            if max_samples is not None:
+                n = min(n, max_samples)
+            seq = self.read_seq
+            self._claimed_seq = seq + n
+        pos = seq % self.capacity
+        return seq, self._data[pos:pos + n]
+
+    def release(self) -> List[float]:
+        """Return the acquired span to the producer.
+
+        Returns:
+            Enqueue times of the chunks fully consumed (for queue-wait metrics)
+        """
+        with self._cond:
+            return self._release_locked()
+
+    def _release_locked(self) -> List[float]:
+        self.read_seq = self._claimed_seq
+        stamps = []
+        while self._stamps and self._stamps[0][0] <= self.read_seq:
+            stamps.append(self._stamps.popleft()[1])
+        self._cond.notify_all()
+        return stamps
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> np.ndarray:
+        """queue.Queue-style read: all unread samples as a new array."""
+        seq, view = self.acquire(block=block, timeout=timeout)
+        chunk = view.copy()
+        self.release()
+        return chunk
+
+    def get_nowait(self) -> np.ndarray:
+        return self.get(block=False)
+
+    # --- State --------------------------------------------------------------
+
+    @property
+    def _free(self) -> int:
+        return self.capacity - (self.write_seq - self.read_seq)
+
+    def available(self) -> int:
+        """Unread samples, including any spilled to disk."""
+        return self.write_seq - self.read_seq + self._spill_pending
+
+    def qsize(self) -> int:
+        """Backlog in chunks (rounded up)."""
+        return -(-self.available() // self.chunk_size)
+
+    def empty(self) -> bool:
+        return self.available() == 0
+
+    def full(self) -> bool:
+        return self._free < self.chunk_size
+
+    @property
+    def dropped_samples(self) -> int:
+        return self.dropped_oldest_samples + self.dropped_newest_samples
+
+    def get_status(self) -> dict:
+        """Backlog and exact loss counters."""
+        return {
+            "ring_policy": self.policy,
+            "ring_capacity": self.capacity,
+            "ring_available": self.available(),
+            "ring_dropped_samples": self.dropped_samples,
+            "ring_dropped_oldest_samples": self.dropped_oldest_samples,
+            "ring_dropped_newest_samples": self.dropped_newest_samples,
+            "ring_spilled_samples": self.spilled_samples,
+            "ring_spill_pending": self._spill_pending,
+        }
+
+    def close(self):
+        """Release the spill file."""
+        with self._cond:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._spill_read = self._spill_write = 0
+
+
+def create_audio_ring(ring_class=SPSCAudioRing, **kwargs) -> SPSCAudioRing:
+    """Capture -> transcriber ring sized and configured from Config.
+
+    Args:
+        ring_class: SPSCAudioRing or a subclass (e.g. the replay harness's TimedRing)
+        **kwargs: Extra constructor arguments for ``ring_class``
+    """
+    return ring_class(
+        capacity=Config.BUFFER_SIZE * Config.MAX_QUEUE_SIZE,
+        policy=Config.AUDIO_BACKPRESSURE,
+        chunk_size=Config.BUFFER_SIZE,
+        spill_dir=Config.AUDIO_SPILL_DIR or None,
+        spill_max_samples=int(Config.AUDIO_SPILL_MAX_SECONDS * Config.SAMPLE_RATE),
+        **kwargs
+    )
@@ -0,0 +1,254 @@
+"""
+Multi-session batched inference engine.
+Serves live windows from many concurrent streams with one shared model.
+"""
+
+import bisect
+import threading
+import time
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from config import Config
+from logger_config import get_logger
+from metrics_registry import metrics_registry
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = get_logger(__name__)
+
+
+class LiveWindow:
+    """A live window submitted to the engine and the options it is decoded with."""
+
+    def __init__(self, audio: np.ndarray, beam_size: int, initial_prompt: Optional[str] = None,
+                 context=None):
+        self.audio = audio
+        self.beam_size = beam_size
+        self.initial_prompt = initial_prompt
+        self.context = context  # Opaque value handed back with the result
+        self.submitted_at = time.time()
+        self.decode_seconds = 0.0  # Duration of the batched call that decoded it
+        self.latency = 0.0  # Submission to result
+
+    @property
+    def audio_seconds(self) -> float:
+        return len(self.audio) / Config.SAMPLE_RATE
+
+
+class InferenceSession:
+    """One stream served by the engine: its callback and latest pending window."""
+
+    def __init__(self, session_id: str, result_callback: Callable):
+        self.session_id = session_id
+        self.result_callback = result_callback
+        self.pending: Optional[LiveWindow] = None
+        self.windows_served = 0
+        self.windows_replaced = 0  # Pending windows superseded before decoding
+        self.windows_discarded = 0  # Pending windows withdrawn by the session
+
+
+class BatchedInferenceEngine:
+    """Gathers live windows from N sessions into one batched encoder/decoder call.
+
+    Each session has a single pending slot: submitting a new window replaces
+    the one still waiting (the newer window contains the older audio), so a
+    busy session can never occupy more than one slot of a batch. Batches are
+    filled oldest-submission-first, which keeps service fair across sessions.
+
+    The windows of a batch are laid end to end in one array and decoded by
+    faster-whisper's BatchedInferencePipeline with one clip per session.
+    The pipeline takes one beam size and one prompt per call, so windows
+    submitted with different options are decoded in separate calls.
+    Each result goes to its session's ``result_callback(text, window)``; the
+    window carries the submitter's ``context``, the decode time and the
+    latency.
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait: float = 0.05, beam_size: int = 1):
+        """
+        Initialize the engine.
+
+        Args:
+            model: Loaded faster-whisper WhisperModel shared by all sessions
+            max_batch_size: Maximum number of windows decoded per call
+            max_wait: Longest time (seconds) the oldest window waits for a batch to fill
+            beam_size: Beam size for windows submitted without one
+        """
+        self.model = model
+        self.pipeline = BatchedInferencePipeline(model=model)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.beam_size = beam_size
+
+        self.sessions: Dict[str, InferenceSession] = {}
+        self.is_running = False
+        self.batches_run = 0
+        self.windows_decoded = 0
+        self.error_count = 0
+        self._live_decode = metrics_registry.histogram("live_decode_seconds", "Live update decode time")
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, session_id: str, result_callback: Callable) -> InferenceSession:
+        """Add a session; its results are delivered to ``result_callback(text, window)``."""
+        with self._cond:
+            if session_id in self.sessions:
+                raise ValueError(f"Session already registered: {session_id}")
+            session = InferenceSession(session_id, result_callback)
+            self.sessions[session_id] = session
+            return session
+
+    def unregister(self, session_id: str):
+        """Remove a session and discard its pending window."""
+        with self._cond:
+            self.sessions.pop(session_id, None)
+
+    def submit(self, session_id: str, audio: np.ndarray, beam_size: Optional[int] = None,
+               initial_prompt: Optional[str] = None, context=None):
+        """Queue a live window for a session, replacing any window still pending.
+
+        The engine keeps a reference to ``audio``; pass a copy if the caller's
+        buffer will be overwritten.
+
+        Args:
+            session_id: Registered session
+            audio: Window to decode (only the last 30 s are used)
+            beam_size: Beam size for this window (the engine's default if None)
+            initial_prompt: Prompt for this window (context from earlier text)
+            context: Returned unchanged on the result's window
+        """
+        max_samples = Config.SAMPLE_RATE * 30  # Whisper decodes at most 30 s per clip
+        window = LiveWindow(audio[-max_samples:], beam_size or self.beam_size, initial_prompt, context)
+        with self._cond:
+            session = self.sessions.get(session_id)
+            if session is None:
+                raise KeyError(f"Unknown session: {session_id}")
+            if session.pending is not None:
+                # Latency counts from the oldest audio still waiting
+                window.submitted_at = session.pending.submitted_at
+                session.windows_replaced += 1
+            session.pending = window
+            self._cond.notify()
+
+    def discard(self, session_id: str) -> bool:
+        """Withdraw a session's pending window (e.g. its utterance was finalized).
+
+        Returns:
+            True if a window was pending
+        """
+        with self._cond:
+            session = self.sessions.get(session_id)
+            if session is None or session.pending is None:
+                return False
+            session.pending = None
+            session.windows_discarded += 1
+            return True
+
+    def start(self):
+        """Start the batching thread."""
+        with self._cond:
+            if self.is_running:
+                return
+            self.is_running = True
+        self._thread = threading.Thread(target=self._batch_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Batched inference engine started (max_batch_size={self.max_batch_size})")
+
+    def stop(self):
+        """Stop the batching thread."""
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        logger.info("Batched inference engine stopped")
+
+    def _batch_loop(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+            self._run_batch(batch)
+        logger.info("Batch loop ended")
+
+    def _collect_batch(self) -> Optional[List[Tuple[InferenceSession, LiveWindow]]]:
+        """Wait for pending windows and take up to max_batch_size, oldest first."""
+        with self._cond:
+            while self.is_running:
+                pending = [s for s in self.sessions.values() if s.pending is not None]
+                if pending:
+                    oldest = min(s.pending.submitted_at for s in pending)
+                    remaining = self.max_wait - (time.time() - oldest)
+                    if len(pending) >= self.max_batch_size or remaining <= 0:
+                        pending.sort(key=lambda s: s.pending.submitted_at)
+                        batch = []
+                        for session in pending[:self.max_batch_size]:
+                            batch.append((session, session.pending))
+                            session.pending = None
+                        return batch
+                    self._cond.wait(timeout=remaining)
+                else:
+                    self._cond.wait(timeout=0.5)
+            return None
+
+    def _run_batch(self, batch: List[Tuple[InferenceSession, LiveWindow]]):
+        """Decode a batch, one pipeline call per distinct (beam size, prompt)."""
+        groups: Dict[tuple, list] = {}
+        for session, window in batch:
+            groups.setdefault((window.beam_size, window.initial_prompt), []).append((session, window))
+        for (beam_size, initial_prompt), group in groups.items():
+            self._decode_group(group, beam_size, initial_prompt)
+        self.batches_run += 1
+
+    def _decode_group(self, group: List[Tuple[InferenceSession, LiveWindow]], beam_size: int,
+                      initial_prompt: Optional[str]):
+        sample_rate = Config.SAMPLE_RATE
+        audio = np.concatenate([window.audio for _, window in group])
+        clip_starts = []
+        clips = []
+        offset = 0
+        for _, window in group:
+            clip_starts.append(offset / sample_rate)
+            clips.append({"start": offset / sample_rate, "end": (offset + len(window.audio)) / sample_rate})
+            offset += len(window.audio)
+
+        texts = [[] for _ in group]
+        start_t = time.time()
+        try:
+            segments, info = self.pipeline.transcribe(
+                audio,
+                language="en",
+                beam_size=beam_size,
+                initial_prompt=initial_prompt,
+                batch_size=self.max_batch_size,
+                clip_timestamps=clips
+            )
+            for segment in segments:
+                index = bisect.bisect_right(clip_starts, segment.start + 1e-3) - 1
+                texts[max(0, index)].append(segment.text.strip())
+        except Exception as e:
+            logger.error(f"Error during batched live transcription: {e}")
+            self.error_count += 1
+            return
+
+        self.windows_decoded += len(group)
+        now = time.time()
+        self._live_decode.observe(now - start_t)
+        for (session, window), parts in zip(group, texts):
+            session.windows_served += 1
+            window.decode_seconds = now - start_t
+            window.latency = now - window.submitted_at
+            try:
+                session.result_callback(" ".join(p for p in parts if p), window)
+            except Exception as e:
+                logger.error(f"Session {session.session_id} callback failed: {e}")
+
+    def get_status(self) -> dict:
+        """Get engine metrics."""
+        with self._cond:
+            return {
+                "sessions": len(self.sessions),
+                "batches_run": self.batches_run,
+                "windows_decoded": self.windows_decoded,
+                "average_batch_size": self.windows_decoded / self.batches_run if self.batches_run else 0.0,
+                "error_count": self.error_count
+            }
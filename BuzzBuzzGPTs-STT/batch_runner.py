@@ -0,0 +1,198 @@
+"""
+Resumable batch transcription of directories of recordings.
+Files are scheduled across a process pool; every worker keeps one loaded
+model for all the files it handles.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import Config
+from logger_config import get_logger
+from typing import Dict, List, Optional
+
+logger = get_logger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma", ".webm", ".mp4", ".mkv")
+MANIFEST_NAME = "manifest.json"
+
+# Per-process model, loaded once by _init_worker
+_worker_model = None
+
+
+def write_atomic(path: str, text: str):
+    """Write ``text`` to ``path`` so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def find_recordings(input_dir: str, exclude_dir: Optional[str] = None) -> List[str]:
+    """Audio files under ``input_dir`` (relative paths, sorted)."""
+    exclude = os.path.abspath(exclude_dir) if exclude_dir else None
+    found = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude)
+        for name in files:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(found)
+
+
+def _init_worker(cpu_threads: int):
+    """Pool initializer: load the model once per worker process."""
+    global _worker_model
+    from logger_config import setup_logging
+    from transcriber import acquire_whisper_model
+
+    # Console only: the parent owns the rotating log files
+    setup_logging(log_level=Config.LOG_LEVEL, console=Config.ENABLE_CONSOLE_LOGGING, file_logging=False)
+    _worker_model = acquire_whisper_model(Config.get_final_model(), cpu_threads=cpu_threads)
+
+
+def _transcribe_file(source: str, output_path: str) -> dict:
+    """Pool task: transcribe one file and write its transcript atomically."""
+    from file_transcriber import FileTranscriber, format_offset
+
+    transcriber = FileTranscriber(lambda text, latency, timestamp, is_final=False: None, model=_worker_model)
+    segments = transcriber.transcribe(source)
+    lines = [f"[{format_offset(start)}] {text}" for start, end, text in segments]
+    write_atomic(output_path, "\n".join(lines) + "\n" if lines else "")
+    return {
+        "audio_seconds": transcriber.audio_seconds,
+        "processing_seconds": transcriber.processing_seconds,
+        "segments": len(segments),
+    }
+
+
+class BatchRunner:
+    """Transcribe every recording in a directory tree, resumably.
+
+    Transcripts mirror the input layout under ``output_dir`` as ``.txt``
+    files. ``manifest.json`` in ``output_dir`` records every finished file
+    and is rewritten atomically after each one, so a killed run picks up
+    where it stopped; failed files are retried on the next run.
+    """
+
+    def __init__(self, input_dir: str, output_dir: str, workers: Optional[int] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            input_dir: Directory searched recursively for recordings
+            output_dir: Directory for transcripts and the manifest
+            workers: Worker processes (Config.BATCH_WORKERS if None; 0 = one per core)
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        cores = os.cpu_count() or 1
+        workers = Config.BATCH_WORKERS if workers is None else workers
+        self.workers = max(1, workers or cores)
+        self.cpu_threads = max(1, cores // self.workers)  # Split the cores between workers
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.manifest: Dict[str, dict] = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _save_manifest(self):
+        write_atomic(self.manifest_path, json.dumps({"files": self.manifest}, indent=2, sort_keys=True))
+
+    def output_path(self, relative_path: str) -> str:
+        return os.path.join(self.output_dir, os.path.splitext(relative_path)[0] + ".txt")
+
+    def pending_files(self, recordings: Optional[List[str]] = None) -> List[str]:
+        """Recordings without a finished transcript."""
+        if recordings is None:
+            recordings = find_recordings(self.input_dir, exclude_dir=self.output_dir)
+        return [
+            path for path in recordings
+            if self.manifest.get(path, {}).get("status") != "done"
+            or not os.path.exists(self.output_path(path))
+        ]
+
+    def run(self) -> dict:
+        """Transcribe all pending files.
+
+        Returns:
+            Summary with file counts, files per hour and the real-time factor
+        """
+        recordings = find_recordings(self.input_dir, exclude_dir=self.output_dir)
+        pending = self.pending_files(recordings)
+        logger.info(
+            f"Batch: {len(pending)} file(s) to transcribe, {self.workers} worker(s) "
+            f"x {self.cpu_threads} thread(s)"
+        )
+        start_t = time.time()
+        done, failed, audio_seconds = 0, 0, 0.0
+
+        if pending:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                mp_context=mp.get_context("spawn"),  # Fork is unsafe with inference thread pools
+                initializer=_init_worker,
+                initargs=(self.cpu_threads,)
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        _transcribe_file, os.path.join(self.input_dir, path), self.output_path(path)
+                    ): path
+                    for path in pending
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        result = future.result()
+                        self.manifest[path] = {"status": "done", **result}
+                        done += 1
+                        audio_seconds += result["audio_seconds"]
+                    except Exception as e:
+                        logger.error(f"Failed to transcribe {path}: {e}")
+                        self.manifest[path] = {"status": "failed", "error": str(e)}
+                        failed += 1
+                    self._save_manifest()
+                    logger.info(f"Batch progress: {done + failed}/{len(pending)} ({path})")
+
+        elapsed = time.time() - start_t
+        summary = {
+            "files_done": done,
+            "files_failed": failed,
+            "files_skipped": len(recordings) - len(pending),
+            "elapsed_seconds": elapsed,
+            "audio_seconds": audio_seconds,
+            "files_per_hour": done * 3600.0 / elapsed if elapsed > 0 else 0.0,
+            "real_time_factor": elapsed / audio_seconds if audio_seconds else 0.0,
+        }
+        logger.info(f"Batch finished: {summary}")
+        return summary
+
+
+def run_batch_mode(input_dir: str, output_dir: Optional[str] = None, workers: Optional[int] = None) -> int:
+    """Transcribe a directory (``--batch`` mode).
+
+    Returns:
+        Process exit code (1 if any file failed)
+    """
+    output_dir = output_dir or os.path.join(input_dir, "transcripts")
+    summary = BatchRunner(input_dir, output_dir, workers).run()
+    print(
+        f"{summary['files_done']} done, {summary['files_failed']} failed, "
+        f"{summary['files_skipped']} already transcribed\n"
+        f"{summary['files_per_hour']:.1f} files/hour, "
+        f"{summary['audio_seconds']:.1f}s of audio in {summary['elapsed_seconds']:.1f}s "
+        f"(real-time factor {summary['real_time_factor']:.3f})"
+    )
+    return 1 if summary["files_failed"] else 0
@@ -0,0 +1,84 @@
+"""
+Benchmark: per-chunk cost of growing the utterance buffer.
+
+Simulates a 10-minute monologue arriving in CHUNK_DURATION chunks and compares
+the old np.concatenate growth against AudioRingBuffer appends. The ring buffer
+should show a flat per-chunk cost while concatenation grows linearly.
+
+Usage:
+    python benchmarks/bench_audio_buffer.py [--minutes 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from audio_buffer import AudioRingBuffer  # noqa: E402
+
+SAMPLE_RATE = 16000
+CHUNK_DURATION = 0.4
+
+
+def run_concatenate(chunks, report_every):
+    buffer = np.zeros(0, dtype=np.float32)
+    samples = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        buffer = np.concatenate([buffer, chunk])
+        samples.append(time.perf_counter() - start)
+    return _bucket(samples, report_every)
+
+
+def run_ring(chunks, report_every, capacity):
+    buffer = AudioRingBuffer(capacity)
+    samples = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        buffer.append(chunk)
+        buffer.tail(int(SAMPLE_RATE * 3.0))  # Live window view
+        samples.append(time.perf_counter() - start)
+    return _bucket(samples, report_every)
+
+
+def _bucket(samples, report_every):
+    """Average per-chunk time (microseconds) for each reporting interval."""
+    return [
+        1e6 * float(np.mean(samples[i:i + report_every]))
+        for i in range(0, len(samples), report_every)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utterance buffer growth benchmark")
+    parser.add_argument("--minutes", type=float, default=10.0, help="Monologue length in minutes")
+    args = parser.parse_args()
+
+    chunk_size = int(SAMPLE_RATE * CHUNK_DURATION)
+    num_chunks = int(args.minutes * 60 / CHUNK_DURATION)
+    chunk = np.random.default_rng(0).standard_normal(chunk_size).astype(np.float32) * 0.1
+    chunks = [chunk] * num_chunks
+    report_every = int(60 / CHUNK_DURATION)  # One row per simulated minute
+
+    capacity = num_chunks * chunk_size + chunk_size
+    concat = run_concatenate(chunks, report_every)
+    ring = run_ring(chunks, report_every, capacity=capacity)
+
+    print(f"{'minute':>6} {'concatenate (us/chunk)':>24} {'ring buffer (us/chunk)':>24}")
+    for minute, (c, r) in enumerate(zip(concat, ring), 1):
+        print(f"{minute:>6} {c:>24.1f} {r:>24.1f}")
+    print(f"\nTotal: concatenate {sum(concat) * report_every / 1e6:.2f}s, "
+          f"ring buffer {sum(ring) * report_every / 1e6:.2f}s")
+    # Concatenation briefly holds the old and the new utterance; the ring holds one
+    # copy, reserved up front and touched only as far as the utterance has grown
+    utterance_mb = num_chunks * chunk_size * 4 / 1e6
+    print(f"Memory: concatenate peaks at {2 * utterance_mb:.1f} MB, "
+          f"ring buffer reserves {AudioRingBuffer(capacity).nbytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: concurrent live streams served by BatchedInferenceEngine.
+
+Each simulated stream submits a live window every CHUNK_DURATION seconds.
+For every stream count the benchmark measures submit-to-callback latency and
+reports the largest count whose p95 latency meets the target, as streams per
+CPU core.
+
+Usage:
+    python benchmarks/bench_batch_engine.py [--model tiny.en] [--wav speech.wav]
+        [--streams 1,2,4,8,16] [--target-latency 1.0] [--duration 20]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from faster_whisper import WhisperModel  # noqa: E402
+
+from batch_engine import BatchedInferenceEngine  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def load_audio(path, seconds):
+    """Load a 16 kHz mono WAV, or synthesize a voiced-like signal."""
+    sample_rate = Config.SAMPLE_RATE
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != sample_rate or wav.getsampwidth() != 2:
+                raise SystemExit("WAV must be 16-bit PCM at 16 kHz")
+            data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+            data = data.reshape(-1, wav.getnchannels()).mean(axis=1)
+            return (data / 32768.0).astype(np.float32)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    return (0.1 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def run_streams(engine, audio, num_streams, duration, window_seconds):
+    sample_rate = Config.SAMPLE_RATE
+    chunk = int(Config.CHUNK_DURATION * sample_rate)
+    window = int(window_seconds * sample_rate)
+    latencies = []
+    lock = threading.Lock()
+
+    def on_result(text, window):
+        with lock:
+            latencies.append(window.latency)
+
+    def stream(index):
+        session_id = f"bench-{index}"
+        engine.register(session_id, on_result)
+        position = (index * chunk * 7) % max(1, len(audio) - window)
+        next_submit = time.time()
+        end = next_submit + duration
+        while time.time() < end:
+            position = (position + chunk) % max(1, len(audio) - window)
+            engine.submit(session_id, audio[position:position + window])
+            next_submit += Config.CHUNK_DURATION
+            time.sleep(max(0.0, next_submit - time.time()))
+        engine.unregister(session_id)
+
+    threads = [threading.Thread(target=stream, args=(i,)) for i in range(num_streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies) if latencies else np.array([np.inf])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched multi-session throughput benchmark")
+    parser.add_argument("--model", default="tiny.en")
+    parser.add_argument("--wav", default=None, help="16 kHz speech WAV (synthetic audio if omitted)")
+    parser.add_argument("--streams", default="1,2,4,8,16")
+    parser.add_argument("--target-latency", type=float, default=1.0, help="p95 latency target (s)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per stream count")
+    parser.add_argument("--window", type=float, default=3.0, help="Live window (s)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-wait", type=float, default=0.05)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    model = WhisperModel(args.model, device="cpu", compute_type="int8", cpu_threads=cores)
+    audio = load_audio(args.wav, seconds=60)
+    engine = BatchedInferenceEngine(model, max_batch_size=args.batch_size, max_wait=args.max_wait)
+    engine.start()
+
+    best = 0
+    print(f"{'streams':>8} {'p50 (s)':>9} {'p95 (s)':>9} {'windows':>8} {'avg batch':>10}")
+    try:
+        for num_streams in [int(n) for n in args.streams.split(",")]:
+            before = engine.get_status()
+            latencies = run_streams(engine, audio, num_streams, args.duration, args.window)
+            after = engine.get_status()
+            batches = after["batches_run"] - before["batches_run"]
+            windows = after["windows_decoded"] - before["windows_decoded"]
+            p50, p95 = np.percentile(latencies, [50, 95])
+            print(f"{num_streams:>8} {p50:>9.3f} {p95:>9.3f} {windows:>8} "
+                  f"{(windows / batches if batches else 0):>10.2f}")
+            if p95 <= args.target_latency:
+                best = num_streams
+    finally:
+        engine.stop()
+
+    print(f"\nMax streams at p95 <= {args.target_latency:.2f}s: {best} "
+          f"({best / cores:.2f} streams per core, {cores} cores)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: CPU cost and quality of the in-process polyphase resampler.
+
+Common device rates are streamed through PolyphaseResampler in capture-sized
+blocks (CHUNK_DURATION) and converted to SAMPLE_RATE. For each rate the
+benchmark reports CPU milliseconds per second of audio and two quality
+checks:
+- the worst error on a 1 kHz tone (passband accuracy, after the filter delay)
+- the level of a tone above the output Nyquist frequency, which must be
+  filtered out rather than folded into the speech band (aliasing)
+
+Usage:
+    python benchmarks/bench_resampler.py [--seconds 30] [--rates 44100 48000 96000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from audio_dsp import PolyphaseResampler  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def stream(resampler, audio, block):
+    """Resample ``audio`` block by block; returns (output, CPU seconds)."""
+    outputs = []
+    cpu = 0.0
+    for i in range(0, len(audio), block):
+        start = time.process_time()
+        out = resampler.process(audio[i:i + block])
+        cpu += time.process_time() - start
+        outputs.append(out.copy())
+    return np.concatenate(outputs), cpu
+
+
+def tone(frequency, rate, seconds):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def measure(rate, seconds):
+    out_rate = Config.SAMPLE_RATE
+    block = round(Config.BUFFER_SIZE * rate / out_rate)
+    resampler = PolyphaseResampler(rate, out_rate, max_block=block)
+    settle = resampler.taps  # Skip the filter's start-up transient
+
+    output, cpu = stream(resampler, tone(1000, rate, seconds), block)
+    t = np.arange(len(output)) / out_rate - resampler.delay
+    error = np.abs(output - 0.5 * np.sin(2 * np.pi * 1000 * t))[settle:-settle].max()
+
+    alias_db = None
+    if rate > out_rate:
+        resampler.reset()
+        above_nyquist = min(0.45 * rate, 0.75 * out_rate)
+        aliased, _ = stream(resampler, tone(above_nyquist, rate, 2.0), block)
+        level = np.sqrt(np.mean(aliased[settle:] ** 2)) / (0.5 / np.sqrt(2))
+        alias_db = 20 * np.log10(max(level, 1e-12))
+
+    return {
+        "phases": resampler.up,
+        "taps": resampler.taps,
+        "cpu_ms_per_s": 1e3 * cpu / seconds,
+        "max_error": error,
+        "alias_db": alias_db,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polyphase resampler CPU/quality benchmark")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio streamed per rate")
+    parser.add_argument("--rates", type=int, nargs="+", default=[22050, 44100, 48000, 96000],
+                        help="Input (device) sample rates")
+    args = parser.parse_args()
+
+    print(f"{'rate':>7} {'phases':>7} {'taps':>5} {'CPU ms/s':>9} {'1 kHz err':>10} {'alias dB':>9}")
+    for rate in args.rates:
+        r = measure(rate, args.seconds)
+        alias = f"{r['alias_db']:>9.1f}" if r["alias_db"] is not None else f"{'-':>9}"
+        print(f"{rate:>7} {r['phases']:>7} {r['taps']:>5} {r['cpu_ms_per_s']:>9.3f} "
+              f"{r['max_error']:>10.2e} {alias}")
+    print(f"\nCPU ms/s is processing time per second of audio "
+          f"({Config.CHUNK_DURATION:.1f} s blocks to {Config.SAMPLE_RATE} Hz mono)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: decode calls saved by the neural VAD on mixed system audio.
+
+Every chunk that passes the VAD triggers a live Whisper decode, so the number
+of passed chunks is the number of decode calls. The benchmark runs the same
+audio through the energy gate and the Silero VAD and reports passed chunks
+and VAD CPU cost per chunk.
+
+Without --wav a synthetic mix of music-like chords, broadband game-like
+noise, quiet passages and silence is used (no speech, so every decode the
+energy gate lets through is wasted). Use --wav with a real recording of
+system audio to measure on representative content.
+
+Usage:
+    python benchmarks/bench_vad.py [--wav mixed.wav] [--seconds 120]
+"""
+
+import argparse
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import Config  # noqa: E402
+from vad import EnergyVAD, SileroVAD  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_mix(seconds, seed=0):
+    """Alternate 5 s sections of chords, noise bursts, quiet tone and silence."""
+    rng = np.random.default_rng(seed)
+    section = 5 * SAMPLE_RATE
+    t = np.arange(section) / SAMPLE_RATE
+    kinds = [
+        lambda: 0.2 * sum(np.sin(2 * np.pi * f * t) for f in (261.6, 329.6, 392.0)) / 3,  # Music
+        lambda: 0.1 * rng.standard_normal(section) * (0.5 + 0.5 * np.sin(2 * np.pi * 2 * t)),  # Game noise
+        lambda: 0.01 * np.sin(2 * np.pi * 440 * t),  # Quiet tone
+        lambda: np.zeros(section),  # Silence
+    ]
+    parts = [kinds[i % len(kinds)]() for i in range(int(seconds // 5))]
+    return np.concatenate(parts).astype(np.float32)
+
+
+def load_wav(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getsampwidth() != 2:
+            raise SystemExit("WAV must be 16-bit PCM at 16 kHz")
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        data = data.reshape(-1, wav.getnchannels()).mean(axis=1)
+        return (data / 32768.0).astype(np.float32)
+
+
+def run(vad, audio, chunk_size):
+    passed = 0
+    elapsed = 0.0
+    num_chunks = len(audio) // chunk_size
+    for i in range(num_chunks):
+        chunk = audio[i * chunk_size:(i + 1) * chunk_size]
+        start = time.perf_counter()
+        speech = vad.is_speech(chunk)
+        elapsed += time.perf_counter() - start
+        passed += int(speech)
+    return passed, num_chunks, 1e6 * elapsed / max(1, num_chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD decode-savings benchmark")
+    parser.add_argument("--wav", default=None, help="16 kHz mixed-content WAV (synthetic if omitted)")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Synthetic audio length")
+    args = parser.parse_args()
+
+    audio = load_wav(args.wav) if args.wav else synthetic_mix(args.seconds)
+    chunk_size = int(SAMPLE_RATE * Config.CHUNK_DURATION)
+
+    results = {
+        "energy": run(EnergyVAD(Config.VAD_THRESHOLD), audio, chunk_size),
+        "silero": run(SileroVAD(threshold=Config.VAD_SPEECH_THRESHOLD), audio, chunk_size),
+    }
+
+    print(f"{'vad':>8} {'decode calls':>13} {'chunks':>8} {'us/chunk':>10}")
+    for name, (passed, total, cost) in results.items():
+        print(f"{name:>8} {passed:>13} {total:>8} {cost:>10.1f}")
+    saved = results["energy"][0] - results["silero"][0]
+    print(f"\nDecode calls saved by Silero: {saved} "
+          f"({100.0 * saved / max(1, results['energy'][0]):.1f}% of energy-gated decodes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Load test: concurrent client sessions against a running streaming server.
+
+Each client connects, sends START, streams 16-bit PCM in CHUNK_DURATION
+frames paced at ``--speed`` x real time, then sends END and waits for DONE.
+Per session it records time to READY, the server-reported latency of every
+partial, the interval between partials (update rate), the END -> DONE time
+(final-pass latency) and whether the server refused the session. The run
+reports p50/p95/p99 of each and whether the sessions kept up with real time.
+
+Start the server first (``python stream_server.py`` or ``python main.py --serve``).
+
+Usage:
+    python benchmarks/load_test_server.py [--sessions 8] [--wav speech.wav]
+        [--duration 30] [--speed 1.0] [--host 127.0.0.1] [--port 8765] [--unix PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import Config  # noqa: E402
+from replay import summarize  # noqa: E402
+import stream_server as ss  # noqa: E402
+
+
+def load_pcm(path, seconds):
+    """16-bit mono PCM bytes from a 16 kHz WAV, or a synthesized voiced-like signal."""
+    sample_rate = Config.SAMPLE_RATE
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != sample_rate or wav.getsampwidth() != 2:
+                raise SystemExit("WAV must be 16-bit PCM at 16 kHz")
+            data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+            return data.reshape(-1, wav.getnchannels())[:, 0].astype("<i2").tobytes()
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    return (3000 * envelope * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+async def run_session(args, pcm, index):
+    result = {"refused": False, "partial_latencies": [], "partial_intervals": [], "finals": 0}
+    start = time.perf_counter()
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(ss.encode_frame(ss.MSG_START, json.dumps(
+        {"sample_rate": Config.SAMPLE_RATE, "encoding": "s16le", "channels": 1}
+    ).encode()))
+    msg_type, payload = await ss.read_frame(reader)
+    if msg_type != ss.MSG_READY:
+        result["refused"] = True
+        writer.close()
+        return result
+    result["ready"] = time.perf_counter() - start
+
+    stream_start = time.perf_counter()
+
+    async def receive():
+        last_partial = None
+        while True:
+            msg_type, payload = await ss.read_frame(reader)
+            if msg_type in (None, ss.MSG_DONE, ss.MSG_ERROR):
+                return msg_type
+            if msg_type == ss.MSG_PARTIAL:
+                now = time.perf_counter()
+                result["partial_latencies"].append(ss.decode_result(payload)[1])
+                if last_partial is not None:
+                    result["partial_intervals"].append(now - last_partial)
+                last_partial = now
+            elif msg_type == ss.MSG_FINAL:
+                result["finals"] += 1
+
+    receiver = asyncio.ensure_future(receive())
+    chunk_bytes = Config.BUFFER_SIZE * 2
+    offset = (index * chunk_bytes * 7) % max(chunk_bytes, len(pcm) - chunk_bytes)
+    pcm = pcm[offset:] + pcm[:offset]  # Sessions start at different points of the audio
+    for i in range(0, len(pcm), chunk_bytes):
+        writer.write(ss.encode_frame(ss.MSG_AUDIO, pcm[i:i + chunk_bytes]))
+        await writer.drain()  # Server backpressure pauses us here
+        sent_seconds = (i + chunk_bytes) / 2 / Config.SAMPLE_RATE
+        delay = stream_start + sent_seconds / args.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    result["stream_seconds"] = time.perf_counter() - stream_start
+
+    end_sent = time.perf_counter()
+    writer.write(ss.encode_frame(ss.MSG_END))
+    await writer.drain()
+    result["closed_with"] = await receiver
+    result["end_to_done"] = time.perf_counter() - end_sent
+    writer.close()
+    return result
+
+
+async def run(args):
+    pcm = load_pcm(args.wav, args.duration)
+    audio_seconds = len(pcm) / 2 / Config.SAMPLE_RATE
+    results = await asyncio.gather(*(run_session(args, pcm, i) for i in range(args.sessions)))
+    served = [r for r in results if not r["refused"]]
+    realtime = audio_seconds / args.speed
+    report = {
+        "sessions": args.sessions,
+        "refused": len(results) - len(served),
+        "audio_seconds": round(audio_seconds, 1),
+        "speed": args.speed,
+        "ready_seconds": summarize([r["ready"] for r in served]),
+        "partial_latency_seconds": summarize([v for r in served for v in r["partial_latencies"]]),
+        "partial_interval_seconds": summarize([v for r in served for v in r["partial_intervals"]]),
+        "end_to_done_seconds": summarize([r["end_to_done"] for r in served]),
+        "finals": sum(r["finals"] for r in served),
+        # Streaming slower than the pacing means the server pushed back
+        "kept_up": all(r["stream_seconds"] <= realtime * 1.05 for r in served),
+        "errors": sum(r.get("closed_with") != ss.MSG_DONE for r in served),
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming server load test")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent client sessions")
+    parser.add_argument("--wav", default=None, help="16 kHz 16-bit WAV to stream (default: synthetic)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of synthetic audio")
+    parser.add_argument("--speed", type=float, default=1.0, help="Streaming speed (x real time)")
+    parser.add_argument("--host", default=Config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVER_PORT)
+    parser.add_argument("--unix", default=Config.SERVER_SOCKET or None, help="Unix socket path")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Microbenchmarks for the per-chunk hot paths, with JSON results and a
+regression check.
+
+Cases cover the capture loop (float32 conversion and downmix, the RMS
+computations, the VAD gate), the utterance buffer, the audio queue and ring
+hand-off and the display update. Each case reports the median and minimum
+time per call over several repeats, plus the bytes one call allocates
+(tracemalloc) so allocation-free paths stay that way.
+
+Usage:
+    python benchmarks/microbench.py run [--output results.json] [--filter capture] [--quick] [--gui]
+    python benchmarks/microbench.py compare baseline.json results.json [--threshold 10]
+
+`compare` exits with status 1 when any case's median got slower than the
+threshold (percent), so it can gate a CI job or a local before/after check.
+"""
+
+import argparse
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import Config  # noqa: E402
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark: the decorated function returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _stereo_block():
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal((Config.BUFFER_SIZE, 2)) * 0.1).astype(np.float32)
+
+
+@case("capture.astype_downmix")
+def bench_astype_downmix(args):
+    """Reference: the original astype + mean/flatten downmix."""
+    audio_data = _stereo_block()
+
+    def run():
+        audio_fp32 = audio_data.astype(np.float32)
+        if len(audio_fp32.shape) > 1 and audio_fp32.shape[1] > 1:
+            return np.mean(audio_fp32, axis=1)
+        return audio_fp32.flatten()
+    return run
+
+
+@case("capture.downmix_into")
+def bench_downmix(args):
+    from audio_dsp import downmix_into
+    audio_data = _stereo_block()
+    scratch = np.empty(Config.BUFFER_SIZE, dtype=np.float32)
+    return lambda: downmix_into(audio_data, scratch)
+
+
+@case("capture.resample_48k")
+def bench_resample(args):
+    """Native-rate capture: one 48 kHz chunk to SAMPLE_RATE."""
+    from audio_dsp import PolyphaseResampler
+    frames = Config.BUFFER_SIZE * 48000 // Config.SAMPLE_RATE
+    resampler = PolyphaseResampler(48000, Config.SAMPLE_RATE, max_block=frames)
+    block = np.random.default_rng(0).standard_normal(frames).astype(np.float32) * 0.1
+    return lambda: resampler.process(block)
+
+
+@case("capture.rms_squared")
+def bench_rms_squared(args):
+    """Reference: the original np.mean(chunk**2) RMS."""
+    chunk = _stereo_block().mean(axis=1)
+    return lambda: np.sqrt(np.mean(chunk**2))
+
+
+@case("capture.rms")
+def bench_rms(args):
+    from audio_dsp import rms
+    chunk = _stereo_block().mean(axis=1)
+    return lambda: rms(chunk)
+
+
+@case("capture.vad_gate")
+def bench_vad_gate(args):
+    from vad import EnergyVAD
+    vad = EnergyVAD(Config.VAD_THRESHOLD)
+    chunk = _stereo_block().mean(axis=1)
+    return lambda: vad.is_speech(chunk)
+
+
+@case("capture.chunk_total_original")
+def bench_capture_chunk_original(args):
+    """Reference: the original per-chunk path (two RMS passes, fresh arrays, queue.Queue)."""
+    vad_threshold = Config.VAD_THRESHOLD
+    audio_data = _stereo_block()
+    sink = queue.Queue()
+
+    def run():
+        audio_fp32 = audio_data.astype(np.float32)
+        audio_chunk = np.mean(audio_fp32, axis=1)
+        np.sqrt(np.mean(audio_chunk**2))  # Periodic level monitoring
+        if np.sqrt(np.mean(audio_chunk**2)) >= vad_threshold:  # Energy VAD
+            sink.put(audio_chunk, timeout=0.1)
+            sink.get_nowait()
+    return run
+
+
+@case("capture.chunk_total")
+def bench_capture_chunk(args):
+    """Everything the capture loop does per chunk between record() and put()."""
+    from audio_dsp import downmix_into, rms
+    from audio_ring import create_audio_ring
+    from vad import EnergyVAD
+    vad = EnergyVAD(Config.VAD_THRESHOLD)
+    audio_data = _stereo_block()
+    scratch = np.empty(Config.BUFFER_SIZE, dtype=np.float32)
+    ring = create_audio_ring()
+
+    def run():
+        audio_chunk = downmix_into(audio_data, scratch)
+        level = rms(audio_chunk)
+        if vad.is_speech(audio_chunk, level):
+            ring.put(audio_chunk, timeout=0.1)
+            ring.acquire(timeout=0.2)
+            ring.release()
+    return run
+
+
+@case("buffer.append_tail")
+def bench_buffer(args):
+    from audio_buffer import AudioRingBuffer
+    chunk = _stereo_block().mean(axis=1)
+    capacity = int(Config.SAMPLE_RATE * Config.WINDOW_DURATION) + Config.BUFFER_SIZE * (Config.MAX_QUEUE_SIZE + 1)
+    buffer = AudioRingBuffer(capacity)
+    live_samples = int(Config.SAMPLE_RATE * Config.LIVE_WINDOW_DURATION)
+
+    def run():
+        if len(buffer) + len(chunk) > capacity:
+            buffer.clear()
+        buffer.append(chunk)
+        return buffer.tail(live_samples)
+    return run
+
+
+@case("buffer.concatenate_10min")
+def bench_concatenate(args):
+    """Reference: the original np.concatenate growth at a 10-minute utterance."""
+    chunk = _stereo_block().mean(axis=1)
+    buffer = np.zeros(int(Config.SAMPLE_RATE * 600), dtype=np.float32)
+    return lambda: np.concatenate([buffer, chunk])
+
+
+@case("queue.put_get")
+def bench_queue(args):
+    q = queue.Queue(maxsize=Config.MAX_QUEUE_SIZE)
+    chunk = _stereo_block().mean(axis=1)
+
+    def run():
+        q.put(chunk, timeout=0.1)
+        return q.get(timeout=0.2)
+    return run
+
+
+@case("ring.put_acquire")
+def bench_ring(args):
+    from audio_ring import create_audio_ring
+    ring = create_audio_ring()
+    chunk = _stereo_block().mean(axis=1)
+
+    def run():
+        ring.put(chunk, timeout=0.1)
+        ring.acquire(timeout=0.2)
+        return ring.release()
+    return run
+
+
+class _Widget:
+    """No-op stand-in for CTk widgets (display logic without Tk rendering)."""
+
+    def configure(self, **kwargs):
+        pass
+
+    def insert(self, *args):
+        pass
+
+    def see(self, *args):
+        pass
+
+
+@case("display.perform_update")
+def bench_display(args):
+    from display import TranscriptionDisplay
+    display = TranscriptionDisplay()
+    if args.gui:
+        display._setup_ui()
+        display.root.withdraw()
+    else:
+        for name in ("text_area", "live_label", "latency_label", "avg_latency_label",
+                     "final_latency_label", "processed_label"):
+            setattr(display, name, _Widget())
+    text = "the quick brown fox jumps over the lazy dog " * 5
+    counter = [0]
+
+    def run():
+        counter[0] += 1
+        display._perform_update(text, 0.25, time.time(), is_final=counter[0] % 20 == 0)
+    return run
+
+
+def _allocated_bytes(run, calls=10):
+    """Peak bytes allocated during one call (beyond what the call leaves behind).
+
+    numpy reports its data buffers to tracemalloc, so an allocation-free
+    path measures close to zero. The first calls warm caches and are not
+    counted.
+    """
+    run()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return sorted(peaks)[len(peaks) // 2]
+
+
+def _measure(run, quick):
+    """Median and min seconds per call, and allocated bytes per call."""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()  # Calls per repeat so one repeat takes >= 0.2 s
+    if quick:
+        number = max(1, number // 4)
+    repeats = timer.repeat(repeat=3 if quick else 7, number=number)
+    per_call = sorted(t / number for t in repeats)
+    return {
+        "median_us": round(1e6 * per_call[len(per_call) // 2], 3),
+        "min_us": round(1e6 * per_call[0], 3),
+        "alloc_bytes": _allocated_bytes(run),
+        "number": number,
+        "repeat": len(per_call),
+    }
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "chunk_samples": Config.BUFFER_SIZE,
+    }
+
+
+def run_suite(args):
+    results = {}
+    for name, setup in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            results[name] = _measure(setup(args), args.quick)
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}  # e.g. no customtkinter for the display case
+        print(f"{name:<30} " + (
+            f"{results[name]['median_us']:>10.2f} us  (min {results[name]['min_us']:.2f})"
+            f"  {results[name]['alloc_bytes']:>9} B alloc"
+            if "median_us" in results[name] else f"skipped: {results[name]['skipped']}"
+        ))
+
+    report = {"meta": _metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved {args.output}")
+    return 0
+
+
+def compare(baseline, current, threshold):
+    """Rows of (case, base_us, new_us, change_percent, regressed) for cases in both files."""
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or "median_us" not in old or "median_us" not in new:
+            continue
+        change = 100.0 * (new["median_us"] - old["median_us"]) / old["median_us"]
+        rows.append((name, old["median_us"], new["median_us"], change, change > threshold))
+    return rows
+
+
+def run_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'case':<28} {'base (us)':>12} {'new (us)':>12} {'change':>9}")
+    for name, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<28} {old:>12.2f} {new:>12.2f} {change:>+8.1f}%{flag}")
+
+    regressions = [row for row in rows if row[4]]
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0f}% "
+          f"(baseline {baseline['meta'].get('commit')}, current {current['meta'].get('commit')})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite")
+    run.add_argument("--output", default=None, help="Write JSON results here")
+    run.add_argument("--filter", default=None, help="Only run cases whose name contains this")
+    run.add_argument("--quick", action="store_true", help="Fewer repeats (noisier)")
+    run.add_argument("--gui", action="store_true", help="Time display updates on real Tk widgets")
+
+    cmp = commands.add_parser("compare", help="Compare two result files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+
+    args = parser.parse_args()
+    sys.exit(run_suite(args) if args.command == "run" else run_compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,12 @@ class Config:
     """Application configuration with environment variable support."""
     
     # Whisper Model Settings
-    WHISPER_MODEL = ConfigValidator.get_str(
-        'WHISPER_MODEL', 
-        'tiny.en',
-        allowed_values=['tiny', 'tiny.en', 'base', 'base.en', 'small', 'small.en', 'medium', 'medium.en', 'large']
-    )
+    WHISPER_MODELS = ['tiny', 'tiny.en', 'base', 'base.en', 'small', 'small.en', 'medium', 'medium.en', 'large']
+    WHISPER_MODEL = ConfigValidator.get_str('WHISPER_MODEL', 'tiny.en', allowed_values=WHISPER_MODELS)
+    # Two-tier mode: a small model for live previews, a larger one for the final
+    # pass. Empty means WHISPER_MODEL; equal names share one loaded model.
+    LIVE_MODEL = ConfigValidator.get_str('LIVE_MODEL', '', allowed_values=[''] + WHISPER_MODELS)
+    FINAL_MODEL = ConfigValidator.get_str('FINAL_MODEL', '', allowed_values=[''] + WHISPER_MODELS)
     WHISPER_ENGINE = "faster-whisper" 
     WHISPER_LANGUAGE = ConfigValidator.get_str('WHISPER_LANGUAGE', 'en')
     
@@ -31,15 +32,83 @@ class Config:
     BUFFER_SIZE = int(SAMPLE_RATE * CHUNK_DURATION)
     WINDOW_SIZE = int(SAMPLE_RATE * WINDOW_DURATION)
     MAX_QUEUE_SIZE = ConfigValidator.get_int('MAX_QUEUE_SIZE', 5, min_val=1, max_val=50)
+    # Nonzero: record at the device's native rate and resample to SAMPLE_RATE in-process,
+    # using this rate (e.g. 48000) for devices that cannot report theirs;
+    # 0 = record at SAMPLE_RATE and let the audio backend convert
+    CAPTURE_SAMPLE_RATE = ConfigValidator.get_int('CAPTURE_SAMPLE_RATE', 0, min_val=0, max_val=384000)
+    # Default-device check interval; a fallback where server notifications (pactl) are available
+    DEVICE_POLL_INTERVAL = ConfigValidator.get_float('DEVICE_POLL_INTERVAL', 5.0, min_val=0.5, max_val=60.0)
+    # Capture several sources at once (loopback = system audio, mic = microphone);
+    # 'separate' transcribes each source on its own attributed stream, 'mix' mixes them first
+    CAPTURE_SOURCES = ConfigValidator.get_str(
+        'CAPTURE_SOURCES', 'loopback', allowed_values=['loopback', 'mic', 'loopback,mic', 'mic,loopback']
+    )
+    MULTI_SOURCE_MODE = ConfigValidator.get_str('MULTI_SOURCE_MODE', 'separate', allowed_values=['separate', 'mix'])
+    MIC_DEVICE = ConfigValidator.get_str('MIC_DEVICE', '')  # Microphone name (empty = default microphone)
+    # asyncio API (TranscriptionStream): events buffered for a slow consumer, and what to drop
+    # beyond that: drop_partials | drop_oldest | drop_newest | raise (StreamOverflowError)
+    EVENT_BUFFER_SIZE = ConfigValidator.get_int('EVENT_BUFFER_SIZE', 100, min_val=1, max_val=100000)
+    EVENT_OVERFLOW = ConfigValidator.get_str(
+        'EVENT_OVERFLOW', 'drop_partials', allowed_values=['drop_partials', 'drop_oldest', 'drop_newest', 'raise']
+    )
+    # Streaming server (stream_server.py / --serve): localhost TCP, or a Unix socket if SERVER_SOCKET is set
+    SERVER_HOST = ConfigValidator.get_str('SERVER_HOST', '127.0.0.1')
+    SERVER_PORT = ConfigValidator.get_int('SERVER_PORT', 8765, min_val=0, max_val=65535)
+    SERVER_SOCKET = ConfigValidator.get_str('SERVER_SOCKET', '')
+    SERVER_MAX_SESSIONS = ConfigValidator.get_int('SERVER_MAX_SESSIONS', 8, min_val=1, max_val=256)
+    # Capture -> transcriber ring (MAX_QUEUE_SIZE chunks) when the transcriber falls behind:
+    # spill (overflow to a temp file in AUDIO_SPILL_DIR, nothing lost up to AUDIO_SPILL_MAX_SECONDS)
+    # | block (up to the put timeout) | drop_oldest | drop_newest
+    AUDIO_BACKPRESSURE = ConfigValidator.get_str(
+        'AUDIO_BACKPRESSURE', 'spill', allowed_values=['block', 'drop_oldest', 'drop_newest', 'spill']
+    )
+    AUDIO_SPILL_DIR = ConfigValidator.get_str('AUDIO_SPILL_DIR', '')
+    AUDIO_SPILL_MAX_SECONDS = ConfigValidator.get_float('AUDIO_SPILL_MAX_SECONDS', 300.0, min_val=1.0, max_val=36000.0)
+    
+    # Live Streaming Settings
+    # 'window': re-transcribe the last few seconds on every update
+    # 'local_agreement': commit words two consecutive passes agree on, decode only the rest
+    LIVE_MODE = ConfigValidator.get_str('LIVE_MODE', 'window', allowed_values=['window', 'local_agreement'])
+    LIVE_WINDOW_DURATION = ConfigValidator.get_float('LIVE_WINDOW_DURATION', 3.0, min_val=1.0, max_val=30.0)
+    LIVE_LATENCY_BUDGET = ConfigValidator.get_float('LIVE_LATENCY_BUDGET', 0.8, min_val=0.1, max_val=10.0)
+    AGREEMENT_MAX_TAIL = ConfigValidator.get_float('AGREEMENT_MAX_TAIL', 12.0, min_val=3.0, max_val=30.0)
     
     # Performance Settings
     USE_GPU = ConfigValidator.get_bool('USE_GPU', True)
     FP16 = ConfigValidator.get_bool('FP16', True)
     BEAM_SIZE = ConfigValidator.get_int('BEAM_SIZE', 1, min_val=1, max_val=10)
     
+    # Final Pass Settings (long utterances are split at quiet points and batch-decoded)
+    FINAL_SEGMENT_DURATION = ConfigValidator.get_float('FINAL_SEGMENT_DURATION', 20.0, min_val=5.0, max_val=30.0)
+    FINAL_BATCH_SIZE = ConfigValidator.get_int('FINAL_BATCH_SIZE', 4, min_val=1, max_val=32)
+    FINALIZE_QUEUE_SIZE = ConfigValidator.get_int('FINALIZE_QUEUE_SIZE', 4, min_val=1, max_val=32)
+    # Concurrent decodes per model (live + finalization workers share the weights)
+    MODEL_NUM_WORKERS = ConfigValidator.get_int('MODEL_NUM_WORKERS', 2, min_val=1, max_val=8)
+    
+    # File Mode (--input): audio is decoded and segmented this many seconds at a time
+    FILE_BLOCK_DURATION = ConfigValidator.get_float('FILE_BLOCK_DURATION', 120.0, min_val=30.0, max_val=1800.0)
+    # Batch Mode (--batch): worker processes, 0 = one per CPU core
+    BATCH_WORKERS = ConfigValidator.get_int('BATCH_WORKERS', 0, min_val=0, max_val=256)
+    
+    # Model Cache (shared models across sessions)
+    MODEL_CACHE_MAX_MB = ConfigValidator.get_float('MODEL_CACHE_MAX_MB', 2048.0, min_val=0.0, max_val=65536.0)
+    MODEL_IDLE_TIMEOUT = ConfigValidator.get_float('MODEL_IDLE_TIMEOUT', 600.0, min_val=0.0, max_val=86400.0)
+    ENABLE_WARMUP = ConfigValidator.get_bool('ENABLE_WARMUP', True)
+    
+    # Transcription Backend
+    # 'thread': transcribe in this process; 'process': worker processes fed via shared memory
+    TRANSCRIBER_BACKEND = ConfigValidator.get_str('TRANSCRIBER_BACKEND', 'thread', allowed_values=['thread', 'process'])
+    WORKER_PROCESSES = ConfigValidator.get_int('WORKER_PROCESSES', 1, min_val=1, max_val=32)
+    WORKER_RING_SECONDS = ConfigValidator.get_float('WORKER_RING_SECONDS', 30.0, min_val=2.0, max_val=600.0)
+    
     # Voice Activity Detection
     ENABLE_VAD = ConfigValidator.get_bool('ENABLE_VAD', True)
     VAD_THRESHOLD = ConfigValidator.get_float('VAD_THRESHOLD', 0.005, min_val=0.0, max_val=1.0)
+    # 'energy': RMS >= VAD_THRESHOLD; 'silero': neural speech probability >= VAD_SPEECH_THRESHOLD
+    VAD_BACKEND = ConfigValidator.get_str('VAD_BACKEND', 'energy', allowed_values=['energy', 'silero'])
+    VAD_SPEECH_THRESHOLD = ConfigValidator.get_float('VAD_SPEECH_THRESHOLD', 0.5, min_val=0.0, max_val=1.0)
+    VAD_MODEL_PATH = os.getenv('VAD_MODEL_PATH', None) or None
+    VAD_HANGOVER_CHUNKS = ConfigValidator.get_int('VAD_HANGOVER_CHUNKS', 0, min_val=0, max_val=20)
     
     # Display Settings
     SHOW_TIMESTAMPS = ConfigValidator.get_bool('SHOW_TIMESTAMPS', True)
@@ -59,6 +128,13 @@ class Config:
     # Monitoring
     ENABLE_METRICS = ConfigValidator.get_bool('ENABLE_METRICS', True)
     METRICS_INTERVAL = ConfigValidator.get_int('METRICS_INTERVAL', 60, min_val=10, max_val=600)
+    # OpenMetrics/Prometheus endpoint at http://METRICS_HOST:METRICS_PORT/metrics (0 = disabled)
+    METRICS_PORT = ConfigValidator.get_int('METRICS_PORT', 0, min_val=0, max_val=65535)
+    METRICS_HOST = ConfigValidator.get_str('METRICS_HOST', '127.0.0.1')
+    # Sampling profiler (SIGUSR1 or HealthMonitor.request_profile); output defaults to LOG_DIR
+    PROFILE_DURATION = ConfigValidator.get_float('PROFILE_DURATION', 10.0, min_val=1.0, max_val=600.0)
+    PROFILE_INTERVAL = ConfigValidator.get_float('PROFILE_INTERVAL', 0.01, min_val=0.001, max_val=1.0)
+    PROFILE_DIR = ConfigValidator.get_str('PROFILE_DIR', '')
     
     # Audio Device
     AUDIO_DEVICE = os.getenv('AUDIO_DEVICE', None) or None
@@ -71,6 +147,16 @@ class Config:
             return "cuda"
         return "cpu"
     
+    @classmethod
+    def get_live_model(cls) -> str:
+        """Model used for live (non-final) updates."""
+        return cls.LIVE_MODEL or cls.WHISPER_MODEL
+    
+    @classmethod
+    def get_final_model(cls) -> str:
+        """Model used for the final pass of each utterance."""
+        return cls.FINAL_MODEL or cls.WHISPER_MODEL
+    
     @classmethod
     def validate(cls):
         """Validate all configuration values."""
@@ -0,0 +1,98 @@
+"""
+Default-device change notifications for the capture hot-swap.
+
+soundcard has no change callbacks, so where the audio server can report
+them (PulseAudio/PipeWire via ``pactl subscribe``) its event stream wakes
+the device monitor immediately; otherwise the monitor falls back to
+polling the default speaker.
+"""
+
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+# e.g. "Event 'change' on server #0" (default sink changed), "Event 'new' on sink #57"
+_PACTL_EVENT = re.compile(r"Event '(\w+)' on ([\w-]+)")
+_PACTL_FACILITIES = {"server", "sink", "card"}
+
+
+class DeviceChangeWatcher:
+    """Polling fallback: ``wait()`` returns every ``interval`` seconds."""
+
+    backend = "polling"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.events = 0  # Notifications received (always 0 when polling)
+        self._event = threading.Event()
+        self.stopped = False
+
+    def wait(self) -> bool:
+        """Block until a change notification, the poll interval or stop().
+
+        Returns:
+            True if woken by a notification
+        """
+        notified = self._event.wait(self.interval)
+        self._event.clear()
+        return notified and not self.stopped
+
+    def notify(self):
+        self.events += 1
+        self._event.set()
+
+    def stop(self):
+        self.stopped = True
+        self._event.set()
+
+
+class PulseAudioWatcher(DeviceChangeWatcher):
+    """Wakes on ``pactl subscribe`` server/sink/card events.
+
+    Stream events (including our own recorder's source-output) are ignored.
+    The poll interval still applies as a safety net.
+    """
+
+    backend = "pulseaudio"
+
+    def __init__(self, interval: float):
+        super().__init__(interval)
+        self._process = subprocess.Popen(
+            ["pactl", "subscribe"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        self._thread = threading.Thread(target=self._read_events, daemon=True, name="pactl-subscribe")
+        self._thread.start()
+
+    def _read_events(self):
+        for line in self._process.stdout:
+            match = _PACTL_EVENT.search(line)
+            if match and match.group(2) in _PACTL_FACILITIES:
+                self.notify()
+        if not self.stopped:
+            logger.warning("pactl subscribe exited; device changes are detected by polling only")
+
+    def stop(self):
+        super().stop()
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def create_device_watcher(interval: float) -> DeviceChangeWatcher:
+    """Notification-driven watcher where the platform offers one, polling otherwise."""
+    if sys.platform.startswith("linux") and shutil.which("pactl"):
+        try:
+            watcher = PulseAudioWatcher(interval)
+            logger.debug("Watching device changes via pactl subscribe")
+            return watcher
+        except OSError as e:
+            logger.debug(f"pactl subscribe unavailable ({e}), polling for device changes")
+    return DeviceChangeWatcher(interval)
@@ -29,6 +29,7 @@ class TranscriptionDisplay:
         self.chunks_processed = 0
         self.avg_latency = 0.0
         self.current_latency = 0.0
+        self.final_latency = 0.0
         self.root = None
         self._lock = threading.Lock()  # Thread safety for UI updates
         
@@ -47,7 +48,7 @@ class TranscriptionDisplay:
             # --- Header Section (Metrics) ---
             header_frame = ctk.CTkFrame(self.root, corner_radius=10)
             header_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
-            header_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
+            header_frame.grid_columnconfigure((0, 1, 2, 3, 4), weight=1)
             
             self.status_label = ctk.CTkLabel(header_frame, text=f"Status: {self.status}", font=("Inter", 14, "bold"))
             self.status_label.grid(row=0, column=0, padx=10, pady=10)
@@ -58,8 +59,11 @@ class TranscriptionDisplay:
             self.avg_latency_label = ctk.CTkLabel(header_frame, text="Avg: 0.00s", font=("Inter", 13))
             self.avg_latency_label.grid(row=0, column=2, padx=10, pady=10)
             
+            self.final_latency_label = ctk.CTkLabel(header_frame, text="Final: 0.00s", font=("Inter", 13))
+            self.final_latency_label.grid(row=0, column=3, padx=10, pady=10)
+            
             self.processed_label = ctk.CTkLabel(header_frame, text="Done: 0", font=("Inter", 13))
-            self.processed_label.grid(row=0, column=3, padx=10, pady=10)
+            self.processed_label.grid(row=0, column=4, padx=10, pady=10)
             
             # --- Main Transcription Area ---
             text_frame = ctk.CTkFrame(self.root, corner_radius=10)
@@ -160,8 +164,11 @@ class TranscriptionDisplay:
                 display_text = "... " + text[-197:]
             self.live_label.configure(text=f"{display_text}", font=("Inter", 14, "bold"))
             
-        # Update metrics
-        if latency:
+        # Update metrics (final-pass latency is reported separately from live updates)
+        if latency and is_final:
+            self.final_latency = latency
+            self.final_latency_label.configure(text=f"Final: {self.final_latency:.2f}s")
+        elif latency:
             self.current_latency = latency
             self.chunks_processed += 1
             self.avg_latency = (
@@ -0,0 +1,221 @@
+"""
+Offline transcription of recorded files and streams.
+Decodes audio in blocks, splits at silences and batch-decodes the pieces
+without realtime pacing.
+"""
+
+import sys
+import time
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from config import Config
+from model_registry import model_registry
+from segmenter import split_on_silence
+from transcriber import acquire_whisper_model
+from vad import EnergyVAD, create_vad
+from logger_config import get_logger
+from typing import Callable, Iterator, List, Tuple
+
+logger = get_logger(__name__)
+
+
+def iter_audio_blocks(source, block_seconds: float, sample_rate: int = 16000) -> Iterator[np.ndarray]:
+    """Decode ``source`` to mono float32 blocks without loading the whole file.
+
+    Args:
+        source: File path, URL or binary file object understood by av.open ('-' reads stdin)
+        block_seconds: Length of each yielded block (the last one may be shorter)
+        sample_rate: Output sample rate
+
+    Yields:
+        1-D float32 arrays of block_seconds * sample_rate samples
+    """
+    import av
+
+    if source == "-":
+        source = sys.stdin.buffer
+    block_samples = int(block_seconds * sample_rate)
+    resampler = av.audio.resampler.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+    pending: List[np.ndarray] = []
+    pending_samples = 0
+
+    with av.open(source, mode="r", metadata_errors="ignore") as container:
+        frames = container.decode(audio=0)
+        for frame in _resampled(resampler, frames):
+            pending.append(frame)
+            pending_samples += len(frame)
+            while pending_samples >= block_samples:
+                audio = np.concatenate(pending)
+                yield audio[:block_samples]
+                rest = audio[block_samples:]
+                pending = [rest] if len(rest) else []
+                pending_samples = len(rest)
+
+    if pending_samples:
+        yield np.concatenate(pending)
+
+
+def _resampled(resampler, frames) -> Iterator[np.ndarray]:
+    """Resample decoded frames (flushing the resampler at the end)."""
+    for frame in frames:
+        for out in resampler.resample(frame):
+            yield out.to_ndarray().reshape(-1)
+    for out in resampler.resample(None):
+        yield out.to_ndarray().reshape(-1)
+
+
+class FileTranscriber:
+    """Faster-than-realtime transcription of a file or stream.
+
+    Audio is decoded in FILE_BLOCK_DURATION blocks. Each block is split at
+    low-energy points into pieces of at most FINAL_SEGMENT_DURATION seconds,
+    pieces the configured VAD finds silent are skipped (the energy gate is
+    used when live VAD is disabled), and the rest are decoded together by the
+    batched pipeline. The last piece of a block may end mid-sentence, so it
+    is carried over to the front of the next block.
+    """
+
+    def __init__(self, text_callback: Callable, model=None):
+        """
+        Initialize the file transcriber.
+
+        Args:
+            text_callback: function(text, latency, timestamp, is_final), as in live mode
+            model: Optional loaded WhisperModel (the FINAL_MODEL is acquired if None)
+        """
+        self.text_callback = text_callback
+        self.model = model
+        self._owns_model = False
+        self.pipeline = BatchedInferencePipeline(model=model) if model is not None else None
+        self.vad = create_vad() or EnergyVAD(Config.VAD_THRESHOLD)
+        self.segments: List[Tuple[float, float, str]] = []  # (start, end, text) in stream seconds
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    def load_model(self):
+        """Acquire the final-tier model from the shared registry."""
+        if self.model is None:
+            self.model = acquire_whisper_model(Config.get_final_model())
+            self._owns_model = True
+            self.pipeline = BatchedInferencePipeline(model=self.model)
+
+    def release_model(self):
+        if self._owns_model and self.model is not None:
+            model_registry.release(self.model)
+            self.model = None
+            self.pipeline = None
+        self._owns_model = False
+
+    @property
+    def real_time_factor(self) -> float:
+        """Processing time divided by audio duration (below 1.0 is faster than realtime)."""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def transcribe(self, source) -> List[Tuple[float, float, str]]:
+        """Transcribe a whole file or stream.
+
+        Args:
+            source: Anything iter_audio_blocks accepts
+
+        Returns:
+            List of (start, end, text) segments with times in stream seconds
+        """
+        self.load_model()
+        return self.transcribe_blocks(
+            iter_audio_blocks(source, Config.FILE_BLOCK_DURATION, Config.SAMPLE_RATE)
+        )
+
+    def transcribe_blocks(self, blocks) -> List[Tuple[float, float, str]]:
+        """Transcribe an iterable of consecutive mono float32 blocks."""
+        sample_rate = Config.SAMPLE_RATE
+        start_t = time.time()
+        carry = np.zeros(0, dtype=np.float32)
+        carry_offset = 0.0  # Stream time of carry[0]
+
+        for block in blocks:
+            if not len(block):
+                continue
+            self.audio_seconds += len(block) / sample_rate
+            audio = np.concatenate([carry, block]) if len(carry) else block
+            pieces = split_on_silence(audio, sample_rate, max_segment=Config.FINAL_SEGMENT_DURATION)
+
+            # Keep the trailing piece for the next block; it may continue there
+            last_start = pieces[-1][0]
+            self._decode(audio[:last_start], pieces[:-1], carry_offset)
+            carry = audio[last_start:]
+            carry_offset += last_start / sample_rate
+
+        if len(carry):
+            self._decode(carry, [(0, len(carry))], carry_offset)
+
+        self.processing_seconds += time.time() - start_t
+        logger.info(
+            f"Transcribed {self.audio_seconds:.1f}s of audio in {self.processing_seconds:.1f}s "
+            f"(RTF {self.real_time_factor:.3f})"
+        )
+        return self.segments
+
+    def _is_voiced(self, piece: np.ndarray) -> bool:
+        self.vad.reset()  # Pieces are judged independently
+        return self.vad.is_speech(piece)
+
+    def _decode(self, audio: np.ndarray, pieces: List[Tuple[int, int]], offset: float):
+        """Batch-decode the non-silent pieces of ``audio`` and emit their text."""
+        sample_rate = Config.SAMPLE_RATE
+        voiced = [(start, end) for start, end in pieces if self._is_voiced(audio[start:end])]
+        if not voiced:
+            return
+
+        start_t = time.time()
+        segments, info = self.pipeline.transcribe(
+            audio,
+            language=Config.WHISPER_LANGUAGE,
+            beam_size=Config.BEAM_SIZE,
+            batch_size=Config.FINAL_BATCH_SIZE,
+            clip_timestamps=[
+                {"start": start / sample_rate, "end": end / sample_rate}
+                for start, end in voiced
+            ]
+        )
+        ordered = sorted(segments, key=lambda s: s.start)
+        latency = time.time() - start_t
+
+        for segment in ordered:
+            text = segment.text.strip()
+            if text:
+                self.segments.append((offset + segment.start, offset + segment.end, text))
+                self.text_callback(text, latency, time.time(), is_final=True)
+
+
+def format_offset(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def run_file_mode(source) -> int:
+    """Transcribe ``source`` to stdout as segments are decoded (``--input`` mode).
+
+    Returns:
+        Process exit code
+    """
+    def print_segment(text, latency, timestamp, is_final=False):
+        start = transcriber.segments[-1][0]  # Appended just before the callback
+        print(f"[{format_offset(start)}] {text}", flush=True)
+
+    transcriber = FileTranscriber(print_segment)
+    try:
+        transcriber.transcribe(source)
+    except Exception as e:
+        logger.error(f"File transcription failed: {e}", exc_info=True)
+        return 1
+    finally:
+        transcriber.release_model()
+
+    print(
+        f"\n{transcriber.audio_seconds:.1f}s of audio in {transcriber.processing_seconds:.1f}s "
+        f"(real-time factor {transcriber.real_time_factor:.3f}, "
+        f"{1 / max(transcriber.real_time_factor, 1e-9):.1f}x realtime)",
+        file=sys.stderr
+    )
+    return 0
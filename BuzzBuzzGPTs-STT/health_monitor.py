@@ -7,6 +7,9 @@ import threading
 from typing import Dict, Any, Optional
 from logger_config import get_logger
 from config import Config
+from metrics_registry import metrics_registry
+from model_registry import model_registry
+from profiler import get_profiler
 
 logger = get_logger(__name__)
 
@@ -53,10 +56,10 @@ class HealthMonitor:
         logger.info("Health monitoring stopped")
     
     def _monitor_loop(self):
-        """Background loop to collect metrics."""
+        """Background loop to collect and log metrics."""
         while self._is_monitoring:
             try:
-                self.update_metrics()
+                self.log_metrics()
                 time.sleep(Config.METRICS_INTERVAL)
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
@@ -75,6 +78,15 @@ class HealthMonitor:
             # Collect from transcriber
             if self.transcriber:
                 self.metrics["transcriber_errors"] = self.transcriber.error_count
+                scheduler = getattr(self.transcriber, "scheduler", None)  # Absent on RemoteTranscriber
+                if scheduler is not None:
+                    self.metrics.update(scheduler.get_status())
+                if hasattr(self.transcriber, "get_tier_latency"):
+                    self.metrics.update(self.transcriber.get_tier_latency())
+            
+            self.metrics.update(model_registry.get_status())
+            # Per-stage p50/p95/p99 (merged from lock-free per-thread shards)
+            self.metrics.update(metrics_registry.get_status())
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get current health status.
@@ -82,9 +94,10 @@ class HealthMonitor:
         Returns:
             Dictionary with health metrics and status
         """
+        # update_metrics() takes the lock itself; calling it while holding the
+        # (non-reentrant) lock deadlocked
+        self.update_metrics()
         with self._lock:
-            self.update_metrics()
-            
             is_healthy = (
                 self.metrics.get("audio_errors", 0) < 100 and
                 self.metrics.get("transcriber_errors", 0) < 100
@@ -102,6 +115,18 @@ class HealthMonitor:
         logger.info(f"Health Status: {status['status']}")
         logger.info(f"Metrics: {status['metrics']}")
     
+    def request_profile(self, duration: Optional[float] = None) -> bool:
+        """Sample all thread stacks for ``duration`` seconds (PROFILE_DURATION if None).
+        
+        Runs in the background and writes a .collapsed flame graph input.
+        
+        Returns:
+            False if a profile is already running
+        """
+        duration = duration or Config.PROFILE_DURATION
+        logger.info(f"Profiling requested for {duration:.0f}s")
+        return get_profiler().start(duration)
+    
     def increment_transcriptions(self):
         """Increment transcription counter."""
         with self._lock:
@@ -0,0 +1,120 @@
+"""
+Local-agreement policy for incremental streaming transcription.
+Commits the longest word prefix that two consecutive hypotheses agree on.
+"""
+
+import re
+from typing import Iterable, List, Tuple
+
+# (start_seconds, end_seconds, text) relative to the start of the utterance
+TimedWord = Tuple[float, float, str]
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(word: str) -> str:
+    """Compare words case- and punctuation-insensitively."""
+    return _NORMALIZE_RE.sub("", word).lower()
+
+
+class LocalAgreement:
+    """Tracks committed and pending words for one utterance (LocalAgreement-2).
+
+    Each live pass decodes only the audio after ``confirmed_until`` and feeds
+    the timed words to ``insert``. A word is committed once it appears at the
+    same position in two consecutive hypotheses; committed words never change,
+    so the text shown to the user stops flickering.
+    """
+
+    def __init__(self, overlap_tolerance: float = 0.1, max_ngram: int = 5):
+        """
+        Initialize agreement state.
+
+        Args:
+            overlap_tolerance: Seconds a new word may start before the confirmed point
+            max_ngram: Longest repeated n-gram stripped from the start of a hypothesis
+        """
+        self.overlap_tolerance = overlap_tolerance
+        self.max_ngram = max_ngram
+        self.committed: List[TimedWord] = []
+        self.pending: List[TimedWord] = []
+        self.confirmed_until = 0.0
+
+    def insert(self, words: Iterable[TimedWord], offset: float = 0.0) -> List[TimedWord]:
+        """Add a new hypothesis and return the words it newly commits.
+
+        Args:
+            words: Timed words relative to the decoded window
+            offset: Start of the decoded window within the utterance (seconds)
+        """
+        hypothesis = [
+            (start + offset, end + offset, text.strip())
+            for start, end, text in words
+            if text.strip()
+        ]
+        hypothesis = [
+            w for w in hypothesis if w[0] >= self.confirmed_until - self.overlap_tolerance
+        ]
+        hypothesis = self._strip_repeated_ngram(hypothesis)
+
+        newly_committed = []
+        for previous, current in zip(self.pending, hypothesis):
+            if _normalize(previous[2]) != _normalize(current[2]):
+                break
+            newly_committed.append(current)
+
+        self.pending = hypothesis[len(newly_committed):]
+        self._commit(newly_committed)
+        return newly_committed
+
+    def force_commit(self, until: float) -> List[TimedWord]:
+        """Commit pending words ending before ``until`` and skip the audio up to it.
+
+        Used to bound the decode window when hypotheses keep disagreeing.
+        """
+        forced = [w for w in self.pending if w[1] <= until]
+        self.pending = self.pending[len(forced):]
+        self._commit(forced)
+        self.confirmed_until = max(self.confirmed_until, until)
+        return forced
+
+    def reset(self):
+        """Clear all state for the next utterance."""
+        self.committed = []
+        self.pending = []
+        self.confirmed_until = 0.0
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(w[2] for w in self.committed)
+
+    @property
+    def pending_text(self) -> str:
+        return " ".join(w[2] for w in self.pending)
+
+    @property
+    def text(self) -> str:
+        return " ".join(t for t in (self.committed_text, self.pending_text) if t)
+
+    def _commit(self, words: List[TimedWord]):
+        if words:
+            self.committed.extend(words)
+            self.confirmed_until = max(self.confirmed_until, words[-1][1])
+
+    def _strip_repeated_ngram(self, hypothesis: List[TimedWord]) -> List[TimedWord]:
+        """Drop words at the start of a hypothesis that repeat the committed tail.
+
+        Whisper often re-emits the last committed words when the window
+        boundary falls inside them.
+        """
+        if not self.committed or not hypothesis:
+            return hypothesis
+        if abs(hypothesis[0][0] - self.confirmed_until) > 1.0:
+            return hypothesis
+        limit = min(self.max_ngram, len(self.committed), len(hypothesis))
+        for n in range(limit, 0, -1):
+            tail = [_normalize(w[2]) for w in self.committed[-n:]]
+            head = [_normalize(w[2]) for w in hypothesis[:n]]
+            if tail == head:
+                return hypothesis[n:]
+        return hypothesis
@@ -7,10 +7,12 @@ Production-ready with comprehensive logging and error handling.
 import sys
 import os
 import argparse
-import queue
 import signal
+import threading
+import time
 import numpy as np
 import traceback
+from typing import Optional
 from utils import apply_patches
 
 # Apply compatibility patches early
@@ -20,34 +22,105 @@ apply_patches()
 from logger_config import setup_logging, get_logger
 from config import Config
 
-# Initialize logging
-setup_logging(
-    log_level=Config.LOG_LEVEL,
-    log_dir=Config.LOG_DIR,
-    console=Config.ENABLE_CONSOLE_LOGGING,
-    file_logging=Config.ENABLE_FILE_LOGGING
-)
+# Initialize logging (spawned worker processes re-import this module as
+# __mp_main__ and set up their own console-only logging)
+if __name__ != "__mp_main__":
+    setup_logging(
+        log_level=Config.LOG_LEVEL,
+        log_dir=Config.LOG_DIR,
+        console=Config.ENABLE_CONSOLE_LOGGING,
+        file_logging=Config.ENABLE_FILE_LOGGING
+    )
 
 logger = get_logger(__name__)
 
 from audio_capture import AudioCapture
+from audio_ring import SPSCAudioRing, create_audio_ring
+from multi_source import SOURCE_LABELS, CaptureGroup, MultiSourceTranscriber, parse_sources
 from transcriber import WhisperTranscriber
+from worker_process import RemoteTranscriber, get_default_pool
 from display import TranscriptionDisplay
+from health_monitor import HealthMonitor
+from metrics_registry import metrics_registry
+from metrics_server import MetricsServer
+from profiler import install_signal_handler
+from file_transcriber import run_file_mode
+from batch_runner import run_batch_mode
+from stream_server import run_server_mode
 
 class SystemAudioSTT:
     """Main application class with production-ready error handling."""
     
-    def __init__(self):
+    def __init__(self, started_at: Optional[float] = None):
         logger.info("Initializing System Audio STT application")
-        self.audio_queue = queue.Queue(maxsize=Config.MAX_QUEUE_SIZE)
+        self.started_at = started_at or time.time()
+        self.audio_queue = create_audio_ring()
         self.display = TranscriptionDisplay()
         self.audio_capture = None
         self.transcriber = None
         self.is_running = False
         self._initialization_success = False
         
-    def transcription_callback(self, text, latency, timestamp, is_final=False):
+        # Background model prefetch
+        self._prefetch_thread = None
+        self._model_ready = threading.Event()
+        self._model_load_ok = False
+        self.startup_metrics = {}
+        
+        # Monitoring (HealthMonitor feeds the optional scrape endpoint)
+        self.health_monitor = HealthMonitor()
+        self.metrics_server: Optional[MetricsServer] = None
+        
+    def transcription_callback(self, text, latency, timestamp, is_final=False, source=None):
+        if "time_to_first_transcript" not in self.startup_metrics:
+            self.startup_metrics["time_to_first_transcript"] = time.time() - self.started_at
+            logger.info(f"Startup metrics: {self.startup_metrics}")
+        if text and source in SOURCE_LABELS:
+            text = f"[{SOURCE_LABELS[source]}] {text}"
         self.display.update_transcription(text, latency, timestamp, is_final)
+    
+    def prefetch_model(self):
+        """Start loading and warming up the Whisper model on a background thread.
+        
+        Called as early as possible so the model loads while the window and
+        the audio device come up.
+        """
+        if self._prefetch_thread is not None:
+            return
+        sources = parse_sources(Config.CAPTURE_SOURCES)
+        if len(sources) > 1:
+            # One stream per source (or one mixed stream), each with its own ring
+            if Config.TRANSCRIBER_BACKEND == "process":
+                logger.warning("Multi-source capture runs in-process; ignoring TRANSCRIBER_BACKEND=process")
+            self.transcriber = MultiSourceTranscriber(sources, self.transcription_callback, Config.MULTI_SOURCE_MODE)
+            self.audio_queue = None
+        elif Config.TRANSCRIBER_BACKEND == "process":
+            # Worker process reads audio from a shared-memory ring instead of the queue
+            self.transcriber = RemoteTranscriber(self.transcription_callback)
+            self.audio_queue = self.transcriber.audio_queue
+        else:
+            self.transcriber = WhisperTranscriber(self.audio_queue, self.transcription_callback)
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._prefetch_thread.start()
+    
+    def _prefetch_loop(self):
+        """Load (and optionally warm up) the model, then signal readiness."""
+        try:
+            load_start = time.time()
+            self._model_load_ok = self.transcriber.load_model()
+            self.startup_metrics["model_load_seconds"] = time.time() - load_start
+            metrics_registry.gauge("model_load_seconds", "Model load time at startup").set(
+                self.startup_metrics["model_load_seconds"]
+            )
+            
+            if self._model_load_ok and Config.ENABLE_WARMUP:
+                self.startup_metrics["warmup_seconds"] = self.transcriber.warm_up()
+            self.startup_metrics["model_ready_after"] = time.time() - self.started_at
+        except Exception as e:
+            logger.error(f"Model prefetch failed: {e}", exc_info=True)
+            self._model_load_ok = False
+        finally:
+            self._model_ready.set()
         
     def setup(self, device_name=None) -> bool:
         """Setup application components.
@@ -61,22 +134,23 @@ class SystemAudioSTT:
             # Validate configuration
             Config.validate()
             
-            # Initialize audio capture
-            self.audio_capture = AudioCapture(self.audio_queue, device_name)
+            # Load the Whisper model in the background (no-op if already prefetching)
+            self.prefetch_model()
             
-            # Initialize transcriber
-            self.transcriber = WhisperTranscriber(self.audio_queue, self.transcription_callback)
+            # Initialize audio capture (--device applies to the loopback source)
+            if isinstance(self.transcriber, MultiSourceTranscriber):
+                self.audio_capture = CaptureGroup(
+                    self.transcriber.inputs, {"loopback": device_name, "mic": Config.MIC_DEVICE}
+                )
+            elif Config.CAPTURE_SOURCES == "mic":
+                self.audio_capture = AudioCapture(self.audio_queue, device_name or Config.MIC_DEVICE or None, source="mic")
+            else:
+                self.audio_capture = AudioCapture(self.audio_queue, device_name)
             
             # Setup display
             self.display.show_welcome()
             self.display.update_status("Loading models...")
             
-            # Load Whisper model
-            if not self.transcriber.load_model():
-                logger.error("Failed to load Whisper model")
-                self.display.update_status("Error: Failed to load model")
-                return False
-            
             self._initialization_success = True
             logger.info("Application setup completed successfully")
             return True
@@ -86,36 +160,6 @@ class SystemAudioSTT:
             self.display.update_status(f"Error: {e}")
             return False
         
-    def start(self) -> bool:
-        """Start application threads.
-        
-        Returns:
-            True if started successfully, False otherwise
-        """
-        if not self._initialization_success:
-            logger.error("Cannot start: initialization was not successful")
-            return False
-            
-        try:
-            self.is_running = True
-            self.display.start()
-            
-            if not self.audio_capture.start():
-                logger.error("Failed to start audio capture")
-                return False
-                
-            if not self.transcriber.start():
-                logger.error("Failed to start transcriber")
-                return False
-            
-            self.display.update_status("Live - Listening to system audio...")
-            logger.info("Application started successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to start application: {e}", exc_info=True)
-            return False
-        
     def stop(self):
         """Stop application gracefully."""
         if not self.is_running:
@@ -130,6 +174,13 @@ class SystemAudioSTT:
             self.audio_capture.stop()
         if self.transcriber:
             self.transcriber.stop()
+        if isinstance(self.audio_queue, SPSCAudioRing):
+            self.audio_queue.close()
+        if Config.TRANSCRIBER_BACKEND == "process":
+            get_default_pool().stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.health_monitor.stop_monitoring()
         if self.display:
             self.display.stop()
             
@@ -144,24 +195,13 @@ class SystemAudioSTT:
                 self.display._setup_ui()
             
             # Setup window close handler
-            self.display.root.protocol("WM_DELETE_WINDOW", self.stop)
-            
-            # Start background threads before GUI mainloop
-            if not self.audio_capture.start():
-                logger.error("Failed to start audio capture")
-                return
-                
-            if not self.transcriber.start():
-                logger.error("Failed to start transcriber")
-                return
-                
-            self.is_running = True
-            self.display.update_status("Live - Listening...")
-            
-            # Log system information
-            logger.info(f"Audio capture: {self.audio_capture.is_running}")
-            logger.info(f"Transcriber: {self.transcriber.is_running}")
-            logger.info(f"Device: {self.audio_capture.mic.name}")
+            self.display.root.protocol("WM_DELETE_WINDOW", self._on_window_close)
+            self.display.update_status("Loading models...")
+            self.startup_metrics["window_ready_after"] = time.time() - self.started_at
+            
+            # Start capture and transcription once the prefetched model is ready
+            self.display.root.after(100, self._start_when_model_ready)
+            self.display.root.after(500, self._poll_signals)
             
             # Start GUI mainloop (blocking call)
             self._run_mainloop()
@@ -176,12 +216,76 @@ class SystemAudioSTT:
         finally:
             self.stop()
     
+    def _on_window_close(self):
+        """Close handler: the window may be closed while the model is still loading."""
+        if self.is_running:
+            self.stop()
+        else:
+            self.display.stop()
+    
+    def _start_when_model_ready(self):
+        """Poll (on the GUI thread) for the background model load, then go live."""
+        if not self._initialization_success:
+            logger.error("Cannot start: initialization was not successful")
+            return
+        
+        if not self._model_ready.is_set():
+            self.display.root.after(100, self._start_when_model_ready)
+            return
+        
+        if not self._model_load_ok:
+            logger.error("Failed to load Whisper model")
+            self.display.update_status("Error: Failed to load model")
+            return
+        
+        if not self.audio_capture.start():
+            logger.error("Failed to start audio capture")
+            return
+            
+        if not self.transcriber.start():
+            logger.error("Failed to start transcriber")
+            return
+            
+        self.is_running = True
+        self.display.update_status("Live - Listening...")
+        self._start_monitoring()
+        
+        # Log system information
+        logger.info(f"Audio capture: {self.audio_capture.is_running}")
+        logger.info(f"Transcriber: {self.transcriber.is_running}")
+        logger.info(f"Device: {self.audio_capture.mic.name}")
+        logger.info(f"Startup metrics: {self.startup_metrics}")
+    
+    def _poll_signals(self):
+        """Return to the interpreter periodically so signal handlers (profiler) run under Tk."""
+        self.display.root.after(500, self._poll_signals)
+    
+    def _start_monitoring(self):
+        """Start the health monitor and, if configured, the metrics endpoint."""
+        self.health_monitor.set_components(self.audio_capture, self.transcriber)
+        if isinstance(self.audio_queue, SPSCAudioRing):
+            ring = self.audio_queue
+            metrics_registry.gauge(
+                "audio_ring_dropped_samples", "Samples lost to audio ring backpressure", lambda: ring.dropped_samples
+            )
+            metrics_registry.gauge(
+                "audio_ring_spilled_samples", "Samples spilled to disk by the audio ring", lambda: ring.spilled_samples
+            )
+        if Config.ENABLE_METRICS:
+            self.health_monitor.start_monitoring()
+        if Config.METRICS_PORT:
+            self.metrics_server = MetricsServer(
+                Config.METRICS_HOST, Config.METRICS_PORT, health_monitor=self.health_monitor
+            )
+            self.metrics_server.start()
+    
     def _run_mainloop(self):
         """Run the GUI mainloop (blocking call)."""
         self.display.root.mainloop()
 
 def main():
     """Main entry point for the application."""
+    started_at = time.time()
     parser = argparse.ArgumentParser(
         description="System Audio Live Speech-to-Text",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -197,12 +301,59 @@ def main():
         default=None,
         help="Audio device name to use (default: system loopback)"
     )
+    parser.add_argument(
+        "--sources",
+        type=str,
+        default=None,
+        help="Capture sources: loopback, mic or loopback,mic (default: CAPTURE_SOURCES)"
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=None,
+        help="Transcribe an audio/video file or stream URL ('-' for stdin) instead of live capture"
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help="Transcribe every recording under a directory (resumable)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Transcript directory for --batch (default: <batch dir>/transcripts)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch (default: BATCH_WORKERS, 0 = one per core)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the local streaming transcription server (SERVER_HOST/SERVER_PORT or SERVER_SOCKET)"
+    )
     parser.add_argument(
         "--model",
         type=str,
         default=None,
         help="Whisper model size (tiny, base, small, medium, large)"
     )
+    parser.add_argument(
+        "--live-model",
+        type=str,
+        default=None,
+        help="Model for live updates in two-tier mode (default: --model)"
+    )
+    parser.add_argument(
+        "--final-model",
+        type=str,
+        default=None,
+        help="Model for the final pass in two-tier mode (default: --model)"
+    )
     
     args = parser.parse_args()
     
@@ -211,13 +362,34 @@ def main():
         AudioCapture.list_devices()
         return
     
-    # Override model if specified
-    if args.model:
-        logger.info(f"Using model override: {args.model}")
-        Config.WHISPER_MODEL = args.model
+    # Override models if specified (also exported so worker processes see them)
+    for option, key in (("model", "WHISPER_MODEL"), ("live_model", "LIVE_MODEL"), ("final_model", "FINAL_MODEL")):
+        value = getattr(args, option)
+        if value:
+            logger.info(f"Using {key} override: {value}")
+            setattr(Config, key, value)
+            os.environ[key] = value
+    
+    if args.sources:
+        try:
+            Config.CAPTURE_SOURCES = ",".join(parse_sources(args.sources))
+        except ValueError as e:
+            parser.error(str(e))
+    
+    # kill -USR1 <pid> profiles all threads (POSIX only)
+    install_signal_handler()
+    
+    # Offline file/stream mode: no GUI, no realtime pacing
+    if args.input:
+        sys.exit(run_file_mode(args.input))
+    if args.batch:
+        sys.exit(run_batch_mode(args.batch, args.output, args.workers))
+    if args.serve:
+        sys.exit(run_server_mode())
     
-    # Create and run application
-    app = SystemAudioSTT()
+    # Create the application and start loading the model right away
+    app = SystemAudioSTT(started_at=started_at)
+    app.prefetch_model()
     try:
         if not app.setup(device_name=args.device):
             logger.error("Application setup failed")
@@ -0,0 +1,226 @@
+"""
+Process-wide metrics: counters, gauges and fixed-bucket latency histograms.
+
+Hot threads (capture, transcriber) record into per-thread shards, so
+recording never takes a lock or contends with readers; readers merge the
+shards when a snapshot is requested.
+"""
+
+import threading
+import weakref
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Upper bounds in seconds (an implicit +Inf bucket follows)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class _Sharded:
+    """Per-thread cells created on first use; only creation takes the lock."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+
+class Counter(_Sharded):
+    """Monotonic counter."""
+
+    def __init__(self, name: str, description: str = ""):
+        super().__init__()
+        self.name = name
+        self.description = description
+
+    def _new_shard(self):
+        return [0]
+
+    def inc(self, amount: int = 1):
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> int:
+        return sum(shard[0] for shard in list(self._shards))
+
+
+class Gauge:
+    """Point-in-time value, either set directly or read from a callback at snapshot time."""
+
+    def __init__(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self.fn() if self.fn is not None else self._value
+
+
+class _HistogramShard:
+    __slots__ = ("counts", "total")
+
+    def __init__(self, num_buckets: int):
+        self.counts = [0] * num_buckets
+        self.total = 0.0
+
+
+class Histogram(_Sharded):
+    """Fixed-bucket histogram with interpolated percentiles."""
+
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.description = description
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_shard(self):
+        return _HistogramShard(len(self.bounds) + 1)
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard.counts[bisect_left(self.bounds, value)] += 1
+        shard.total += value
+
+    def bucket_counts(self) -> List[int]:
+        """Observations per bucket (non-cumulative; the last is +Inf)."""
+        merged = [0] * (len(self.bounds) + 1)
+        for shard in list(self._shards):
+            for i, count in enumerate(shard.counts):
+                merged[i] += count
+        return merged
+
+    @property
+    def count(self) -> int:
+        return sum(self.bucket_counts())
+
+    @property
+    def sum(self) -> float:
+        return sum(shard.total for shard in list(self._shards))
+
+    def percentile(self, q: float, counts: Optional[List[int]] = None) -> float:
+        """Estimate the q-th percentile (0-100) by interpolating inside its bucket."""
+        counts = counts if counts is not None else self.bucket_counts()
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q / 100.0 * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else lower  # +Inf: report the last bound
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+    def summary(self) -> dict:
+        counts = self.bucket_counts()
+        total = sum(counts)
+        return {
+            "count": total,
+            "mean": self.sum / total if total else 0.0,
+            "p50": self.percentile(50, counts),
+            "p95": self.percentile(95, counts),
+            "p99": self.percentile(99, counts),
+        }
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms shared by all components."""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._stamps = weakref.WeakKeyDictionary()  # Owner object -> deque of timestamps
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Get or create a counter (look it up once, then keep the object)."""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name, description)
+            return self._counters[name]
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram (look it up once, then keep the object)."""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, description, buckets)
+            return self._histograms[name]
+
+    def gauge(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None) -> Gauge:
+        """Get or create a gauge; a new ``fn`` replaces the previous one."""
+        with self._lock:
+            if name not in self._gauges:
+                self._gauges[name] = Gauge(name, description, fn)
+            elif fn is not None:
+                self._gauges[name].fn = fn
+            return self._gauges[name]
+
+    def stamps(self, owner, maxlen: int = 1024) -> deque:
+        """FIFO of timestamps handed between threads (e.g. enqueue -> dequeue).
+
+        Keyed weakly by the object the timestamps travel with (e.g. the audio
+        queue), so they are dropped together with it and a new queue never
+        inherits an old one's stamps. deque.append and deque.popleft are
+        atomic, so producer and consumer need no lock.
+        """
+        with self._lock:
+            if owner not in self._stamps:
+                self._stamps[owner] = deque(maxlen=maxlen)
+            return self._stamps[owner]
+
+    @property
+    def counters(self) -> List[Counter]:
+        with self._lock:
+            return list(self._counters.values())
+
+    @property
+    def histograms(self) -> List[Histogram]:
+        with self._lock:
+            return list(self._histograms.values())
+
+    @property
+    def gauges(self) -> List[Gauge]:
+        with self._lock:
+            return list(self._gauges.values())
+
+    def get_status(self) -> dict:
+        """Counter and gauge values and p50/p95/p99 per histogram."""
+        return {
+            "counters": {c.name: c.value for c in self.counters},
+            "gauges": {g.name: g.value for g in self.gauges},
+            "latency": {h.name: h.summary() for h in self.histograms},
+        }
+
+    def reset(self):
+        """Drop all metrics (tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+            self._stamps.clear()
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,166 @@
+"""
+Optional OpenMetrics / Prometheus endpoint for the STT process.
+
+Serves GET /metrics from a background thread on localhost. Everything is
+rendered at scrape time from the metrics registry and HealthMonitor, so
+the capture and transcription threads do no extra work.
+"""
+
+import math
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metrics_registry import MetricsRegistry, metrics_registry
+from logger_config import get_logger
+from typing import List, Optional
+
+logger = get_logger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metric_name(name: str, prefix: str = "stt_") -> str:
+    return prefix + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _header(lines: List[str], family: str, kind: str, description: str):
+    lines.append(f"# TYPE {family} {kind}")
+    if description:
+        lines.append(f"# HELP {family} {description}")
+
+
+def render_metrics(registry: MetricsRegistry = metrics_registry, health_monitor=None,
+                   openmetrics: bool = True) -> str:
+    """Render the registry (and HealthMonitor values) in exposition format.
+
+    Args:
+        registry: Metrics registry to export
+        health_monitor: Optional HealthMonitor; its numeric metrics become gauges
+        openmetrics: OpenMetrics 1.0 text (True) or Prometheus 0.0.4 text (False)
+    """
+    lines: List[str] = []
+    exported = set()
+
+    for counter in registry.counters:
+        family = _metric_name(counter.name[:-len("_total")] if counter.name.endswith("_total") else counter.name)
+        # Prometheus text types the sample name; OpenMetrics types the family
+        _header(lines, family if openmetrics else f"{family}_total", "counter", counter.description)
+        lines.append(f"{family}_total {_format_value(counter.value)}")
+        exported.add(family)
+
+    for histogram in registry.histograms:
+        family = _metric_name(histogram.name)
+        _header(lines, family, "histogram", histogram.description)
+        cumulative = 0
+        counts = histogram.bucket_counts()
+        for bound, count in zip(list(histogram.bounds) + [math.inf], counts):
+            cumulative += count
+            lines.append(f'{family}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{family}_count {cumulative}")
+        lines.append(f"{family}_sum {_format_value(histogram.sum)}")
+        exported.add(family)
+
+    gauges = {gauge.name: (gauge.value, gauge.description) for gauge in registry.gauges}
+    if health_monitor is not None:
+        for key, value in health_monitor.get_health_status()["metrics"].items():
+            if isinstance(value, (int, float)) and key not in gauges:
+                gauges[key] = (value, "")
+
+    for name, (value, description) in sorted(gauges.items()):
+        family = _metric_name(name)
+        if family in exported or value is None:
+            continue
+        _header(lines, family, "gauge", description)
+        lines.append(f"{family} {_format_value(value)}")
+
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Background HTTP server exposing /metrics."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464, health_monitor=None,
+                 registry: MetricsRegistry = metrics_registry):
+        """
+        Initialize the server (call start() to bind and serve).
+
+        Args:
+            host: Interface to bind (localhost by default; the endpoint has no auth)
+            port: TCP port (0 picks a free port)
+            health_monitor: Optional HealthMonitor whose numeric metrics are exported
+            registry: Metrics registry to export
+        """
+        self.host = host
+        self.requested_port = port
+        self.health_monitor = health_monitor
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server else self.requested_port
+
+    def start(self) -> bool:
+        """Bind and serve in a daemon thread.
+
+        Returns:
+            True if serving, False if the port could not be bound
+        """
+        if self._server is not None:
+            return True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                try:
+                    body = render_metrics(server.registry, server.health_monitor, openmetrics).encode("utf-8")
+                except Exception as e:
+                    logger.error(f"Failed to render metrics: {e}", exc_info=True)
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.requested_port), Handler)
+        except OSError as e:
+            logger.error(f"Metrics endpoint unavailable on {self.host}:{self.requested_port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="metrics-server")
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=2.0)
+        self._server = None
+        self._thread = None
@@ -0,0 +1,195 @@
+"""
+Process-wide registry of loaded Whisper models.
+Shares reference-counted instances and evicts them by LRU and idle time.
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from logger_config import get_logger
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = get_logger(__name__)
+
+# (model name, device, compute_type, cpu_threads)
+ModelKey = Tuple[str, str, str, int]
+
+# Approximate parameter counts (millions) used to estimate resident size
+_MODEL_PARAMS_M = {
+    "tiny": 39, "base": 74, "small": 244, "medium": 769, "large": 1550,
+}
+_BYTES_PER_PARAM = {"int8": 1, "int8_float16": 1, "float16": 2, "float32": 4}
+
+
+def estimate_model_mb(model_name: str, compute_type: str) -> float:
+    """Rough resident size of a model in MB (weights only)."""
+    family = model_name.split(".")[0].split("-")[0]
+    params = _MODEL_PARAMS_M.get(family, _MODEL_PARAMS_M["large"])
+    return params * _BYTES_PER_PARAM.get(compute_type, 4)
+
+
+class _Entry:
+    def __init__(self, key: ModelKey, model: Any, size_mb: float):
+        self.key = key
+        self.model = model
+        self.size_mb = size_mb
+        self.refcount = 1
+        self.last_released = time.time()
+
+
+class ModelRegistry:
+    """Hands out shared, reference-counted model instances.
+
+    ``acquire`` returns the cached model for a key or loads it once (concurrent
+    callers for the same key wait for the single load). ``release`` drops a
+    reference; unreferenced models stay cached so the next session starts
+    instantly, until they are evicted either because the cache exceeds
+    ``max_memory_mb`` (least recently used first) or because they have been
+    idle longer than ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, max_memory_mb: float, idle_timeout: float):
+        """
+        Initialize the registry.
+
+        Args:
+            max_memory_mb: Estimated memory cap for cached models
+            idle_timeout: Seconds an unreferenced model may stay loaded (0 disables)
+        """
+        self.max_memory_mb = max_memory_mb
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._loading: Dict[ModelKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._reaper_thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """Return a shared model for ``key``, calling ``loader()`` if it is not cached.
+
+        Raises whatever ``loader`` raises; failed loads are not cached.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refcount += 1
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.model
+                event = self._loading.get(key)
+                if event is None:
+                    self._loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            event.wait()  # Another thread is loading this key
+
+        try:
+            model = loader()
+        except Exception:
+            with self._lock:
+                self._loading.pop(key).set()
+            raise
+
+        with self._lock:
+            self._entries[key] = _Entry(key, model, estimate_model_mb(key[0], key[2]))
+            self._loading.pop(key).set()
+            self._enforce_memory_cap()
+        self._ensure_reaper()
+        return model
+
+    def release(self, model: Any):
+        """Drop one reference to a model obtained from ``acquire``."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.model is model:
+                    entry.refcount = max(0, entry.refcount - 1)
+                    entry.last_released = time.time()
+                    self._enforce_memory_cap()
+                    return
+        logger.debug("Released a model not owned by the registry")
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Unload unreferenced models idle longer than ``idle_timeout``.
+
+        Returns:
+            Number of models evicted
+        """
+        if self.idle_timeout <= 0:
+            return 0
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = [
+                key for key, entry in self._entries.items()
+                if entry.refcount == 0 and now - entry.last_released >= self.idle_timeout
+            ]
+            for key in idle:
+                self._evict(key, reason="idle")
+        if idle:
+            gc.collect()
+        return len(idle)
+
+    def clear(self):
+        """Forget every cached model (references held by callers stay valid)."""
+        with self._lock:
+            self._entries.clear()
+        gc.collect()
+
+    def get_status(self) -> dict:
+        """Get registry metrics."""
+        with self._lock:
+            return {
+                "models_loaded": len(self._entries),
+                "models_in_use": sum(1 for e in self._entries.values() if e.refcount > 0),
+                "cache_memory_mb": sum(e.size_mb for e in self._entries.values()),
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_evictions": self.evictions
+            }
+
+    def _enforce_memory_cap(self):
+        """Evict least recently used unreferenced models while over the cap (lock held)."""
+        total = sum(e.size_mb for e in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.max_memory_mb:
+                return
+            entry = self._entries[key]
+            if entry.refcount == 0:
+                total -= entry.size_mb
+                self._evict(key, reason="memory cap")
+        if total > self.max_memory_mb:
+            logger.warning(
+                f"Model cache at {total:.0f}MB exceeds cap of {self.max_memory_mb:.0f}MB "
+                "but all models are in use"
+            )
+
+    def _evict(self, key: ModelKey, reason: str):
+        del self._entries[key]
+        self.evictions += 1
+        logger.info(f"Unloaded model {key[0]} ({key[1]}, {key[2]}, threads={key[3]}): {reason}")
+
+    def _ensure_reaper(self):
+        if self.idle_timeout <= 0 or self._reaper_thread is not None:
+            return
+        self._reaper_thread = threading.Thread(target=self._reaper_loop, daemon=True)
+        self._reaper_thread.start()
+
+    def _reaper_loop(self):
+        interval = max(1.0, min(30.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Error evicting idle models: {e}")
+
+
+# Shared by every WhisperTranscriber in the process
+model_registry = ModelRegistry(
+    max_memory_mb=Config.MODEL_CACHE_MAX_MB,
+    idle_timeout=Config.MODEL_IDLE_TIMEOUT
+)
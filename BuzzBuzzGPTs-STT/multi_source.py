@@ -0,0 +1,376 @@
+"""
+Concurrent multi-source capture (system loopback + microphone).
+
+Each source has its own recorder thread, VAD and audio ring. In
+``separate`` mode every source gets its own transcription stream and text
+is attributed to the source it came from; the streams share one model and
+one BatchedInferenceEngine, so live windows of sources talking at the same
+time are decoded in a single batched call and a silent (VAD-gated) source
+costs no decodes at all. In ``mix`` mode the sources are mixed, aligned on
+capture time, into a single stream with one transcriber.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+from audio_ring import create_audio_ring
+from config import Config
+from logger_config import get_logger
+from model_registry import model_registry
+from typing import Callable, Dict, List, Optional
+
+logger = get_logger(__name__)
+
+SOURCES = ("loopback", "mic")
+SOURCE_LABELS = {"loopback": "System", "mic": "Mic"}  # Display prefixes ('mix' has none)
+
+
+def parse_sources(spec: str) -> List[str]:
+    """Split a CAPTURE_SOURCES value ('loopback,mic') into validated source names."""
+    sources = [part.strip() for part in spec.split(",") if part.strip()]
+    unknown = [source for source in sources if source not in SOURCES]
+    if unknown or not sources or len(set(sources)) != len(sources):
+        raise ValueError(f"Invalid capture sources '{spec}', expected a list of {SOURCES}")
+    return sources
+
+
+class _MixerSource:
+    __slots__ = ("name", "capture", "next_pos")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.capture = None  # AudioCapture feeding this input (for its progress)
+        self.next_pos: Optional[int] = None  # Timeline position following its last chunk
+
+
+class MixerInput:
+    """Queue-like sink one AudioCapture writes into (put copies into the mix)."""
+
+    copies_items = True
+
+    def __init__(self, mixer: "AudioMixer", source: _MixerSource):
+        self.mixer = mixer
+        self.source = source
+
+    def attach(self, capture):
+        """Follow ``capture``'s progress so gated stretches do not hold back the mix."""
+        self.source.capture = capture
+
+    def put(self, chunk: np.ndarray, block: bool = True, timeout: Optional[float] = None):
+        self.mixer.add(self.source, chunk, time.perf_counter())
+
+    def put_nowait(self, chunk: np.ndarray):
+        self.put(chunk)
+
+    def qsize(self) -> int:
+        return 0
+
+    def empty(self) -> bool:
+        return True
+
+    def full(self) -> bool:
+        return False
+
+
+class AudioMixer:
+    """Time-aligned mixdown of several captures into one output queue.
+
+    Chunks are placed on a shared sample timeline by the time they arrive;
+    consecutive chunks of one source stay sample-contiguous, and a source is
+    re-anchored to the clock only after a gap (gated or dropped chunks).
+    The timeline is emitted once every source has processed past it (or
+    lags by more than ``max_lag``), and only the stretches some source
+    contributed to are forwarded, so silence still reaches the transcriber
+    as a gap that triggers finalization.
+    """
+
+    def __init__(self, output, sample_rate: int, max_lag: float = 1.0, horizon: float = 10.0):
+        """
+        Initialize the mixer.
+
+        Args:
+            output: Queue or ring receiving the mixed stream
+            sample_rate: Sample rate of all inputs
+            max_lag: Seconds a stalled source may hold back the mix
+            horizon: Seconds of timeline kept before emission
+        """
+        self.output = output
+        self.sample_rate = sample_rate
+        self.max_lag = max_lag
+        self.capacity = int(horizon * sample_rate)
+        self._mix = np.zeros(self.capacity, dtype=np.float32)
+        self._covered = np.zeros(self.capacity, dtype=bool)
+        self._sources: List[_MixerSource] = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self.emitted = 0  # Timeline position up to which audio was forwarded
+        self.late_samples = 0  # Arrived after their stretch was already emitted
+        self.dropped_samples = 0  # Rejected by a full output queue
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def input(self, name: str) -> MixerInput:
+        source = _MixerSource(name)
+        self._sources.append(source)
+        return MixerInput(self, source)
+
+    def _position(self, t: float) -> int:
+        return int(round((t - self._t0) * self.sample_rate))
+
+    def add(self, source: _MixerSource, chunk: np.ndarray, arrived_at: float):
+        """Add a chunk that ended at ``arrived_at`` to the timeline."""
+        n = len(chunk)
+        start = self._position(arrived_at) - n
+        with self._lock:
+            if source.next_pos is not None and abs(start - source.next_pos) < n // 2:
+                start = source.next_pos  # Contiguous with the source's previous chunk
+            source.next_pos = start + n
+            if start + n - self.emitted > self.capacity:
+                self._emit(start + n - self.capacity)
+            skip = max(0, self.emitted - start)
+            if skip >= n:
+                self.late_samples += n
+                return
+            self.late_samples += skip
+            self._accumulate(start + skip, chunk[skip:])
+
+    def _accumulate(self, pos: int, samples: np.ndarray):
+        offset = pos % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        self._mix[offset:offset + first] += samples[:first]
+        self._covered[offset:offset + first] = True
+        if first < len(samples):
+            rest = len(samples) - first
+            self._mix[:rest] += samples[first:]
+            self._covered[:rest] = True
+
+    def _watermark(self, now: float) -> int:
+        """Timeline position every source has processed past."""
+        floor = self._position(now - self.max_lag)
+        marks = []
+        for source in self._sources:
+            processed = source.capture.processed_until if source.capture is not None else 0.0
+            marks.append(self._position(processed) if processed else floor)
+        return max(floor, min(marks)) if marks else floor
+
+    def flush(self, now: Optional[float] = None):
+        """Forward all audio that can no longer change."""
+        with self._lock:
+            self._emit(self._watermark(now if now is not None else time.perf_counter()))
+
+    def _emit(self, upto: int):
+        """Forward the covered stretches of [emitted, upto) (lock held)."""
+        while self.emitted < upto:
+            offset = self.emitted % self.capacity
+            n = min(upto - self.emitted, self.capacity - offset)
+            covered = self._covered[offset:offset + n]
+            if covered.any():
+                edges = np.flatnonzero(np.diff(covered.astype(np.int8))) + 1
+                bounds = np.concatenate(([0], edges, [n]))
+                for begin, end in zip(bounds[:-1], bounds[1:]):
+                    if covered[begin]:
+                        self._forward(self._mix[offset + begin:offset + end])
+                self._mix[offset:offset + n] = 0.0
+                covered[:] = False
+            self.emitted += n
+
+    def _forward(self, audio: np.ndarray):
+        for begin in range(0, len(audio), Config.BUFFER_SIZE):
+            piece = audio[begin:begin + Config.BUFFER_SIZE]
+            try:
+                self.output.put(piece if getattr(self.output, "copies_items", False) else piece.copy(),
+                                timeout=0.1)
+            except queue.Full:
+                self.dropped_samples += len(piece)
+
+    def start(self):
+        self.is_running = True
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True, name="audio-mixer")
+        self._thread.start()
+
+    def stop(self):
+        self.is_running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        with self._lock:
+            self._emit(max((s.next_pos or 0) for s in self._sources) if self._sources else self.emitted)
+
+    def _flush_loop(self):
+        while self.is_running:
+            time.sleep(Config.CHUNK_DURATION / 4)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audio mixer error: {e}", exc_info=True)
+
+    def get_status(self) -> dict:
+        return {"mix_late_samples": self.late_samples, "mix_dropped_samples": self.dropped_samples}
+
+
+class MultiSourceTranscriber:
+    """Transcription side of multi-source capture (the WhisperTranscriber interface).
+
+    ``text_callback`` receives ``source=`` (the source name, or 'mix') in
+    addition to the usual ``(text, latency, timestamp, is_final)``.
+    """
+
+    def __init__(self, sources: List[str], text_callback: Callable, mode: str = "separate"):
+        """
+        Initialize the transcription streams.
+
+        Args:
+            sources: Source names, e.g. ['loopback', 'mic']
+            text_callback: Function(text, latency, timestamp, is_final=False, source=name)
+            mode: 'separate' (one attributed stream per source) or 'mix' (one mixed stream)
+        """
+        if mode not in ("separate", "mix"):
+            raise ValueError(f"Unknown multi-source mode '{mode}'")
+        self.sources = sources
+        self.mode = mode
+        self.text_callback = text_callback
+        self.engine = None
+        self.mixer: Optional[AudioMixer] = None
+        self.transcribers: Dict[str, object] = {}
+        self._engine_model = None
+        self.is_running = False
+
+        # Queues each source's AudioCapture writes into (available before the model loads)
+        if mode == "mix":
+            self.rings = {"mix": create_audio_ring()}
+            self.mixer = AudioMixer(self.rings["mix"], Config.SAMPLE_RATE)
+            self.inputs = {source: self.mixer.input(source) for source in sources}
+        else:
+            self.rings = {source: create_audio_ring() for source in sources}
+            self.inputs = dict(self.rings)
+
+    def _attributed(self, source: str) -> Callable:
+        def callback(text, latency, timestamp, is_final=False):
+            self.text_callback(text, latency, timestamp, is_final=is_final, source=source)
+        return callback
+
+    def load_model(self) -> bool:
+        """Load the shared model and build the per-source streams."""
+        from transcriber import WhisperTranscriber, acquire_whisper_model
+
+        if self.transcribers:
+            return True
+        if self.mode == "mix":
+            transcriber = WhisperTranscriber(self.rings["mix"], self._attributed("mix"))
+            if not transcriber.load_model():
+                return False
+            self.transcribers = {"mix": transcriber}
+            return True
+
+        # Separate streams: one model and one batching engine shared by all sources
+        from batch_engine import BatchedInferenceEngine
+        try:
+            self._engine_model = acquire_whisper_model(Config.get_live_model())
+        except Exception as e:
+            logger.error(f"Failed to load shared model: {e}", exc_info=True)
+            return False
+        self.engine = BatchedInferenceEngine(
+            self._engine_model, max_batch_size=len(self.sources), beam_size=Config.BEAM_SIZE
+        )
+        for source in self.sources:
+            transcriber = WhisperTranscriber(self.rings[source], self._attributed(source), engine=self.engine)
+            # Borrow the engine's model now (start() would), so warm_up() can use it
+            transcriber.model = transcriber.final_model = self.engine.model
+            transcriber.batched_model = self.engine.pipeline
+            self.transcribers[source] = transcriber
+        return True
+
+    def warm_up(self) -> float:
+        """Warm up the shared model once (all streams decode with it)."""
+        transcriber = next(iter(self.transcribers.values()), None)
+        return transcriber.warm_up() if transcriber is not None else 0.0
+
+    def start(self) -> bool:
+        if self.is_running:
+            return True
+        if not self.transcribers and not self.load_model():
+            return False
+        if self.engine is not None:
+            self.engine.start()
+        if self.mixer is not None:
+            self.mixer.start()
+        for transcriber in self.transcribers.values():
+            if not transcriber.start():
+                return False
+        self.is_running = True
+        logger.info(f"Multi-source transcription started ({self.mode}: {', '.join(self.sources)})")
+        return True
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        if self.mixer is not None:
+            self.mixer.stop()  # Forward what is left before the transcriber drains
+        for transcriber in self.transcribers.values():
+            transcriber.stop()
+        if self.engine is not None:
+            self.engine.stop()
+        if self._engine_model is not None:
+            model_registry.release(self._engine_model)
+            self._engine_model = None
+        for ring in self.rings.values():
+            ring.close()
+
+    @property
+    def error_count(self) -> int:
+        engine_errors = self.engine.error_count if self.engine is not None else 0
+        return engine_errors + sum(t.error_count for t in self.transcribers.values())
+
+    def get_status(self) -> dict:
+        status = {"mode": self.mode, "sources": self.sources}
+        if self.engine is not None:
+            status["engine"] = self.engine.get_status()
+        if self.mixer is not None:
+            status.update(self.mixer.get_status())
+        return status
+
+
+class CaptureGroup:
+    """Capture side of multi-source capture (the AudioCapture interface).
+
+    One AudioCapture per source, each with its own recorder thread and VAD,
+    writing into the matching MultiSourceTranscriber input.
+    """
+
+    def __init__(self, inputs: Dict[str, object], device_names: Optional[Dict[str, str]] = None):
+        from audio_capture import AudioCapture
+
+        device_names = device_names or {}
+        self.captures = {}
+        for source, sink in inputs.items():
+            capture = AudioCapture(sink, device_names.get(source) or None, source=source)
+            if hasattr(sink, "attach"):
+                sink.attach(capture)
+            self.captures[source] = capture
+            logger.info(f"Capture source '{source}': {capture.mic.name}")
+
+    @property
+    def mic(self):
+        """First source's device (for logging)."""
+        return next(iter(self.captures.values())).mic
+
+    @property
+    def is_running(self) -> bool:
+        return any(capture.is_running for capture in self.captures.values())
+
+    def start(self) -> bool:
+        return all(capture.start() for capture in self.captures.values())
+
+    def stop(self):
+        for capture in self.captures.values():
+            capture.stop()
+
+    def get_health_status(self) -> dict:
+        per_source = {source: capture.get_health_status() for source, capture in self.captures.items()}
+        return {
+            "is_running": self.is_running,
+            "error_count": sum(h["error_count"] for h in per_source.values()),
+            "queue_size": sum(h["queue_size"] for h in per_source.values()),
+            "sources": per_source,
+        }
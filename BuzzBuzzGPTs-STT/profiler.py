@@ -0,0 +1,163 @@
+"""
+On-demand sampling profiler for live sessions.
+
+Samples the Python stacks of every thread (capture, transcriber, monitor,
+Tk main loop, ...) at a fixed interval for a limited time and writes them
+as collapsed stacks (``thread;outer;...;inner count``), the input format
+of flamegraph.pl, speedscope and similar tools. Each stack starts with the
+thread name so threads can be told apart in the flame graph.
+
+A profile is started with SIGUSR1 (POSIX) or HealthMonitor.request_profile().
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from config import Config
+from logger_config import get_logger
+from typing import Dict, Optional
+
+logger = get_logger(__name__)
+
+
+class SamplingProfiler:
+    """Samples all thread stacks with sys._current_frames()."""
+
+    def __init__(self, interval: float = 0.01, output_dir: str = "logs"):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            output_dir: Directory for .collapsed output files
+        """
+        self.interval = interval
+        self.output_dir = output_dir
+        self.samples = 0
+        self._labels: Dict[object, str] = {}  # Code object -> frame label
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_output: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self, stacks: Counter, skip_ident: Optional[int] = None):
+        """Add one sample of every thread's stack to ``stacks``."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[tuple(reversed(labels))] += 1
+        self.samples += 1
+
+    def collect(self, duration: float) -> Counter:
+        """Sample for ``duration`` seconds on the calling thread."""
+        stacks: Counter = Counter()
+        me = threading.get_ident()
+        deadline = time.perf_counter() + duration
+        next_sample = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+            self.sample(stacks, skip_ident=me)
+            next_sample += self.interval
+        return stacks
+
+    def write_collapsed(self, stacks: Counter, path: str):
+        """Write ``stacks`` in collapsed format (written atomically)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1]):
+                f.write(";".join(part.replace(";", ":") for part in stack) + f" {count}\n")
+        os.replace(tmp_path, path)
+
+    def profile(self, duration: float) -> str:
+        """Profile all threads for ``duration`` seconds and write the result.
+
+        Returns:
+            Path of the .collapsed file
+        """
+        start_samples = self.samples
+        stacks = self.collect(duration)
+        path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed")
+        self.write_collapsed(stacks, path)
+        self.last_output = path
+        logger.info(f"Profile written to {path} ({self.samples - start_samples} samples over {duration:.1f}s)")
+        return path
+
+    def start(self, duration: float) -> bool:
+        """Profile in a background thread.
+
+        Returns:
+            False if a profile is already running
+        """
+        with self._lock:
+            if self.is_running:
+                logger.warning("Profile already in progress")
+                return False
+            self._thread = threading.Thread(
+                target=self._run, args=(duration,), daemon=True, name="sampling-profiler"
+            )
+            self._thread.start()
+            return True
+
+    def _run(self, duration: float):
+        try:
+            self.profile(duration)
+        except Exception as e:
+            logger.error(f"Profiling failed: {e}", exc_info=True)
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """Process-wide profiler configured from Config."""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(Config.PROFILE_INTERVAL, Config.PROFILE_DIR or Config.LOG_DIR)
+    return _profiler
+
+
+def install_signal_handler(signum: Optional[int] = None) -> bool:
+    """Start a PROFILE_DURATION profile whenever ``signum`` (SIGUSR1) arrives.
+
+    Must be called from the main thread. Returns False where the signal
+    does not exist (Windows); use HealthMonitor.request_profile() there.
+    """
+    signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+    if signum is None:
+        return False
+
+    def handler(received, frame):
+        logger.info(f"Signal {received} received, profiling for {Config.PROFILE_DURATION:.0f}s")
+        get_profiler().start(Config.PROFILE_DURATION)
+
+    signal.signal(signum, handler)
+    logger.info(f"Send signal {signum} (kill -USR1 {os.getpid()}) to profile this process")
+    return True
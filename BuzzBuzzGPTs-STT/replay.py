@@ -0,0 +1,346 @@
+"""
+Deterministic replay harness for end-to-end latency measurements.
+
+A recording is played through a fake loopback device into the real
+AudioCapture and WhisperTranscriber, at real-time or accelerated pacing,
+without a sound server. Audio goes through the production SPSCAudioRing
+hand-off. Every queued chunk's capture-to-callback latency, ring drops and
+spills, and the delay from the end of each utterance to its final text
+are collected into a JSON report that can be compared across configs and
+commits.
+
+Usage:
+    python replay.py recording.wav [--speed 2.0] [--output report.json]
+"""
+
+import argparse
+import hashlib
+import json
+import queue
+import subprocess
+import sys
+import threading
+import time
+import types
+import numpy as np
+from audio_ring import SPSCAudioRing, create_audio_ring
+from config import Config
+from logger_config import get_logger
+from typing import List, Optional
+
+logger = get_logger(__name__)
+
+
+class FakeRecorder:
+    """Recorder returning the replayed audio, paced like a real device.
+
+    Chunk ``i`` is released at ``start + (i + 1) * chunk / speed``; a loop that
+    falls behind gets the backlog immediately, as from a device buffer.
+    After the recording, silence is returned until the capture stops.
+    """
+
+    def __init__(self, mic: "FakeMicrophone"):
+        self.mic = mic
+
+    def __enter__(self):
+        self.mic.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def record(self, numframes: int) -> np.ndarray:
+        mic = self.mic
+        start = mic.position
+        mic.position += numframes
+        release = mic.start_time + mic.position / (mic.sample_rate * mic.speed)
+        delay = release - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        mic.last_release = release
+
+        chunk = mic.audio[start:start + numframes]
+        if len(chunk) < numframes:
+            mic.exhausted.set()
+            chunk = np.pad(chunk, (0, numframes - len(chunk)))
+        return np.repeat(chunk[:, None], mic.channels, axis=1)
+
+
+class FakeMicrophone:
+    """Loopback 'device' backed by an in-memory recording."""
+
+    isloopback = True
+
+    def __init__(self, audio: np.ndarray, sample_rate: int, speed: float = 1.0,
+                 channels: int = 2, name: str = "Replay (Loopback)"):
+        self.audio = audio.astype(np.float32, copy=False)
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.channels = channels
+        self.name = name
+        self.position = 0
+        self.start_time = 0.0
+        self.last_release = 0.0  # Release time of the most recent chunk
+        self.exhausted = threading.Event()
+
+    def recorder(self, samplerate: int, channels=None, blocksize: Optional[int] = None) -> FakeRecorder:
+        if samplerate != self.sample_rate:
+            raise ValueError(f"Replay audio is {self.sample_rate} Hz, recorder asked for {samplerate} Hz")
+        return FakeRecorder(self)
+
+
+def fake_soundcard(mic: FakeMicrophone) -> types.SimpleNamespace:
+    """Stand-in for the soundcard module exposing only ``mic``."""
+    speaker = types.SimpleNamespace(name=mic.name.replace(" (Loopback)", ""))
+    return types.SimpleNamespace(
+        default_speaker=lambda: speaker,
+        all_speakers=lambda: [speaker],
+        all_microphones=lambda include_loopback=False: [mic] if include_loopback else []
+    )
+
+
+def _import_audio_capture():
+    """Import audio_capture on machines without a sound server.
+
+    soundcard binds to PulseAudio/CoreAudio/WASAPI at import time; the
+    replay never touches a real device, so a placeholder is registered
+    when that binding is unavailable.
+    """
+    try:
+        import soundcard  # noqa: F401
+    except (ImportError, OSError, RuntimeError, AssertionError) as e:
+        logger.info(f"soundcard unavailable ({e}); replaying without a sound server")
+        sys.modules["soundcard"] = types.ModuleType("soundcard")
+    import audio_capture
+    return audio_capture
+
+
+class TimedRing(SPSCAudioRing):
+    """Production audio ring that stamps chunks with their capture time.
+
+    The ring's per-chunk enqueue stamp is the fake device's release time, so
+    the stamps the transcriber releases are capture times. They are also
+    collected here for the report, and rejected chunks are counted.
+    """
+
+    def __init__(self, mic: FakeMicrophone, **kwargs):
+        super().__init__(**kwargs)
+        self.mic = mic
+        self.drops = 0  # Chunks rejected with queue.Full
+        self.dequeued: List[float] = []  # Capture times of chunks consumed, awaiting a callback
+        self.last_dequeued = 0.0
+
+    def _stamp(self) -> float:
+        return self.mic.last_release
+
+    def put(self, chunk: np.ndarray, block: bool = True, timeout: Optional[float] = None):
+        try:
+            super().put(chunk, block, timeout)
+        except queue.Full:
+            self.drops += 1
+            raise
+
+    def _release_locked(self) -> List[float]:
+        stamps = super()._release_locked()
+        if stamps:
+            self.dequeued.extend(stamps)
+            self.last_dequeued = stamps[-1]
+        return stamps
+
+    def take_dequeued(self) -> List[float]:
+        with self._cond:
+            taken, self.dequeued = self.dequeued, []
+        return taken
+
+
+def summarize(values: List[float]) -> dict:
+    """Count, mean and p50/p95/p99/max of a list of seconds."""
+    if not values:
+        return {"count": 0}
+    data = np.asarray(values)
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean": round(float(data.mean()), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "max": round(float(data.max()), 4),
+    }
+
+
+class ReplayHarness:
+    """Drive AudioCapture and WhisperTranscriber from a recording.
+
+    The transcriber is created up front, so a caller can inject a model
+    (``harness.transcriber.model = ...``) before ``run()``; otherwise the
+    configured models are loaded.
+    """
+
+    def __init__(self, audio: np.ndarray, speed: float = 1.0, channels: int = 2,
+                 settle_timeout: float = 30.0):
+        """
+        Initialize the harness.
+
+        Args:
+            audio: Mono float32 recording at Config.SAMPLE_RATE
+            speed: Pacing multiplier (1.0 = real time)
+            channels: Channels the fake device reports (exercises the downmix)
+            settle_timeout: Max seconds to wait for final passes after the recording ends
+        """
+        from transcriber import WhisperTranscriber
+
+        self.mic = FakeMicrophone(audio, Config.SAMPLE_RATE, speed, channels)
+        self.audio_queue = create_audio_ring(TimedRing, mic=self.mic)
+        self.transcriber = WhisperTranscriber(self.audio_queue, self._on_text)
+        self.settle_timeout = settle_timeout
+
+        self.chunk_latencies: List[float] = []
+        self.finalization_delays: List[float] = []
+        self.live_updates = 0
+        self.finals = 0
+        self._sealed = 0
+        self._finalized = 0
+        self._utterance_ends: List[float] = []
+        self._instrument_transcriber()
+
+    def _instrument_transcriber(self):
+        transcriber = self.transcriber
+        seal, finalize = transcriber._seal_utterance, transcriber._finalize
+
+        def seal_utterance(beam_size):
+            self._utterance_ends.append(self.audio_queue.last_dequeued)
+            self._sealed += 1
+            seal(beam_size)
+
+        def finalize_utterance(audio, beam_size):
+            finalize(audio, beam_size)
+            self.finalization_delays.append(time.perf_counter() - self._utterance_ends.pop(0))
+            self._finalized += 1
+
+        transcriber._seal_utterance = seal_utterance
+        transcriber._finalize = finalize_utterance
+
+    def _on_text(self, text, latency, timestamp, is_final=False):
+        now = time.perf_counter()
+        if is_final:
+            self.finals += 1
+        else:
+            self.live_updates += 1
+        # Every chunk taken so far is covered by this output
+        self.chunk_latencies.extend(now - captured for captured in self.audio_queue.take_dequeued())
+
+    def _settled(self) -> bool:
+        return (
+            self.audio_queue.empty()
+            and len(self.transcriber.audio_buffer) == 0
+            and self._finalized == self._sealed
+        )
+
+    def run(self) -> dict:
+        """Replay the recording and return the report."""
+        audio_capture = _import_audio_capture()
+        real_sc = getattr(audio_capture, "sc", None)
+        audio_capture.sc = fake_soundcard(self.mic)
+        try:
+            capture = audio_capture.AudioCapture(self.audio_queue)
+            if self.transcriber.model is None and not self.transcriber.load_model():
+                raise RuntimeError("Model loading failed")
+
+            self.transcriber.start()
+            capture.start()
+            start_t = time.perf_counter()
+            self.mic.exhausted.wait()
+            replay_seconds = time.perf_counter() - start_t
+
+            # Trailing silence lets the last utterance finalize
+            deadline = time.perf_counter() + Config.FINALIZATION_PAUSE + self.settle_timeout
+            time.sleep(0.5)
+            while not self._settled() and time.perf_counter() < deadline:
+                time.sleep(0.1)
+            settled = self._settled()
+
+            capture.stop()
+            self.transcriber.stop()
+        finally:
+            audio_capture.sc = real_sc
+            self.audio_queue.close()
+
+        return {
+            "audio_seconds": round(len(self.mic.audio) / self.mic.sample_rate, 3),
+            "speed": self.mic.speed,
+            "replay_seconds": round(replay_seconds, 3),
+            "settled": settled,
+            "chunks": {
+                "captured": capture.chunks_gated + capture.chunks_passed,
+                "gated": capture.chunks_gated,
+                "dropped": self.audio_queue.drops,
+                "queued": capture.chunks_passed - self.audio_queue.drops,
+            },
+            "ring": {
+                "policy": self.audio_queue.policy,
+                "dropped_samples": self.audio_queue.dropped_samples,
+                "spilled_samples": self.audio_queue.spilled_samples,
+            },
+            "live_updates": self.live_updates,
+            "finals": self.finals,
+            "capture_to_callback": summarize(self.chunk_latencies),
+            "finalization_delay": summarize(self.finalization_delays),
+            "transcriber_errors": self.transcriber.error_count,
+            "degradation_level": self.transcriber.degradation_level,
+        }
+
+
+def config_snapshot() -> dict:
+    """Settings that affect latency, recorded with every report."""
+    keys = [
+        "LIVE_MODE", "CHUNK_DURATION", "FINALIZATION_PAUSE", "LIVE_WINDOW_DURATION",
+        "LIVE_LATENCY_BUDGET", "BEAM_SIZE", "MAX_QUEUE_SIZE", "ENABLE_VAD", "VAD_BACKEND",
+        "VAD_THRESHOLD", "FINAL_SEGMENT_DURATION", "FINAL_BATCH_SIZE", "USE_GPU",
+    ]
+    snapshot = {key: getattr(Config, key) for key in keys}
+    snapshot["LIVE_MODEL"] = Config.get_live_model()
+    snapshot["FINAL_MODEL"] = Config.get_final_model()
+    return snapshot
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    from faster_whisper import decode_audio
+
+    parser = argparse.ArgumentParser(description="Replay a recording through capture and transcription")
+    parser.add_argument("input", help="Recording to replay (any format av can decode)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pacing multiplier (1.0 = real time)")
+    parser.add_argument("--channels", type=int, default=2, help="Channels reported by the fake device")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (stdout if omitted)")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    with open(args.input, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    audio = decode_audio(args.input, sampling_rate=Config.SAMPLE_RATE)
+
+    report = {
+        "input": {"path": args.input, "sha256": digest},
+        "commit": _git_commit(),
+        "config": config_snapshot(),
+        **ReplayHarness(audio, speed=args.speed, channels=args.channels).run(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Deadline-aware scheduling of live transcription passes.
+Degrades live quality step by step when decoding falls behind real time.
+"""
+
+import time
+from typing import Optional
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LiveScheduler:
+    """Decides when and how to run live passes within a latency budget.
+
+    The scheduler keeps an exponential moving average of the live decode time
+    and real-time factor (decode seconds per audio second). When the average
+    decode time exceeds the budget it raises the degradation level; when it
+    falls well below the budget for several passes it lowers it again.
+
+    Levels:
+        0 NORMAL          full live window, configured beam size
+        1 REDUCED_BEAM    beam size 1 (skipped when the configured beam is already 1)
+        2 SHRUNK_WINDOW   beam size 1, half the live window
+        3 COALESCED       beam size 1, half window, at most one pass per interval
+
+    Live passes are only ever skipped, never the audio: the transcriber keeps
+    draining the queue into its buffer and the final pass sees everything.
+    """
+
+    NORMAL = 0
+    REDUCED_BEAM = 1
+    SHRUNK_WINDOW = 2
+    COALESCED = 3
+    LEVEL_NAMES = ("normal", "reduced_beam", "shrunk_window", "coalesced")
+
+    def __init__(
+        self,
+        latency_budget: float,
+        window_seconds: float,
+        beam_size: int = 1,
+        smoothing: float = 0.3,
+        recovery_passes: int = 5
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            latency_budget: Target upper bound for one live decode (seconds)
+            window_seconds: Live window length at level NORMAL
+            beam_size: Live beam size at level NORMAL
+            smoothing: EMA weight of the newest measurement
+            recovery_passes: Consecutive fast passes required before stepping down
+        """
+        self.latency_budget = latency_budget
+        self.base_window_seconds = window_seconds
+        self.base_beam_size = beam_size
+        self.smoothing = smoothing
+        self.recovery_passes = recovery_passes
+
+        self.level = self.NORMAL
+        self.average_decode_time = 0.0
+        self.real_time_factor = 0.0
+        self.passes_run = 0
+        self.passes_skipped = 0
+        self._fast_streak = 0
+        self._last_pass_time = 0.0
+
+    @property
+    def level_name(self) -> str:
+        return self.LEVEL_NAMES[self.level]
+
+    @property
+    def beam_size(self) -> int:
+        return self.base_beam_size if self.level == self.NORMAL else 1
+
+    @property
+    def window_seconds(self) -> float:
+        if self.level >= self.SHRUNK_WINDOW:
+            return self.base_window_seconds / 2
+        return self.base_window_seconds
+
+    def should_run_live(self, backlog: int = 0, now: Optional[float] = None) -> bool:
+        """Return True if a live pass should run now.
+
+        Args:
+            backlog: Chunks already waiting in the audio queue
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        # More audio is already waiting: drain it first and coalesce into one pass
+        if backlog > 0:
+            self.passes_skipped += 1
+            return False
+        if self.level >= self.COALESCED:
+            min_interval = 2 * max(self.average_decode_time, self.latency_budget)
+            if now - self._last_pass_time < min_interval:
+                self.passes_skipped += 1
+                return False
+        return True
+
+    def record(self, decode_seconds: float, audio_seconds: float, now: Optional[float] = None):
+        """Record a completed live pass and adjust the degradation level."""
+        self._last_pass_time = time.time() if now is None else now
+        self.passes_run += 1
+
+        if self.passes_run == 1:
+            self.average_decode_time = decode_seconds
+        else:
+            self.average_decode_time += self.smoothing * (decode_seconds - self.average_decode_time)
+        if audio_seconds > 0:
+            rtf = decode_seconds / audio_seconds
+            self.real_time_factor += self.smoothing * (rtf - self.real_time_factor)
+
+        if self.average_decode_time > self.latency_budget:
+            self._fast_streak = 0
+            if self.level < self.COALESCED:
+                self._set_level(self._step(+1))
+        elif self.average_decode_time < self.latency_budget / 2:
+            self._fast_streak += 1
+            if self._fast_streak >= self.recovery_passes and self.level > self.NORMAL:
+                self._fast_streak = 0
+                self._set_level(self._step(-1))
+        else:
+            self._fast_streak = 0
+
+    def reset_level(self):
+        """Return to full quality (e.g. after the model or device changes)."""
+        self._fast_streak = 0
+        self._set_level(self.NORMAL)
+
+    def get_status(self) -> dict:
+        """Get scheduler metrics."""
+        return {
+            "degradation_level": self.level,
+            "degradation_name": self.level_name,
+            "average_decode_time": self.average_decode_time,
+            "real_time_factor": self.real_time_factor,
+            "live_passes_run": self.passes_run,
+            "live_passes_skipped": self.passes_skipped
+        }
+
+    def _step(self, direction: int) -> int:
+        """The next level up (+1) or down (-1)."""
+        level = self.level + direction
+        # With a base beam of 1, REDUCED_BEAM equals NORMAL and would only cost a step
+        if level == self.REDUCED_BEAM and self.base_beam_size == 1:
+            level += direction
+        return level
+
+    def _set_level(self, level: int):
+        if level != self.level:
+            logger.info(
+                f"Live degradation level {self.LEVEL_NAMES[self.level]} -> {self.LEVEL_NAMES[level]} "
+                f"(avg decode {self.average_decode_time:.2f}s, budget {self.latency_budget:.2f}s)"
+            )
+            self.level = level
@@ -0,0 +1,63 @@
+"""
+Energy-based segmentation of long utterances for the parallel final pass.
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+
+def frame_energy(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    """Mean-square energy of consecutive non-overlapping frames (vectorized)."""
+    num_frames = len(audio) // frame_size
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:num_frames * frame_size].reshape(num_frames, frame_size)
+    return np.einsum("ij,ij->i", frames, frames) / frame_size
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int,
+    max_segment: float = 20.0,
+    search_window: float = 5.0,
+    frame_duration: float = 0.02
+) -> List[Tuple[int, int]]:
+    """Split audio into pieces no longer than ``max_segment`` at low-energy points.
+
+    Each cut is placed at the quietest frame in the last ``search_window``
+    seconds before the piece would exceed ``max_segment``, so words are
+    rarely cut in half.
+
+    Args:
+        audio: Mono float32 samples
+        sample_rate: Sample rate of ``audio``
+        max_segment: Maximum piece length in seconds (Whisper decodes 30 s windows)
+        search_window: How far back from the limit to look for a quiet point
+        frame_duration: Energy frame length in seconds
+
+    Returns:
+        List of (start_sample, end_sample) ranges covering the whole input, in order
+    """
+    total = len(audio)
+    max_samples = int(max_segment * sample_rate)
+    if total <= max_samples:
+        return [(0, total)] if total else []
+
+    frame_size = max(1, int(frame_duration * sample_rate))
+    energy = frame_energy(audio, frame_size)
+    search_frames = max(1, int(search_window * sample_rate) // frame_size)
+
+    segments = []
+    start = 0
+    while total - start > max_samples:
+        limit_frame = (start + max_samples) // frame_size
+        first_frame = max(start // frame_size + 1, limit_frame - search_frames)
+        window = energy[first_frame:limit_frame]
+        if len(window):
+            cut = (first_frame + int(np.argmin(window))) * frame_size
+        else:
+            cut = start + max_samples
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, total))
+    return segments
@@ -0,0 +1,425 @@
+"""
+Local streaming transcription server.
+
+A long-running daemon other processes (e.g. the Electron app) connect to
+instead of embedding the STT code. Each connection streams raw PCM in and
+receives partial and final transcripts back. All sessions share one warm
+model through the BatchedInferenceEngine, so concurrent speakers are
+decoded in batched calls.
+
+Protocol (TCP on SERVER_HOST:SERVER_PORT, or a Unix socket at SERVER_SOCKET).
+Every message is one frame: a 1-byte type, a 4-byte big-endian payload
+length, then the payload.
+
+    client -> server
+      START  0x01  JSON {"sample_rate": 16000, "encoding": "s16le"|"f32le", "channels": 1}
+      AUDIO  0x02  interleaved little-endian PCM (any length)
+      END    0x03  end of stream: the speech in progress is finalized
+    server -> client
+      READY  0x81  JSON {"session": id, "sample_rate": 16000}
+      PARTIAL 0x82 / FINAL 0x83  >d timestamp, >f latency, UTF-8 text
+      DONE   0x84  all finals sent (after END); the server closes
+      ERROR  0x8F  UTF-8 message; the server closes
+
+Incoming audio is cut into CHUNK_DURATION chunks and gated by the same
+VAD and hangover as live capture. Silence never reaches the transcriber,
+so a pause in a continuous stream finalizes the utterance just like a
+pause in captured audio does.
+
+Backpressure is per connection. When a session's audio ring is full, the
+server stops reading that socket, so TCP flow control slows only that
+client. Transcripts waiting for a slow reader are held in a bounded
+EventBuffer: stale partials are dropped first, finals are kept.
+
+Usage:
+    python stream_server.py [--host 127.0.0.1] [--port 8765] [--unix /tmp/stt.sock]
+"""
+
+import argparse
+import asyncio
+import json
+import struct
+import sys
+import numpy as np
+from async_stream import EventBuffer, TranscriptionEvent
+from audio_dsp import PolyphaseResampler, downmix_into, rms
+from audio_ring import SPSCAudioRing
+from config import Config
+from logger_config import get_logger
+from model_registry import model_registry
+from typing import Iterator, Optional
+from vad import SpeechGate, create_speech_gate
+
+logger = get_logger(__name__)
+
+FRAME_HEADER = struct.Struct(">BI")
+RESULT_HEADER = struct.Struct(">df")  # timestamp, latency
+MAX_FRAME_SIZE = 1 << 20
+
+MSG_START = 0x01
+MSG_AUDIO = 0x02
+MSG_END = 0x03
+MSG_READY = 0x81
+MSG_PARTIAL = 0x82
+MSG_FINAL = 0x83
+MSG_DONE = 0x84
+MSG_ERROR = 0x8F
+
+ENCODINGS = {"s16le": np.dtype("<i2"), "f32le": np.dtype("<f4")}
+
+
+class ProtocolError(Exception):
+    """Malformed or unexpected frame from a client."""
+    pass
+
+
+def encode_frame(msg_type: int, payload: bytes = b"") -> bytes:
+    return FRAME_HEADER.pack(msg_type, len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    """Read one frame.
+
+    Returns:
+        (type, payload), or (None, b"") at a clean end of stream
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Connection closed inside a frame header")
+        return None, b""
+    msg_type, length = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+    try:
+        return msg_type, await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Connection closed inside a frame")
+
+
+def encode_result(event: TranscriptionEvent) -> bytes:
+    payload = RESULT_HEADER.pack(event.timestamp, event.latency or 0.0) + event.text.encode("utf-8")
+    return encode_frame(MSG_FINAL if event.is_final else MSG_PARTIAL, payload)
+
+
+def decode_result(payload: bytes):
+    """Split a PARTIAL/FINAL payload into (timestamp, latency, text)."""
+    timestamp, latency = RESULT_HEADER.unpack_from(payload)
+    return timestamp, latency, payload[RESULT_HEADER.size:].decode("utf-8")
+
+
+class PCMDecoder:
+    """Converts a client's PCM byte stream to SAMPLE_RATE mono float32 pieces."""
+
+    def __init__(self, sample_rate: int, encoding: str, channels: int):
+        if encoding not in ENCODINGS:
+            raise ProtocolError(f"Unsupported encoding '{encoding}', expected one of {list(ENCODINGS)}")
+        if not 1 <= channels <= 8 or not 8000 <= sample_rate <= 192000:
+            raise ProtocolError(f"Unsupported format: {sample_rate} Hz, {channels} channels")
+        self.dtype = ENCODINGS[encoding]
+        self.scale = np.float32(1 / 32768) if encoding == "s16le" else None
+        self.channels = channels
+        self.frame_bytes = self.dtype.itemsize * channels
+        self._remainder = b""  # Partial sample frame carried to the next AUDIO frame
+        self._mono = np.empty(0, dtype=np.float32)
+        self.resampler = None
+        if sample_rate != Config.SAMPLE_RATE:
+            self.resampler = PolyphaseResampler(sample_rate, Config.SAMPLE_RATE, max_block=sample_rate // 10)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Samples for ``data`` (a view of scratch buffers, valid until the next call)."""
+        if self._remainder:
+            data = self._remainder + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        frames = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        frames = frames.reshape(-1, self.channels)
+        if len(self._mono) < len(frames):
+            self._mono = np.empty(len(frames), dtype=np.float32)
+        mono = downmix_into(frames, self._mono)
+        if self.scale is not None:
+            mono *= self.scale
+        return self.resampler.process(mono) if self.resampler is not None else mono
+
+
+class SpeechChunker:
+    """Cuts decoded audio into BUFFER_SIZE chunks and drops the ones the VAD gates."""
+
+    def __init__(self, gate: SpeechGate):
+        self.gate = gate
+        self._pending = np.empty(Config.BUFFER_SIZE, dtype=np.float32)
+        self._fill = 0
+        self.chunks_gated = 0
+        self.chunks_passed = 0
+
+    def push(self, samples: np.ndarray) -> Iterator[np.ndarray]:
+        """Yield every completed chunk that passes the gate (a scratch view; copy or put it before resuming)."""
+        offset = 0
+        while offset < len(samples):
+            take = min(len(samples) - offset, len(self._pending) - self._fill)
+            self._pending[self._fill:self._fill + take] = samples[offset:offset + take]
+            self._fill += take
+            offset += take
+            if self._fill == len(self._pending):
+                self._fill = 0
+                if self._admit(self._pending):
+                    yield self._pending
+
+    def flush(self) -> Optional[np.ndarray]:
+        """The incomplete last chunk, if it passes the gate."""
+        tail = self._pending[:self._fill]
+        self._fill = 0
+        return tail if len(tail) and self._admit(tail) else None
+
+    def _admit(self, chunk: np.ndarray) -> bool:
+        if self.gate.admit(chunk, rms(chunk)):
+            self.chunks_passed += 1
+            return True
+        self.chunks_gated += 1
+        return False
+
+
+class StreamingServer:
+    """Serves transcription sessions over a local socket with one shared warm model."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 socket_path: Optional[str] = None, max_sessions: Optional[int] = None):
+        """
+        Initialize the server (the model is loaded by start()).
+
+        Args:
+            host: TCP host (Config.SERVER_HOST if None)
+            port: TCP port, 0 for any free port (Config.SERVER_PORT if None)
+            socket_path: Serve on this Unix socket instead of TCP (Config.SERVER_SOCKET if None)
+            max_sessions: Concurrent sessions; further connections are refused
+        """
+        self.host = host or Config.SERVER_HOST
+        self.port = Config.SERVER_PORT if port is None else port
+        self.socket_path = socket_path if socket_path is not None else (Config.SERVER_SOCKET or None)
+        self.max_sessions = max_sessions or Config.SERVER_MAX_SESSIONS
+        self.engine = None
+        self._model = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.sessions = {}
+        self.sessions_served = 0
+        self.sessions_refused = 0
+        self._next_id = 0
+
+    # --- Model --------------------------------------------------------------
+
+    def load_model(self):
+        """Load and warm up the shared model and start the batching engine (blocking)."""
+        from batch_engine import BatchedInferenceEngine
+        from transcriber import acquire_whisper_model
+
+        self._model = acquire_whisper_model(Config.get_live_model())
+        if Config.ENABLE_WARMUP:
+            audio = (np.random.default_rng(0).standard_normal(Config.SAMPLE_RATE) * 0.01).astype(np.float32)
+            segments, info = self._model.transcribe(audio, language="en", beam_size=Config.BEAM_SIZE)
+            list(segments)
+        self.engine = BatchedInferenceEngine(
+            self._model, max_batch_size=self.max_sessions, beam_size=Config.BEAM_SIZE
+        )
+        self.engine.start()
+
+    def release_model(self):
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
+        if self._model is not None:
+            model_registry.release(self._model)
+            self._model = None
+
+    def create_transcriber(self, ring: SPSCAudioRing, text_callback):
+        """Session transcriber; live windows go through the shared engine."""
+        from transcriber import WhisperTranscriber
+
+        return WhisperTranscriber(ring, text_callback, engine=self.engine)
+
+    # --- Lifecycle ----------------------------------------------------------
+
+    async def start(self):
+        """Load the model (in the executor) and start listening."""
+        await asyncio.get_running_loop().run_in_executor(None, self.load_model)
+        if self.socket_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+            logger.info(f"Streaming server listening on {self.socket_path}")
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            logger.info(f"Streaming server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await asyncio.get_running_loop().run_in_executor(None, self.release_model)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def get_status(self) -> dict:
+        status = {
+            "sessions_active": len(self.sessions),
+            "sessions_served": self.sessions_served,
+            "sessions_refused": self.sessions_refused,
+        }
+        if self.engine is not None:
+            status["engine"] = self.engine.get_status()
+        return status
+
+    # --- Sessions -----------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            self.sessions_refused += 1
+            await self._close_with_error(writer, f"Server busy ({self.max_sessions} sessions)")
+            writer.close()
+            return
+        self._next_id += 1
+        session_id = f"session-{self._next_id}"
+        self.sessions[session_id] = writer
+        self.sessions_served += 1
+        try:
+            await self._run_session(session_id, reader, writer)
+        except ProtocolError as e:
+            logger.warning(f"{session_id}: {e}")
+            await self._close_with_error(writer, str(e))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            logger.info(f"{session_id}: client disconnected")
+        except Exception as e:
+            logger.error(f"{session_id}: {e}", exc_info=True)
+            await self._close_with_error(writer, "Internal server error")
+        finally:
+            self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def _close_with_error(self, writer: asyncio.StreamWriter, message: str):
+        try:
+            writer.write(encode_frame(MSG_ERROR, message.encode("utf-8")))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _run_session(self, session_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        msg_type, payload = await read_frame(reader)
+        if msg_type != MSG_START:
+            raise ProtocolError("Expected a START frame")
+        try:
+            params = json.loads(payload or b"{}")
+        except ValueError:
+            raise ProtocolError("START payload is not valid JSON")
+        decoder = PCMDecoder(
+            int(params.get("sample_rate", Config.SAMPLE_RATE)),
+            params.get("encoding", "s16le"),
+            int(params.get("channels", 1))
+        )
+
+        # Producer side never blocks: the reader waits for room before each put
+        ring = SPSCAudioRing(
+            capacity=Config.BUFFER_SIZE * Config.MAX_QUEUE_SIZE, policy="drop_newest", chunk_size=Config.BUFFER_SIZE
+        )
+        events = EventBuffer(loop, Config.EVENT_BUFFER_SIZE, "drop_partials")
+        transcriber = self.create_transcriber(
+            ring, lambda text, latency, timestamp, is_final=False:
+                events.push_threadsafe(TranscriptionEvent(text, latency, timestamp, is_final))
+        )
+        # Cleanup covers a failed start too, so the ring never leaks
+        chunker = SpeechChunker(create_speech_gate())
+        sender = None
+        ended = False
+        try:
+            if not await loop.run_in_executor(None, transcriber.start):
+                raise RuntimeError("Failed to start session transcriber")
+            sender = asyncio.ensure_future(self._send_results(events, writer))
+            writer.write(encode_frame(MSG_READY, json.dumps(
+                {"session": session_id, "sample_rate": Config.SAMPLE_RATE}
+            ).encode("utf-8")))
+            logger.info(f"{session_id}: started ({params})")
+
+            while True:
+                msg_type, payload = await read_frame(reader)
+                if msg_type == MSG_AUDIO:
+                    for chunk in chunker.push(decoder.decode(payload)):
+                        await self._put(ring, chunk)
+                elif msg_type == MSG_END:
+                    tail = chunker.flush()
+                    if tail is not None:
+                        await self._put(ring, tail)
+                    ended = True
+                    break
+                elif msg_type is None:
+                    break  # Client went away without END
+                else:
+                    raise ProtocolError(f"Unexpected frame type 0x{msg_type:02x}")
+        finally:
+            # Finalize the last utterance only for a clean END
+            await loop.run_in_executor(None, lambda: transcriber.stop(flush=ended))
+            events.close_threadsafe()
+            if sender is not None:
+                await sender
+            ring.close()
+        if ended:
+            writer.write(encode_frame(MSG_DONE))
+            await writer.drain()
+        logger.info(f"{session_id}: finished ({chunker.chunks_passed} chunks passed, "
+                    f"{chunker.chunks_gated} gated, {events.dropped_events} partials dropped)")
+
+    async def _put(self, ring: SPSCAudioRing, chunk: np.ndarray):
+        """Copy a chunk into the session ring, pausing the socket while it is full."""
+        while ring.full():
+            await asyncio.sleep(Config.CHUNK_DURATION / 4)
+        ring.put(chunk)
+
+    async def _send_results(self, events: EventBuffer, writer: asyncio.StreamWriter):
+        try:
+            async for event in events:
+                writer.write(encode_result(event))
+                await writer.drain()  # A slow reader backs up into the EventBuffer
+        except ConnectionError:
+            pass
+
+
+def run_server_mode(host: Optional[str] = None, port: Optional[int] = None,
+                    socket_path: Optional[str] = None) -> int:
+    """Run the streaming server until interrupted (``--serve`` mode).
+
+    Returns:
+        Process exit code
+    """
+    server = StreamingServer(host, port, socket_path)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Streaming server stopped")
+    except Exception as e:
+        logger.critical(f"Streaming server failed: {e}", exc_info=True)
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local streaming transcription server")
+    parser.add_argument("--host", type=str, default=None, help="TCP host (default: SERVER_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="TCP port (default: SERVER_PORT)")
+    parser.add_argument("--unix", type=str, default=None, help="Unix socket path instead of TCP")
+    args = parser.parse_args()
+
+    from logger_config import setup_logging
+    from utils import apply_patches
+
+    apply_patches()
+    setup_logging(log_level=Config.LOG_LEVEL, log_dir=Config.LOG_DIR,
+                  console=Config.ENABLE_CONSOLE_LOGGING, file_logging=Config.ENABLE_FILE_LOGGING)
+    sys.exit(run_server_mode(args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Production-grade testing with mocks and fixtures.
 
 import unittest
 import queue
+import threading
 import numpy as np
 from unittest.mock import Mock, MagicMock, patch
 import time
@@ -48,10 +49,96 @@ class TestAudioCapture(unittest.TestCase):
         with self.assertRaises(AudioCaptureError):
             AudioCapture(audio_queue)
 
+    def test_device_switch_opens_new_recorder_first(self):
+        """Test a hot-swap reads from the new device, overlapping the recorders and measuring the gap."""
+        from config import Config
+        from audio_ring import SPSCAudioRing
+        from replay import FakeMicrophone, _import_audio_capture, fake_soundcard
+
+        audio_capture = _import_audio_capture()
+        sr = Config.SAMPLE_RATE
+        events = []
+
+        def tracked(mic):
+            make_recorder = mic.recorder
+
+            def recorder(**kwargs):
+                rec = make_recorder(**kwargs)
+                enter, leave = rec.__enter__, rec.__exit__
+                rec.__enter__ = lambda: events.append(f"open {mic.name}") or enter()
+                rec.__exit__ = lambda *exc: events.append(f"close {mic.name}") or leave(*exc)
+                return rec
+            mic.recorder = recorder
+            return mic
+
+        old = tracked(FakeMicrophone(np.full(sr * 30, 0.1, np.float32), sr, speed=8.0, name="Old (Loopback)"))
+        new = tracked(FakeMicrophone(np.full(sr * 30, 0.3, np.float32), sr, speed=8.0, name="New (Loopback)"))
+        ring = SPSCAudioRing(sr * 30, chunk_size=Config.BUFFER_SIZE)
+
+        with patch.object(audio_capture, "sc", fake_soundcard(old)), patch.object(Config, "ENABLE_VAD", True):
+            capture = audio_capture.AudioCapture(ring)
+            capture.start()
+            deadline = time.time() + 5.0
+            while capture.chunks_passed < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            capture._pending_mic = new
+            while capture.chunks_passed < 5 and time.time() < deadline:
+                time.sleep(0.01)
+            capture.stop()
+
+        self.assertEqual(events, ["open Old (Loopback)", "open New (Loopback)",
+                                  "close Old (Loopback)", "close New (Loopback)"])
+        self.assertEqual(capture.mic.name, "New (Loopback)")
+        self.assertEqual(capture.device_switches, 1)
+        self.assertLess(capture.last_switch_gap, 0.5)
+        levels = ring.get()
+        self.assertAlmostEqual(float(levels[0]), 0.1, places=5)
+        self.assertAlmostEqual(float(levels[-1]), 0.3, places=5)
+
+    def test_native_rate_capture_follows_the_device_rate(self):
+        """Test native-rate capture records at each device's own rate, not the configured fallback."""
+        from config import Config
+        from audio_ring import SPSCAudioRing
+        from replay import FakeMicrophone, _import_audio_capture, fake_soundcard
+
+        audio_capture = _import_audio_capture()
+        sr = Config.SAMPLE_RATE
+        # FakeMicrophone refuses a recorder at any rate but its own
+        old = FakeMicrophone(np.full(48000 * 30, 0.1, np.float32), 48000, speed=8.0, name="Old (Loopback)")
+        new = FakeMicrophone(np.full(32000 * 30, 0.3, np.float32), 32000, speed=8.0, name="New (Loopback)")
+        ring = SPSCAudioRing(sr * 30, chunk_size=Config.BUFFER_SIZE)
+
+        with patch.object(audio_capture, "sc", fake_soundcard(old)), \
+                patch.object(Config, "CAPTURE_SAMPLE_RATE", 44100), patch.object(Config, "ENABLE_VAD", True):
+            capture = audio_capture.AudioCapture(ring)
+            capture.start()
+            deadline = time.time() + 5.0
+            while capture.chunks_passed < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(capture.resampler.in_rate, 48000)
+            capture.speech_gate.reset = Mock(wraps=capture.speech_gate.reset)
+            capture._pending_mic = new
+            while capture.chunks_passed < 8 and time.time() < deadline:
+                time.sleep(0.01)
+            capture.stop()
+
+        self.assertEqual(capture.error_count, 0)
+        self.assertEqual(capture.device_switches, 1)
+        self.assertEqual(capture.resampler.in_rate, 32000)
+        capture.speech_gate.reset.assert_called_once()  # No VAD state carried over from the old device
+        levels = ring.get()
+        self.assertAlmostEqual(float(levels[len(levels) // 4]), 0.1, places=3)
+        self.assertAlmostEqual(float(levels[-1]), 0.3, places=3)
+
 
 class TestWhisperTranscriber(unittest.TestCase):
     """Test cases for WhisperTranscriber module."""
     
+    def setUp(self):
+        """Start every test with an empty shared model cache."""
+        from model_registry import model_registry
+        model_registry.clear()
+    
     def test_transcriber_init(self):
         """Test transcriber initialization."""
         from transcriber import WhisperTranscriber
@@ -98,6 +185,1369 @@ class TestWhisperTranscriber(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(mock_whisper_model.call_count, 3)
 
+    @patch('transcriber.WhisperModel')
+    def test_warm_up_after_background_load(self, mock_whisper_model):
+        """Test a background load signals readiness and warm-up forces one decode."""
+        import threading
+        from transcriber import WhisperTranscriber
+
+        transcriber = WhisperTranscriber(queue.Queue(), Mock())
+        consumed = []
+        mock_whisper_model.return_value.transcribe.return_value = (
+            (consumed.append(True) or Mock(text="") for _ in range(1)),
+            None
+        )
+
+        thread = threading.Thread(target=transcriber.load_model, kwargs={"max_retries": 1})
+        thread.start()
+        self.assertTrue(transcriber.wait_until_loaded(timeout=5.0))
+        thread.join()
+
+        self.assertGreaterEqual(transcriber.warm_up(), 0.0)
+        self.assertEqual(consumed, [True])
+        audio = mock_whisper_model.return_value.transcribe.call_args.args[0]
+        self.assertEqual(audio.dtype, np.float32)
+
+    def test_sealed_utterance_finalized_on_worker(self):
+        """Test sealing hands a copy to the finalization worker and frees the live buffer."""
+        from transcriber import WhisperTranscriber
+
+        callback = Mock()
+        transcriber = WhisperTranscriber(queue.Queue(), callback)
+        transcriber.model = MagicMock()
+        transcriber.model.transcribe.return_value = ([Mock(text=" Sealed sentence.")], None)
+        transcriber.audio_buffer.append(np.ones(1600, dtype=np.float32))
+
+        transcriber._seal_utterance(beam_size=2)
+        self.assertEqual(len(transcriber.audio_buffer), 0)
+
+        transcriber.finalize_queue.put(None)
+        transcriber._finalize_loop()
+
+        audio = transcriber.model.transcribe.call_args.args[0]
+        self.assertEqual(len(audio), 1600)
+        self.assertEqual(transcriber.model.transcribe.call_args.kwargs["beam_size"], 2)
+        self.assertEqual(callback.call_args.args[0], "Sealed sentence.")
+        self.assertTrue(callback.call_args.kwargs["is_final"])
+        self.assertEqual(transcriber.last_finalized_text, "Sealed sentence.")
+
+    @patch('transcriber.WhisperModel')
+    def test_two_tier_models_split_live_and_final(self, mock_whisper_model):
+        """Test live and final tiers load separately and finals use the final model."""
+        from config import Config
+        from model_registry import model_registry
+        from transcriber import WhisperTranscriber
+
+        live, final = MagicMock(name="live"), MagicMock(name="final")
+        mock_whisper_model.side_effect = lambda name, **kwargs: {"tiny.en": live, "small.en": final}[name]
+        final.transcribe.return_value = ([Mock(text=" Accurate.")], None)
+        callback = Mock()
+        transcriber = WhisperTranscriber(queue.Queue(), callback)
+
+        with patch.object(Config, "LIVE_MODEL", "tiny.en"), patch.object(Config, "FINAL_MODEL", "small.en"):
+            self.assertTrue(transcriber.load_model(max_retries=1))
+            self.assertIs(transcriber.model, live)
+            self.assertIs(transcriber.final_model, final)
+            self.assertIs(transcriber.batched_model.model, final)
+
+            transcriber._finalize(np.ones(1600, dtype=np.float32), beam_size=1)
+            self.assertEqual(transcriber.get_tier_latency()["final_model"], "small.en")
+
+        live.transcribe.assert_not_called()
+        self.assertEqual(callback.call_args.args[0], "Accurate.")
+        self.assertGreaterEqual(callback.call_args.args[1], 0.0)
+        self.assertEqual(len(transcriber.final_latencies), 1)
+
+        transcriber.release_model()
+        self.assertEqual(model_registry.get_status()["models_in_use"], 0)
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    """Test cases for the preallocated audio ring buffer."""
+
+    def test_append_and_view(self):
+        """Test appended samples are returned in order."""
+        from audio_buffer import AudioRingBuffer
+
+        buffer = AudioRingBuffer(10)
+        buffer.append(np.arange(4, dtype=np.float32))
+        buffer.append(np.arange(4, 7, dtype=np.float32))
+
+        self.assertEqual(len(buffer), 7)
+        np.testing.assert_array_equal(buffer.view(), np.arange(7))
+        np.testing.assert_array_equal(buffer.tail(3), [4, 5, 6])
+
+    def test_wraparound_keeps_newest_samples(self):
+        """Test overflow keeps the newest samples; only reads across the wrap point copy."""
+        from audio_buffer import AudioRingBuffer
+
+        buffer = AudioRingBuffer(8)
+        for start in range(0, 20, 3):
+            buffer.append(np.arange(start, start + 3, dtype=np.float32))
+
+        self.assertTrue(buffer.is_full)
+        self.assertEqual(buffer.overwritten_samples, 13)
+        self.assertEqual(buffer.nbytes, 8 * 4)
+        np.testing.assert_array_equal(buffer.view(), np.arange(13, 21))  # Spans the wrap point
+        tail = buffer.tail(3)
+        np.testing.assert_array_equal(tail, [18, 19, 20])
+        self.assertIs(tail.base, buffer._data)
+
+    def test_consume_and_clear(self):
+        """Test dropping the oldest samples and resetting."""
+        from audio_buffer import AudioRingBuffer
+
+        buffer = AudioRingBuffer(6)
+        buffer.append(np.arange(5, dtype=np.float32))
+        buffer.consume(2)
+        np.testing.assert_array_equal(buffer.view(), [2, 3, 4])
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.view().size, 0)
+
+
+class TestSPSCAudioRing(unittest.TestCase):
+    """Test cases for the capture -> transcriber audio ring."""
+
+    def _chunk(self, start, n=4):
+        return np.arange(start, start + n, dtype=np.float32)
+
+    def test_acquire_is_contiguous_view_across_wrap(self):
+        """Test spans are zero-copy, numbered by sequence and survive the wrap point."""
+        from audio_ring import SPSCAudioRing
+
+        ring = SPSCAudioRing(10, chunk_size=4)
+        ring.put(self._chunk(0))
+        ring.put(self._chunk(4))
+        np.testing.assert_array_equal(ring.get(), np.arange(8))
+        ring.put(self._chunk(8))
+        ring.put(self._chunk(12))
+
+        self.assertEqual(ring.qsize(), 2)
+        seq, span = ring.acquire(timeout=0.1)
+        self.assertEqual(seq, 8)
+        np.testing.assert_array_equal(span, np.arange(8, 16))
+        self.assertIs(span.base, ring._data)
+        self.assertEqual(len(ring.release()), 2)  # One enqueue stamp per chunk
+        self.assertTrue(ring.empty())
+        with self.assertRaises(queue.Empty):
+            ring.acquire(timeout=0.01)
+
+    def test_drop_policies_count_exact_samples(self):
+        """Test drop_newest rejects the chunk and drop_oldest discards the head."""
+        from audio_ring import SPSCAudioRing
+
+        newest = SPSCAudioRing(8, policy="drop_newest")
+        newest.put(self._chunk(0))
+        newest.put(self._chunk(4))
+        with self.assertRaises(queue.Full):
+            newest.put(self._chunk(8, 3))
+        self.assertEqual(newest.dropped_samples, 3)
+        np.testing.assert_array_equal(newest.get(), np.arange(8))
+
+        oldest = SPSCAudioRing(8, policy="drop_oldest")
+        for start in (0, 4, 8):
+            oldest.put(self._chunk(start, 3 if start == 8 else 4))
+        self.assertEqual(oldest.dropped_oldest_samples, 3)
+        seq, span = oldest.acquire(timeout=0.1)
+        self.assertEqual(seq, 3)  # The gap in sequence numbers marks the loss
+        np.testing.assert_array_equal(span, np.arange(3, 11))
+
+        # Samples the consumer holds are never overwritten: the new chunk goes instead
+        with self.assertRaises(queue.Full):
+            oldest.put(self._chunk(30, 4))
+        np.testing.assert_array_equal(span, np.arange(3, 11))
+        self.assertEqual(oldest.dropped_samples, 7)
+
+    def test_block_policy_honors_timeout(self):
+        """Test block waits for the consumer but put_nowait/timeouts raise queue.Full."""
+        from audio_ring import SPSCAudioRing
+
+        ring = SPSCAudioRing(8, policy="block")
+        ring.put(self._chunk(0, 8))
+        with self.assertRaises(queue.Full):
+            ring.put_nowait(self._chunk(8))
+        start = time.perf_counter()
+        with self.assertRaises(queue.Full):
+            ring.put(self._chunk(8), timeout=0.05)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.assertEqual(ring.dropped_newest_samples, 8)
+
+        # Space freed while waiting: the blocked put completes
+        threading.Timer(0.05, ring.get).start()
+        ring.put(self._chunk(8), timeout=2.0)
+        np.testing.assert_array_equal(ring.get(timeout=0.1), np.arange(8, 12))
+
+    def test_spill_preserves_order(self):
+        """Test overflow goes to disk and comes back in order with nothing lost."""
+        import tempfile
+        from audio_ring import SPSCAudioRing
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            ring = SPSCAudioRing(8, policy="spill", chunk_size=4, spill_dir=spill_dir)
+            for start in range(0, 24, 4):
+                ring.put(self._chunk(start))
+            self.assertEqual(ring.spilled_samples, 16)
+            self.assertEqual(ring.qsize(), 6)
+
+            received = [ring.get(timeout=0.1) for _ in range(3)]
+            ring.put(self._chunk(24))
+            received.append(ring.get(timeout=0.1))
+            np.testing.assert_array_equal(np.concatenate(received), np.arange(28))
+            self.assertEqual(ring.dropped_samples, 0)
+            ring.close()
+
+    def test_spill_failure_drops_and_counts(self):
+        """Test a chunk that cannot be spilled is rejected and counted instead of raising OSError."""
+        from audio_ring import SPSCAudioRing
+
+        ring = SPSCAudioRing(8, policy="spill", chunk_size=4)
+        ring.put(self._chunk(0))
+        ring.put(self._chunk(4))
+        with patch.object(ring, "_spill_chunk", side_effect=OSError("No space left on device")):
+            with self.assertRaises(queue.Full):
+                ring.put(self._chunk(8))
+        self.assertEqual(ring.dropped_newest_samples, 4)
+        np.testing.assert_array_equal(ring.get(timeout=0.1), np.arange(8))
+
+    def test_transcriber_reads_ring_in_place(self):
+        """Test the transcriber moves ring spans into its buffer and records queue wait."""
+        from audio_ring import SPSCAudioRing
+        from metrics_registry import metrics_registry
+        from transcriber import WhisperTranscriber
+
+        metrics_registry.reset()
+        ring = SPSCAudioRing(1600, chunk_size=160)
+        transcriber = WhisperTranscriber(ring, Mock())
+        ring.put(np.ones(160, dtype=np.float32))
+        ring.put(np.ones(160, dtype=np.float32))
+
+        transcriber._receive_audio(timeout=0.1)
+        self.assertEqual(len(transcriber.audio_buffer), 320)
+        self.assertTrue(ring.empty())
+        self.assertEqual(metrics_registry.histogram("queue_wait_seconds").count, 2)
+
+
+class TestMultiSourceCapture(unittest.TestCase):
+    """Test cases for concurrent loopback + microphone capture."""
+    
+    def test_mixer_aligns_sources_and_waits_for_both(self):
+        """Chunks are summed on one timeline, emitted once every source has processed past them."""
+        from multi_source import AudioMixer
+        
+        output = queue.Queue()
+        mixer = AudioMixer(output, sample_rate=16000, max_lag=1.0)
+        loopback, mic = mixer.input("loopback"), mixer.input("mic")
+        loopback.attach(Mock(processed_until=0.0))
+        mic.attach(Mock(processed_until=0.0))
+        t0 = mixer._t0
+        
+        loopback.mixer.add(loopback.source, np.full(1600, 0.25, dtype=np.float32), t0 + 1.1)
+        loopback.source.capture.processed_until = t0 + 1.1
+        mixer.flush(now=t0 + 1.1)
+        self.assertTrue(output.empty())  # The microphone has not reported this stretch yet
+        
+        # Microphone chunk arrives 2 ms later but overlaps the same 100 ms
+        mic.mixer.add(mic.source, np.full(1600, 0.5, dtype=np.float32), t0 + 1.102)
+        mic.source.capture.processed_until = t0 + 1.102
+        mixer.flush(now=t0 + 1.102)
+        mixed = np.concatenate([output.get_nowait() for _ in range(output.qsize())])
+        self.assertGreaterEqual(len(mixed), 1500)
+        self.assertTrue(np.allclose(mixed[32:1600], 0.75))
+        
+        # Loopback goes silent (gated); the mic alone keeps the mix moving
+        loopback.source.capture.processed_until = t0 + 1.3
+        mic.mixer.add(mic.source, np.full(1600, 0.5, dtype=np.float32), t0 + 1.2)
+        mic.source.capture.processed_until = t0 + 1.2
+        mixer.flush(now=t0 + 1.2)
+        self.assertTrue(np.allclose(output.get_nowait(), 0.5))
+        self.assertEqual(mixer.late_samples, 0)
+    
+    def test_separate_mode_attributes_each_source(self):
+        """Each source gets its own ring and its text is tagged with the source name."""
+        from multi_source import MultiSourceTranscriber, parse_sources
+        
+        received = []
+        multi = MultiSourceTranscriber(
+            parse_sources("loopback,mic"), lambda *args, **kwargs: received.append(kwargs["source"])
+        )
+        self.assertEqual(set(multi.inputs), {"loopback", "mic"})
+        self.assertIsNot(multi.inputs["loopback"], multi.inputs["mic"])
+        multi._attributed("mic")("hello", 0.1, 0.0, is_final=True)
+        self.assertEqual(received, ["mic"])
+        with self.assertRaises(ValueError):
+            parse_sources("loopback,loopback")
+
+    def test_separate_mode_slow_engine_degrades_every_source(self):
+        """Test an over-budget shared engine makes each source's scheduler degrade."""
+        from config import Config
+        from multi_source import MultiSourceTranscriber
+
+        multi = MultiSourceTranscriber(["loopback", "mic"], Mock())
+        with patch('transcriber.acquire_whisper_model', return_value=MagicMock()):
+            self.assertTrue(multi.load_model())
+        engine = multi.engine
+
+        def slow_transcribe(audio, **kwargs):
+            time.sleep(0.02)
+            return [Mock(start=c["start"], text=" hi") for c in kwargs["clip_timestamps"]], None
+
+        engine.pipeline = MagicMock()
+        engine.pipeline.transcribe.side_effect = slow_transcribe
+        engine.is_running = True
+        for transcriber in multi.transcribers.values():
+            transcriber.scheduler.latency_budget = 0.01
+            engine.register(transcriber.session_id, transcriber._on_engine_result)
+            transcriber.audio_buffer.append(np.ones(Config.SAMPLE_RATE, dtype=np.float32))
+            transcriber._live_update_window()
+
+        engine._run_batch(engine._collect_batch())
+
+        self.assertEqual(engine.pipeline.transcribe.call_count, 1)  # Both sources in one batch
+        for source, transcriber in multi.transcribers.items():
+            self.assertGreater(transcriber.degradation_level, 0, source)
+        self.assertEqual(multi.text_callback.call_count, 2)
+
+
+class TestAsyncStream(unittest.TestCase):
+    """Test cases for the asyncio transcription API."""
+    
+    def test_slow_consumer_keeps_finals_and_latest_partials(self):
+        """A burst from the transcriber thread overflows into dropped partials, never a blocked producer."""
+        import asyncio
+        import threading
+        from async_stream import TranscriptionStream
+        
+        class BurstTranscriber:
+            def __init__(self, callback):
+                self.callback = callback
+                self.thread = None
+            
+            def start(self):
+                def burst():
+                    for i in range(200):
+                        self.callback(f"partial {i}", 0.1, 0.0, is_final=(i == 100), source="mic")
+                self.thread = threading.Thread(target=burst)
+                self.thread.start()
+                return True
+            
+            def stop(self):
+                self.thread.join()
+                self.callback("last", 0.2, 0.0, is_final=True, source="mic")
+        
+        class FakeStream(TranscriptionStream):
+            def _build(self):
+                return Mock(), BurstTranscriber(self._on_text)
+        
+        async def consume():
+            events = []
+            async with FakeStream(max_events=10, overflow="drop_partials") as stream:
+                stream.transcriber.thread.join()  # Entire burst queued while nobody reads
+                await asyncio.sleep(0.05)
+                await stream.aclose()
+                async for event in stream:
+                    events.append(event)
+            return events, stream.dropped_events
+        
+        events, dropped = asyncio.run(consume())
+        self.assertEqual(len(events), 10)
+        self.assertEqual(dropped, 191)
+        self.assertEqual([e.text for e in events if e.is_final], ["partial 100", "last"])
+        self.assertEqual(events[-2].text, "partial 199")  # Newest partials survive
+        self.assertEqual({e.source for e in events}, {"mic"})
+    
+    def test_raise_policy_surfaces_overflow(self):
+        """overflow='raise' delivers what was buffered, then raises StreamOverflowError."""
+        import asyncio
+        from async_stream import EventBuffer, StreamOverflowError, TranscriptionEvent
+        
+        async def overflow():
+            buffer = EventBuffer(asyncio.get_running_loop(), max_events=2, overflow="raise")
+            for i in range(3):
+                buffer.push_threadsafe(TranscriptionEvent(str(i), 0.0, 0.0))
+            await asyncio.sleep(0)
+            received = [(await buffer.get()).text, (await buffer.get()).text]
+            with self.assertRaises(StreamOverflowError):
+                await buffer.get()
+            return received
+        
+        self.assertEqual(asyncio.run(overflow()), ["0", "1"])
+
+
+class TestStreamingServer(unittest.TestCase):
+    """Test cases for the local streaming transcription server."""
+    
+    def test_session_round_trip_over_binary_frames(self):
+        """PCM split at odd byte boundaries arrives intact; results and DONE come back framed."""
+        import asyncio
+        import json
+        import queue as queue_module
+        import threading
+        import stream_server as ss
+        
+        class CountingTranscriber:
+            """Reports how many samples it has read, like a transcriber reporting text."""
+            
+            def __init__(self, ring, callback):
+                self.ring, self.callback = ring, callback
+                self.samples = 0
+                self.running = False
+            
+            def start(self):
+                self.running = True
+                self.thread = threading.Thread(target=self._loop)
+                self.thread.start()
+                return True
+            
+            def _loop(self):
+                while self.running:
+                    try:
+                        _, span = self.ring.acquire(timeout=0.05)
+                    except queue_module.Empty:
+                        continue
+                    self.samples += len(span)
+                    self.ring.release()
+                    self.callback(str(self.samples), 0.01, time.time())
+            
+            def stop(self, flush=False):
+                self.running = False
+                self.thread.join()
+                if flush:
+                    self.samples += self.ring.available()
+                    self.callback(f"{self.samples} samples", 0.1, time.time(), is_final=True)
+        
+        class FakeModelServer(ss.StreamingServer):
+            def load_model(self):
+                pass
+            
+            def release_model(self):
+                pass
+            
+            def create_transcriber(self, ring, text_callback):
+                return CountingTranscriber(ring, text_callback)
+        
+        async def session():
+            server = FakeModelServer(host="127.0.0.1", port=0, socket_path="")
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(ss.encode_frame(ss.MSG_START, json.dumps(
+                {"sample_rate": 16000, "encoding": "s16le", "channels": 2}
+            ).encode()))
+            pcm = ((np.arange(16000 * 2 * 2) % 200 - 100) * 100).astype("<i2").tobytes()  # 2 s stereo, above VAD
+            for start in range(0, len(pcm), 3001):  # Odd sizes split sample frames
+                writer.write(ss.encode_frame(ss.MSG_AUDIO, pcm[start:start + 3001]))
+            writer.write(ss.encode_frame(ss.MSG_END))
+            await writer.drain()
+            
+            frames = []
+            while True:
+                msg_type, payload = await ss.read_frame(reader)
+                if msg_type is None:
+                    break
+                frames.append((msg_type, payload))
+            writer.close()
+            await server.stop()
+            return frames, server.get_status()
+        
+        frames, status = asyncio.run(session())
+        types = [t for t, _ in frames]
+        self.assertEqual(types[0], ss.MSG_READY)
+        self.assertEqual(types[-2:], [ss.MSG_FINAL, ss.MSG_DONE])
+        self.assertIn(ss.MSG_PARTIAL, types)
+        _, _, final_text = ss.decode_result(frames[-2][1])
+        self.assertEqual(final_text, "32000 samples")
+        self.assertEqual(status["sessions_served"], 1)
+        self.assertEqual(status["sessions_active"], 0)
+
+    def test_failed_transcriber_start_still_cleans_up(self):
+        """A session whose transcriber fails to start gets an ERROR, and its ring and transcriber are stopped."""
+        import asyncio
+        import json
+        import stream_server as ss
+        
+        created = []
+        
+        class FailingModelServer(ss.StreamingServer):
+            def load_model(self):
+                pass
+            
+            def release_model(self):
+                pass
+            
+            def create_transcriber(self, ring, text_callback):
+                transcriber = Mock()
+                transcriber.start.return_value = False
+                created.append((ring, transcriber))
+                return transcriber
+        
+        async def session():
+            server = FailingModelServer(host="127.0.0.1", port=0, socket_path="")
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(ss.encode_frame(ss.MSG_START, json.dumps({"sample_rate": 16000}).encode()))
+            await writer.drain()
+            frame = await ss.read_frame(reader)
+            writer.close()
+            await server.stop()
+            return frame, server.get_status()
+        
+        with patch.object(ss.SPSCAudioRing, "close", autospec=True) as close:
+            (msg_type, _), status = asyncio.run(session())
+        self.assertEqual(msg_type, ss.MSG_ERROR)
+        self.assertEqual(status["sessions_active"], 0)
+        ring, transcriber = created[0]
+        transcriber.stop.assert_called_once_with(flush=False)
+        close.assert_called_once_with(ring)
+
+    def test_silence_in_a_continuous_stream_finalizes_before_end(self):
+        """Silent chunks are VAD-gated, so a pause in live PCM produces a FINAL before END."""
+        import asyncio
+        import json
+        from types import SimpleNamespace
+        import stream_server as ss
+        from batch_engine import LiveWindow
+        from config import Config
+        from transcriber import WhisperTranscriber
+        
+        class CountingModel:
+            def transcribe(self, audio, **kwargs):
+                return [SimpleNamespace(text=f"{len(audio)} samples", start=0.0)], None
+        
+        class EchoEngine:
+            """Engine stand-in answering each live window immediately."""
+            
+            def __init__(self):
+                self.model, self.pipeline, self.sessions = CountingModel(), None, {}
+            
+            def register(self, session_id, callback):
+                self.sessions[session_id] = callback
+            
+            def unregister(self, session_id):
+                self.sessions.pop(session_id, None)
+            
+            def submit(self, session_id, audio, **options):
+                window = LiveWindow(audio, options.pop("beam_size", 1), **options)
+                window.decode_seconds = window.latency = 0.01
+                self.sessions[session_id](f"{len(audio)} live", window)
+            
+            def discard(self, session_id):
+                return False
+        
+        class FakeModelServer(ss.StreamingServer):
+            def load_model(self):
+                self.engine = EchoEngine()
+            
+            def release_model(self):
+                pass
+        
+        chunk = Config.BUFFER_SIZE
+        speech = (np.sin(np.arange(2 * chunk) * 0.3) * 8000).astype("<i2").tobytes()
+        silence = np.zeros(chunk, dtype="<i2").tobytes()
+        
+        async def session():
+            server = FakeModelServer(host="127.0.0.1", port=0, socket_path="")
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(ss.encode_frame(ss.MSG_START, json.dumps({"sample_rate": Config.SAMPLE_RATE}).encode()))
+            writer.write(ss.encode_frame(ss.MSG_AUDIO, speech))
+            
+            async def stream_silence():
+                while True:  # Keep streaming like a live client
+                    writer.write(ss.encode_frame(ss.MSG_AUDIO, silence))
+                    await asyncio.sleep(0.05)
+            
+            streamer = asyncio.ensure_future(stream_silence())
+            final = None
+            try:
+                while final is None:
+                    msg_type, payload = await asyncio.wait_for(ss.read_frame(reader), timeout=5.0)
+                    if msg_type == ss.MSG_FINAL:
+                        final = ss.decode_result(payload)[2]
+            finally:
+                streamer.cancel()
+            writer.write(ss.encode_frame(ss.MSG_END))
+            while (await ss.read_frame(reader))[0] not in (None, ss.MSG_DONE):
+                pass
+            writer.close()
+            await server.stop()
+            return final
+        
+        with patch.object(Config, "FINALIZATION_PAUSE", 0.3), patch.object(Config, "LIVE_MODE", "window"), \
+                patch.object(Config, "ENABLE_VAD", True), patch.object(Config, "VAD_BACKEND", "energy"), \
+                patch.object(Config, "VAD_HANGOVER_CHUNKS", 0):
+            self.assertEqual(asyncio.run(session()), f"{2 * chunk} samples")
+
+
+class TestLocalAgreement(unittest.TestCase):
+    """Test cases for the local-agreement streaming policy."""
+
+    def test_commits_agreed_prefix_only(self):
+        """Test words are committed once two consecutive hypotheses agree."""
+        from local_agreement import LocalAgreement
+
+        agreement = LocalAgreement()
+        self.assertEqual(agreement.insert([(0.0, 0.4, " Hello"), (0.4, 0.8, " word")]), [])
+
+        committed = agreement.insert([(0.0, 0.4, " hello,"), (0.4, 0.8, " world"), (0.8, 1.2, " again")])
+        self.assertEqual([w[2] for w in committed], ["hello,"])
+        self.assertAlmostEqual(agreement.confirmed_until, 0.4)
+        self.assertEqual(agreement.text, "hello, world again")
+
+    def test_offset_and_repeated_words(self):
+        """Test window offsets are applied and re-emitted committed words are dropped."""
+        from local_agreement import LocalAgreement
+
+        agreement = LocalAgreement()
+        agreement.insert([(0.0, 0.5, " one"), (0.5, 1.0, " two")])
+        agreement.insert([(0.0, 0.5, " one"), (0.5, 1.0, " two")])
+        self.assertEqual(agreement.committed_text, "one two")
+
+        # Window now starts at 1.0s; the model repeats "two" from the prompt
+        agreement.insert([(0.0, 0.1, " two"), (0.1, 0.5, " three")], offset=1.0)
+        committed = agreement.insert([(0.1, 0.5, " three")], offset=1.0)
+        self.assertEqual(committed, [(1.1, 1.5, "three")])
+        self.assertEqual(agreement.committed_text, "one two three")
+
+    def test_force_commit_advances_window(self):
+        """Test forced commits bound the window even without agreement."""
+        from local_agreement import LocalAgreement
+
+        agreement = LocalAgreement()
+        agreement.insert([(0.0, 1.0, " maybe"), (5.0, 6.0, " later")])
+        agreement.force_commit(4.0)
+
+        self.assertEqual(agreement.committed_text, "maybe")
+        self.assertEqual(agreement.pending_text, "later")
+        self.assertEqual(agreement.confirmed_until, 4.0)
+
+        agreement.reset()
+        self.assertEqual(agreement.text, "")
+        self.assertEqual(agreement.confirmed_until, 0.0)
+
+
+class TestSegmentedFinalPass(unittest.TestCase):
+    """Test cases for splitting and batch-decoding long utterances."""
+
+    def test_split_on_silence_cuts_at_quiet_points(self):
+        """Test long audio is cut inside the quiet gaps and fully covered."""
+        from segmenter import split_on_silence
+
+        sample_rate = 1000
+        audio = np.ones(50 * sample_rate, dtype=np.float32)
+        audio[17000:17500] = 0.0  # Quiet gap before the 20s limit
+        audio[35000:35500] = 0.0
+
+        pieces = split_on_silence(audio, sample_rate, max_segment=20.0)
+
+        self.assertEqual(pieces[0][0], 0)
+        self.assertEqual(pieces[-1][1], len(audio))
+        for (_, end), (start, _) in zip(pieces, pieces[1:]):
+            self.assertEqual(end, start)
+        self.assertTrue(17000 <= pieces[0][1] < 17500)
+        self.assertTrue(35000 <= pieces[1][1] < 35500)
+        self.assertTrue(all(end - start <= 20 * sample_rate for start, end in pieces))
+
+    def test_short_audio_is_single_piece(self):
+        """Test audio under the limit is not split."""
+        from segmenter import split_on_silence
+
+        self.assertEqual(split_on_silence(np.ones(100, dtype=np.float32), 16000), [(0, 100)])
+        self.assertEqual(split_on_silence(np.zeros(0, dtype=np.float32), 16000), [])
+
+    def test_long_final_pass_uses_batched_pipeline(self):
+        """Test long utterances are decoded as ordered clips by the batched pipeline."""
+        from transcriber import WhisperTranscriber
+        from config import Config
+
+        transcriber = WhisperTranscriber(queue.Queue(), Mock())
+        transcriber.model = MagicMock()
+        transcriber.batched_model = MagicMock()
+        transcriber.batched_model.transcribe.return_value = (
+            [Mock(start=21.0, text=" world."), Mock(start=0.0, text=" Hello")],
+            None
+        )
+
+        audio = np.ones(int(Config.SAMPLE_RATE * Config.FINAL_SEGMENT_DURATION * 2.5), dtype=np.float32)
+        text = transcriber._transcribe_final(audio, beam_size=1)
+
+        self.assertEqual(text, "Hello world.")
+        transcriber.model.transcribe.assert_not_called()
+        clips = transcriber.batched_model.transcribe.call_args.kwargs["clip_timestamps"]
+        self.assertEqual(len(clips), 3)
+        self.assertEqual(clips[0]["start"], 0.0)
+
+
+class TestFileTranscriber(unittest.TestCase):
+    """Test cases for offline file transcription."""
+
+    def test_streams_wav_in_blocks(self):
+        """Test files are decoded block by block at the target rate."""
+        import os
+        import tempfile
+        import wave
+        from file_transcriber import iter_audio_blocks
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "call.wav")
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(2)
+                wav.setsampwidth(2)
+                wav.setframerate(8000)
+                wav.writeframes(np.zeros((8000 * 5, 2), dtype=np.int16).tobytes())
+
+            blocks = list(iter_audio_blocks(path, block_seconds=2.0, sample_rate=16000))
+
+        self.assertEqual([len(b) for b in blocks[:2]], [32000, 32000])
+        self.assertAlmostEqual(sum(len(b) for b in blocks) / 16000, 5.0, delta=0.05)
+        self.assertEqual(blocks[0].dtype, np.float32)
+
+    def test_blocks_split_carry_and_offset(self):
+        """Test pieces are batch-decoded with stream offsets and silence is skipped."""
+        from config import Config
+        from file_transcriber import FileTranscriber
+
+        sr = Config.SAMPLE_RATE
+        callback = Mock()
+        transcriber = FileTranscriber(callback, model=MagicMock())
+        transcriber.pipeline = MagicMock()
+        transcriber.pipeline.transcribe.side_effect = lambda audio, **kw: (
+            [Mock(start=c["start"], end=c["end"], text=" piece") for c in kw["clip_timestamps"]], None
+        )
+
+        speech = 0.1 * np.ones(sr * 25, dtype=np.float32)
+        speech[sr * 18:sr * 19] = 0.0  # Quiet point inside the search window
+        blocks = [speech, np.zeros(sr * 10, dtype=np.float32), speech]
+
+        with patch.object(Config, "FINAL_SEGMENT_DURATION", 20.0):
+            segments = transcriber.transcribe_blocks(blocks)
+
+        self.assertAlmostEqual(transcriber.audio_seconds, 60.0)
+        starts = [start for start, end, text in segments]
+        self.assertEqual(starts, sorted(starts))
+        self.assertAlmostEqual(starts[0], 0.0)
+        self.assertTrue(any(start >= 35.0 for start in starts))  # Third block keeps its stream offset
+        for call in transcriber.pipeline.transcribe.call_args_list:
+            self.assertTrue(all(c["end"] - c["start"] <= 20.0 for c in call.kwargs["clip_timestamps"]))
+        self.assertTrue(callback.call_args.kwargs["is_final"])
+        self.assertGreater(transcriber.real_time_factor, 0.0)
+
+    def test_pieces_are_gated_by_the_configured_vad(self):
+        """Test the configured VAD, not a fixed RMS check, decides which pieces are decoded."""
+        from config import Config
+        from file_transcriber import FileTranscriber
+
+        transcriber = FileTranscriber(Mock(), model=MagicMock())
+        transcriber.pipeline = MagicMock()
+        transcriber.vad = Mock()
+        transcriber.vad.is_speech.return_value = False
+
+        transcriber.transcribe_blocks([0.1 * np.ones(Config.SAMPLE_RATE * 5, dtype=np.float32)])
+
+        transcriber.vad.is_speech.assert_called()
+        transcriber.vad.reset.assert_called()
+        transcriber.pipeline.transcribe.assert_not_called()
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for the resumable directory runner."""
+
+    def test_resume_skips_finished_files(self):
+        """Test the manifest and transcripts decide what a rerun still has to do."""
+        import json
+        import os
+        import tempfile
+        from batch_runner import BatchRunner, write_atomic
+
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox = os.path.join(tmp, "calls")
+            out = os.path.join(inbox, "transcripts")
+            os.makedirs(os.path.join(inbox, "2024"))
+            for name in ("a.wav", "2024/b.mp3", "2024/c.flac", "notes.txt"):
+                open(os.path.join(inbox, name), "wb").close()
+
+            runner = BatchRunner(inbox, out, workers=2)
+            self.assertEqual(runner.pending_files(), ["2024/b.mp3", "2024/c.flac", "a.wav"])
+
+            # a.wav finished, b.mp3 failed, c.flac marked done but its transcript is missing
+            write_atomic(runner.output_path("a.wav"), "[00:00:00] hello\n")
+            write_atomic(os.path.join(out, "2024", "b.wav"), "not a recording")  # Output dir is not scanned
+            runner.manifest = {
+                "a.wav": {"status": "done"},
+                "2024/b.mp3": {"status": "failed", "error": "boom"},
+                "2024/c.flac": {"status": "done"},
+            }
+            runner._save_manifest()
+
+            resumed = BatchRunner(inbox, out, workers=2)
+            self.assertEqual(resumed.manifest["2024/b.mp3"]["status"], "failed")
+            self.assertEqual(resumed.pending_files(), ["2024/b.mp3", "2024/c.flac"])
+            self.assertEqual(json.load(open(resumed.manifest_path))["files"]["a.wav"], {"status": "done"})
+            self.assertEqual([f for f in os.listdir(out) if ".tmp-" in f], [])
+
+            resumed.pending_files = lambda recordings=None: []
+            summary = resumed.run()
+            self.assertEqual(summary["files_skipped"], 3)
+            self.assertEqual(summary["files_done"], 0)
+
+
+class TestReplayHarness(unittest.TestCase):
+    """Test cases for the headless replay harness."""
+
+    def setUp(self):
+        from model_registry import model_registry
+        model_registry.clear()
+
+    def test_replay_reports_latency_and_finalization(self):
+        """Test a recording flows through capture and transcription into the report."""
+        from config import Config
+        from replay import ReplayHarness
+
+        sr = Config.SAMPLE_RATE
+        t = np.arange(sr * 2) / sr
+        audio = np.concatenate([0.2 * np.sin(2 * np.pi * 220 * t), np.zeros(sr)]).astype(np.float32)
+
+        with patch.object(Config, "FINALIZATION_PAUSE", 0.5), patch.object(Config, "ENABLE_VAD", True):
+            harness = ReplayHarness(audio, speed=4.0, settle_timeout=5.0)
+            harness.transcriber.model = MagicMock()
+            harness.transcriber.model.transcribe.side_effect = lambda *a, **kw: ([Mock(text=" tone")], None)
+            report = harness.run()
+
+        self.assertTrue(report["settled"])
+        self.assertEqual(report["chunks"]["captured"], report["chunks"]["gated"] + report["chunks"]["queued"])
+        self.assertEqual(report["chunks"]["dropped"], 0)
+        self.assertGreaterEqual(report["chunks"]["queued"], 4)
+        self.assertEqual(report["capture_to_callback"]["count"], report["chunks"]["queued"])
+        self.assertGreaterEqual(report["capture_to_callback"]["p99"], report["capture_to_callback"]["p50"])
+        self.assertEqual(report["finals"], 1)
+        self.assertEqual(report["finalization_delay"]["count"], 1)
+        self.assertGreaterEqual(report["finalization_delay"]["p50"], 0.5)
+
+    def test_timed_ring_stamps_every_chunk_it_hands_out(self):
+        """Test each consumed chunk reports its capture time, under concurrency and after a rejected put."""
+        from types import SimpleNamespace
+        from replay import TimedRing
+
+        mic = SimpleNamespace(last_release=0.0)
+        ring = TimedRing(mic, capacity=4, chunk_size=4)
+        ring.put(np.zeros(4, dtype=np.float32))
+        with self.assertRaises(queue.Full):
+            ring.put_nowait(np.ones(4, dtype=np.float32))
+        ring.get()
+        self.assertEqual((ring.take_dequeued(), ring.drops, ring.dropped_samples), ([0.0], 1, 4))
+
+        ring = TimedRing(mic, capacity=16, policy="block", chunk_size=4)
+        errors = []
+
+        def consume():
+            try:
+                received = 0
+                while received < 2000 * 4:
+                    _, span = ring.acquire(timeout=2.0)
+                    received += len(span)
+                    ring.release()
+            except Exception as e:
+                errors.append(e)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for i in range(2000):
+            mic.last_release = float(i)
+            ring.put(np.full(4, i, dtype=np.float32))
+        consumer.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(ring.take_dequeued(), [float(i) for i in range(2000)])
+
+
+class TestLiveScheduler(unittest.TestCase):
+    """Test cases for the deadline-aware live scheduler."""
+
+    def test_degrades_when_over_budget_and_recovers(self):
+        """Test slow decodes raise the level and fast ones lower it again."""
+        from scheduler import LiveScheduler
+
+        scheduler = LiveScheduler(latency_budget=0.5, window_seconds=3.0, beam_size=3, recovery_passes=2)
+        self.assertEqual(scheduler.beam_size, 3)
+
+        for _ in range(3):
+            scheduler.record(decode_seconds=2.0, audio_seconds=3.0, now=0.0)
+        self.assertEqual(scheduler.level, LiveScheduler.COALESCED)
+        self.assertEqual(scheduler.beam_size, 1)
+        self.assertEqual(scheduler.window_seconds, 1.5)
+        self.assertGreater(scheduler.real_time_factor, 0.0)
+
+        for _ in range(30):
+            scheduler.record(decode_seconds=0.01, audio_seconds=3.0, now=0.0)
+        self.assertEqual(scheduler.level, LiveScheduler.NORMAL)
+
+    def test_beam_one_skips_the_reduced_beam_level(self):
+        """Test the first step shrinks the window when the beam is already 1."""
+        from scheduler import LiveScheduler
+
+        scheduler = LiveScheduler(latency_budget=0.5, window_seconds=3.0, beam_size=1, recovery_passes=1)
+        scheduler.record(decode_seconds=2.0, audio_seconds=3.0, now=0.0)
+        self.assertEqual(scheduler.level, LiveScheduler.SHRUNK_WINDOW)
+
+        scheduler.average_decode_time = 0.0
+        scheduler.record(decode_seconds=0.0, audio_seconds=3.0, now=0.0)
+        self.assertEqual(scheduler.level, LiveScheduler.NORMAL)
+
+    def test_skips_passes_on_backlog_and_when_coalesced(self):
+        """Test live passes are coalesced instead of queuing behind audio."""
+        from scheduler import LiveScheduler
+
+        scheduler = LiveScheduler(latency_budget=0.5, window_seconds=3.0)
+        self.assertFalse(scheduler.should_run_live(backlog=2, now=0.0))
+        self.assertTrue(scheduler.should_run_live(backlog=0, now=0.0))
+
+        scheduler.level = LiveScheduler.COALESCED
+        scheduler.record(decode_seconds=1.0, audio_seconds=1.5, now=10.0)
+        self.assertFalse(scheduler.should_run_live(now=10.5))
+        self.assertTrue(scheduler.should_run_live(now=13.0))
+        self.assertEqual(scheduler.get_status()["live_passes_skipped"], 2)
+
+
+class TestBatchedInferenceEngine(unittest.TestCase):
+    """Test cases for the multi-session batched engine."""
+
+    def test_batches_sessions_and_dispatches_results(self):
+        """Test windows from several sessions share one call and reach their own callbacks."""
+        from batch_engine import BatchedInferenceEngine
+        from config import Config
+
+        engine = BatchedInferenceEngine(MagicMock(), max_batch_size=4, max_wait=0.0)
+        engine.pipeline = MagicMock()
+        window = int(Config.SAMPLE_RATE * 2)
+        engine.pipeline.transcribe.return_value = (
+            [Mock(start=0.0, text=" alpha"), Mock(start=2.0, text=" beta")],
+            None
+        )
+        callback_a, callback_b = Mock(), Mock()
+        engine.register("a", callback_a)
+        engine.register("b", callback_b)
+
+        engine.submit("a", np.zeros(window // 2, dtype=np.float32))
+        engine.submit("a", np.zeros(window, dtype=np.float32), context="a2")  # Replaces the pending window
+        engine.submit("b", np.zeros(window, dtype=np.float32))
+
+        engine.is_running = True
+        batch = engine._collect_batch()
+        engine._run_batch(batch)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(engine.sessions["a"].windows_replaced, 1)
+        clips = engine.pipeline.transcribe.call_args.kwargs["clip_timestamps"]
+        self.assertEqual(clips, [{"start": 0.0, "end": 2.0}, {"start": 2.0, "end": 4.0}])
+        self.assertEqual(callback_a.call_args.args[0], "alpha")
+        self.assertEqual(callback_a.call_args.args[1].context, "a2")
+        self.assertEqual(callback_b.call_args.args[0], "beta")
+
+    def test_windows_with_different_options_decode_separately(self):
+        """Test beam size and prompt reach the pipeline, one call per distinct pair."""
+        from batch_engine import BatchedInferenceEngine
+
+        engine = BatchedInferenceEngine(MagicMock(), max_batch_size=4, max_wait=0.0, beam_size=2)
+        engine.pipeline = MagicMock()
+        engine.pipeline.transcribe.return_value = ([], None)
+        for session_id in ("a", "b", "c"):
+            engine.register(session_id, Mock())
+        engine.submit("a", np.zeros(1600, dtype=np.float32), initial_prompt="Hello.")
+        engine.submit("b", np.zeros(1600, dtype=np.float32), initial_prompt="Hello.")
+        engine.submit("c", np.zeros(1600, dtype=np.float32), beam_size=1)
+
+        engine.is_running = True
+        engine._run_batch(engine._collect_batch())
+
+        options = sorted((c.kwargs["beam_size"], c.kwargs["initial_prompt"], len(c.kwargs["clip_timestamps"]))
+                         for c in engine.pipeline.transcribe.call_args_list)
+        self.assertEqual(options, [(1, None, 1), (2, "Hello.", 2)])
+
+    def test_transcriber_results_feed_scheduler_and_drop_stale_windows(self):
+        """Test engine results reach the scheduler and the callback, except for sealed utterances."""
+        from batch_engine import BatchedInferenceEngine
+        from config import Config
+        from transcriber import WhisperTranscriber
+
+        engine = BatchedInferenceEngine(MagicMock(), max_batch_size=4, max_wait=0.0)
+        engine.pipeline = MagicMock()
+        engine.pipeline.transcribe.return_value = ([Mock(start=0.0, text=" hello")], None)
+        callback = Mock()
+        transcriber = WhisperTranscriber(queue.Queue(), callback, engine=engine)
+        engine.register(transcriber.session_id, transcriber._on_engine_result)
+        transcriber.last_finalized_text = "Earlier."
+        transcriber.audio_buffer.append(np.ones(Config.SAMPLE_RATE, dtype=np.float32))
+        engine.is_running = True
+
+        transcriber._live_update_window()
+        engine._run_batch(engine._collect_batch())
+        self.assertEqual(engine.pipeline.transcribe.call_args.kwargs["initial_prompt"], "Earlier.")
+        self.assertEqual(engine.pipeline.transcribe.call_args.kwargs["beam_size"], transcriber.scheduler.beam_size)
+        self.assertEqual(callback.call_args.args[0], "hello")
+        self.assertFalse(callback.call_args.kwargs["is_final"])
+        self.assertEqual(transcriber.scheduler.passes_run, 1)
+
+        # A window in flight when its utterance is sealed is decoded but not shown
+        transcriber._live_update_window()
+        batch = engine._collect_batch()
+        transcriber._live_update_window()
+        transcriber._seal_utterance(beam_size=1)
+        self.assertIsNone(engine.sessions[transcriber.session_id].pending)
+        engine._run_batch(batch)
+        self.assertEqual(callback.call_count, 1)
+        self.assertEqual(transcriber.scheduler.passes_run, 2)
+
+    def test_unknown_session_rejected(self):
+        """Test submitting for an unregistered session fails loudly."""
+        from batch_engine import BatchedInferenceEngine
+
+        engine = BatchedInferenceEngine(MagicMock())
+        with self.assertRaises(KeyError):
+            engine.submit("missing", np.zeros(10, dtype=np.float32))
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Test cases for the shared model registry."""
+
+    def test_shares_model_and_counts_references(self):
+        """Test the same key loads once and is shared."""
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(max_memory_mb=10000, idle_timeout=0)
+        loader = Mock(side_effect=lambda: object())
+        key = ("tiny.en", "cpu", "int8", 4)
+
+        first = registry.acquire(key, loader)
+        second = registry.acquire(key, loader)
+
+        self.assertIs(first, second)
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(registry.get_status()["models_in_use"], 1)
+
+        registry.release(first)
+        registry.release(second)
+        self.assertEqual(registry.get_status()["models_in_use"], 0)
+        self.assertIs(registry.acquire(key, loader), first)  # Still cached
+        self.assertEqual(loader.call_count, 1)
+
+    def test_lru_eviction_under_memory_cap(self):
+        """Test unreferenced models are evicted least-recently-used first."""
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(max_memory_mb=100, idle_timeout=0)  # Room for two tiny int8
+        tiny_a = registry.acquire(("tiny", "cpu", "int8", 1), object)
+        registry.acquire(("tiny", "cpu", "int8", 2), object)
+        registry.release(tiny_a)
+        registry.acquire(("tiny", "cpu", "int8", 3), object)
+
+        status = registry.get_status()
+        self.assertEqual(status["models_loaded"], 2)
+        self.assertEqual(status["cache_evictions"], 1)
+
+    def test_idle_eviction(self):
+        """Test released models are unloaded after the idle timeout."""
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(max_memory_mb=10000, idle_timeout=60)
+        registry._ensure_reaper = Mock()  # Drive eviction manually
+        model = registry.acquire(("base", "cpu", "int8", 4), object)
+
+        self.assertEqual(registry.evict_idle(now=time.time() + 120), 0)  # Still referenced
+        registry.release(model)
+        self.assertEqual(registry.evict_idle(now=time.time() + 30), 0)
+        self.assertEqual(registry.evict_idle(now=time.time() + 120), 1)
+        self.assertEqual(registry.get_status()["models_loaded"], 0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for stage counters, histograms and HealthMonitor."""
+
+    def setUp(self):
+        from metrics_registry import metrics_registry
+        metrics_registry.reset()
+
+    def test_histogram_percentiles_across_threads(self):
+        """Test shards from several threads merge into correct counts and percentiles."""
+        import threading
+        from metrics_registry import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("decode_seconds", buckets=(0.1, 0.2, 0.5, 1.0))
+        counter = registry.counter("chunks_total")
+
+        def worker(value):
+            for _ in range(1000):
+                histogram.observe(value)
+                counter.inc()
+
+        threads = [threading.Thread(target=worker, args=(v,)) for v in (0.05, 0.15, 0.15, 0.8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertIs(registry.histogram("decode_seconds"), histogram)
+        self.assertEqual(counter.value, 4000)
+        self.assertEqual(histogram.bucket_counts(), [1000, 2000, 0, 1000, 0])
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 4000)
+        self.assertAlmostEqual(summary["mean"], 0.2875)
+        self.assertTrue(0.1 <= summary["p50"] <= 0.2)
+        self.assertTrue(0.5 <= summary["p95"] <= 1.0)
+        histogram.observe(5.0)  # +Inf bucket reports the last bound
+        self.assertEqual(histogram.percentile(100), 1.0)
+
+    def test_stamps_are_dropped_with_their_queue(self):
+        """Test timestamp FIFOs belong to the queue object, not to a reusable id()."""
+        import gc
+        from metrics_registry import MetricsRegistry
+
+        registry = MetricsRegistry()
+        audio_queue = queue.Queue()
+        registry.stamps(audio_queue).append(1.0)
+        self.assertIs(registry.stamps(audio_queue), registry.stamps(audio_queue))
+        self.assertEqual(len(registry.stamps(queue.Queue())), 0)
+
+        del audio_queue
+        gc.collect()
+        self.assertEqual(len(registry._stamps), 0)
+
+    def test_transcriber_stage_metrics_and_health_status(self):
+        """Test stage histograms are filled and get_health_status no longer deadlocks."""
+        import threading
+        from health_monitor import HealthMonitor
+        from metrics_registry import metrics_registry
+        from transcriber import WhisperTranscriber
+
+        audio_queue = queue.Queue()
+        transcriber = WhisperTranscriber(audio_queue, Mock())
+        transcriber.model = MagicMock()
+        transcriber.model.transcribe.return_value = ([Mock(text=" done")], None)
+
+        metrics_registry.stamps(audio_queue).append(time.perf_counter())
+        audio_queue.put(np.zeros(160, dtype=np.float32))
+        audio_queue.get()
+        transcriber._observe_queue_wait()
+        transcriber._finalize(np.ones(1600, dtype=np.float32), beam_size=1)
+
+        monitor = HealthMonitor()
+        monitor.set_components(None, transcriber)
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(monitor.get_health_status()))
+        thread.start()
+        thread.join(timeout=5.0)
+        self.assertFalse(thread.is_alive())
+
+        latency = result["metrics"]["latency"]
+        self.assertEqual(latency["queue_wait_seconds"]["count"], 1)
+        self.assertEqual(latency["final_decode_seconds"]["count"], 1)
+        self.assertEqual(latency["callback_seconds"]["count"], 1)
+        self.assertIn("p99", latency["final_decode_seconds"])
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test cases for the OpenMetrics endpoint."""
+
+    def test_scrape_exposes_counters_histograms_and_gauges(self):
+        """Test /metrics serves valid OpenMetrics text from the registry and HealthMonitor."""
+        import urllib.error
+        import urllib.request
+        from metrics_registry import MetricsRegistry
+        from metrics_server import MetricsServer
+
+        registry = MetricsRegistry()
+        registry.counter("audio_chunks_dropped_total", "Dropped chunks").inc(3)
+        decode = registry.histogram("live_decode_seconds", "Live decode", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 2.0):
+            decode.observe(value)
+        registry.gauge("model_load_seconds").set(1.5)
+        monitor = Mock()
+        monitor.get_health_status.return_value = {"metrics": {"audio_queue_size": 2, "degradation_name": "normal"}}
+
+        server = MetricsServer("127.0.0.1", 0, health_monitor=monitor, registry=registry)
+        self.assertTrue(server.start())
+        try:
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.port}/metrics",
+                headers={"Accept": "application/openmetrics-text; version=1.0.0"}
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                content_type = response.headers["Content-Type"]
+                body = response.read().decode()
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+        finally:
+            server.stop()
+
+        self.assertTrue(content_type.startswith("application/openmetrics-text"))
+        self.assertIn("# TYPE stt_audio_chunks_dropped counter", body)
+        self.assertIn("stt_audio_chunks_dropped_total 3", body)
+        self.assertIn('stt_live_decode_seconds_bucket{le="0.1"} 1', body)
+        self.assertIn('stt_live_decode_seconds_bucket{le="+Inf"} 3', body)
+        self.assertIn("stt_live_decode_seconds_count 3", body)
+        self.assertIn("stt_model_load_seconds 1.5", body)
+        self.assertIn("stt_audio_queue_size 2", body)
+        self.assertNotIn("degradation_name", body)
+        self.assertTrue(body.endswith("# EOF\n"))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test cases for the on-demand sampling profiler."""
+
+    def test_profile_writes_collapsed_stacks_per_thread(self):
+        """Test every thread is sampled and written as thread;frames count lines."""
+        import os
+        import tempfile
+        import threading
+        from profiler import SamplingProfiler
+
+        stop = threading.Event()
+
+        def busy_decode_loop():
+            while not stop.is_set():
+                sum(i * i for i in range(1000))
+
+        worker = threading.Thread(target=busy_decode_loop, name="transcriber-test")
+        worker.start()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                profiler = SamplingProfiler(interval=0.005, output_dir=tmp)
+                self.assertTrue(profiler.start(0.3))
+                self.assertFalse(profiler.start(0.3))  # One profile at a time
+                profiler.join(timeout=5.0)
+                with open(profiler.last_output) as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(os.listdir(tmp), [os.path.basename(profiler.last_output)])
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertGreater(profiler.samples, 10)
+        worker_lines = [line for line in lines if line.startswith("transcriber-test;")]
+        self.assertTrue(worker_lines)
+        self.assertTrue(any("busy_decode_loop (test_stt.py:" in line for line in worker_lines))
+        self.assertFalse(any(line.startswith("sampling-profiler;") for line in lines))
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+
+class TestWorkerProcessBackend(unittest.TestCase):
+    """Test cases for the shared-memory out-of-process backend."""
+
+    def test_shared_ring_round_trip_with_wraparound(self):
+        """Test the ring's queue adapters pass audio through shared memory in order."""
+        from worker_process import SharedAudioRing, RingReaderQueue, RingWriterQueue
+
+        ring = SharedAudioRing(10)
+        attached = SharedAudioRing(10, name=ring.name)
+        try:
+            writer, reader = RingWriterQueue(ring), RingReaderQueue(attached)
+            writer.put(np.arange(6, dtype=np.float32))
+            np.testing.assert_array_equal(reader.get(timeout=0.1), np.arange(6))
+
+            writer.put(np.arange(6, 14, dtype=np.float32))  # Wraps around the end
+            self.assertFalse(reader.empty())
+            np.testing.assert_array_equal(reader.get_nowait(), np.arange(6, 14))
+
+            with self.assertRaises(queue.Empty):
+                reader.get(timeout=0.02)
+            writer.put(np.zeros(10, dtype=np.float32))
+            with self.assertRaises(queue.Full):
+                writer.put(np.zeros(1, dtype=np.float32), timeout=0.02)
+        finally:
+            attached.close()
+            ring.close()
+
+    def test_worker_answers_commands_while_a_stream_loads(self):
+        """Test a slow model load does not block the worker's command loop."""
+        import multiprocessing
+        from worker_process import SharedAudioRing, _worker_main
+
+        release_load = threading.Event()
+        fake = Mock(error_count=0)
+        fake.load_model.side_effect = lambda: release_load.wait(5.0)
+        fake.scheduler.get_status.return_value = {}
+        fake.start.return_value = True
+        parent, child = multiprocessing.Pipe()
+        ring = SharedAudioRing(10)
+        with patch('transcriber.WhisperTranscriber', return_value=fake), \
+                patch('logger_config.setup_logging'), patch('worker_process.Config.ENABLE_WARMUP', False):
+            worker = threading.Thread(target=_worker_main, args=(child,), daemon=True)
+            worker.start()
+            try:
+                parent.send(("open", "s1", ring.name, 10))
+                parent.send(("status",))
+                self.assertTrue(parent.poll(2.0))
+                self.assertEqual(parent.recv()[0], "status")  # Answered before "ready"
+
+                release_load.set()
+                self.assertTrue(parent.poll(2.0))
+                self.assertEqual(parent.recv()[:3], ("ready", "s1", True))
+            finally:
+                release_load.set()
+                parent.send(("shutdown",))
+                worker.join(timeout=5.0)
+                ring.close()
+        fake.stop.assert_called_once()
+
+    def test_worker_crash_is_contained(self):
+        """Test a dying worker is reported to its streams without raising in the parent."""
+        from worker_process import TranscriptionWorkerPool
+
+        pool = TranscriptionWorkerPool(num_workers=1, restart_on_crash=False)
+        pool.start()
+        try:
+            stream = Mock(stream_id="s1")
+            pool._workers[0].streams["s1"] = stream
+            pool._workers[0].process.kill()
+
+            deadline = time.time() + 30
+            while pool.crash_count == 0 and time.time() < deadline:
+                time.sleep(0.05)
+
+            self.assertEqual(pool.crash_count, 1)
+            stream._on_worker_crash.assert_called_once()
+        finally:
+            pool.stop()
+
+
+class TestVoiceActivityDetection(unittest.TestCase):
+    """Test cases for the pluggable VAD stage."""
+
+    def test_energy_vad_matches_rms_threshold(self):
+        """Test the energy gate keeps the original RMS semantics."""
+        from vad import EnergyVAD
+
+        vad = EnergyVAD(0.005)
+        self.assertFalse(vad.is_speech(np.zeros(1000, dtype=np.float32)))
+        self.assertTrue(vad.is_speech(np.ones(1000, dtype=np.float32) * 0.5))
+
+    def test_silero_vad_batches_frames_and_keeps_remainder(self):
+        """Test the neural VAD scores whole frames and carries leftovers to the next chunk."""
+        from vad import SileroVAD
+
+        vad = SileroVAD()
+        probabilities = vad.frame_probabilities(np.zeros(1300, dtype=np.float32))
+        self.assertEqual(len(probabilities), 2)
+        self.assertEqual(len(vad._remainder), 1300 - 1024)
+
+        probabilities = vad.frame_probabilities(np.zeros(300, dtype=np.float32))
+        self.assertEqual(len(probabilities), 1)  # 276 leftover + 300 new samples
+        self.assertTrue(np.all(probabilities < vad.threshold))
+        self.assertFalse(vad.is_speech(np.zeros(6400, dtype=np.float32)))
+
+    def test_create_vad_falls_back_to_energy(self):
+        """Test an unusable neural model falls back to the energy gate."""
+        from config import Config
+        from vad import EnergyVAD, create_vad
+
+        with patch.object(Config, 'ENABLE_VAD', True), \
+                patch.object(Config, 'VAD_BACKEND', 'silero'), \
+                patch.object(Config, 'VAD_MODEL_PATH', '/nonexistent/vad.onnx'):
+            self.assertIsInstance(create_vad(), EnergyVAD)
+
+        with patch.object(Config, 'ENABLE_VAD', False):
+            self.assertIsNone(create_vad())
+
 
 class TestConfig(unittest.TestCase):
     """Test cases for configuration management."""
@@ -180,6 +1630,39 @@ class TestAudioProcessing(unittest.TestCase):
         rms_loud = np.sqrt(np.mean(loud_audio**2))
         self.assertGreater(rms_loud, Config.VAD_THRESHOLD)
 
+    def test_downmix_into_scratch_matches_mean(self):
+        """Test the in-place downmix and single-pass RMS match the numpy reference."""
+        from audio_dsp import downmix_into, rms
+
+        scratch = np.empty(1200, dtype=np.float32)
+        stereo = np.random.default_rng(0).standard_normal((1000, 3))  # float64 input
+        mono = downmix_into(stereo, scratch)
+
+        self.assertIs(mono.base, scratch)
+        self.assertEqual(mono.dtype, np.float32)
+        np.testing.assert_allclose(mono, stereo.mean(axis=1), rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(downmix_into(stereo[:, :1], scratch), stereo[:, 0].astype(np.float32))
+        self.assertAlmostEqual(rms(mono), float(np.sqrt(np.mean(mono.astype(np.float64)**2))), places=5)
+        self.assertEqual(rms(scratch[:0]), 0.0)
+
+    def test_polyphase_resampler_streams_seamlessly(self):
+        """Test block-by-block resampling matches one pass and keeps a tone intact."""
+        from audio_dsp import PolyphaseResampler
+
+        rate = 44100
+        t = np.arange(rate) / rate
+        audio = (0.5 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+
+        whole = PolyphaseResampler(rate, 16000, max_block=len(audio)).process(audio).copy()
+        streaming = PolyphaseResampler(rate, 16000, max_block=1000)
+        pieces = [streaming.process(audio[i:i + 1000]).copy() for i in range(0, len(audio), 1000)]
+        streamed = np.concatenate(pieces)
+
+        self.assertEqual(len(streamed), 16000)
+        np.testing.assert_allclose(streamed, whole, atol=1e-5)
+        expected = 0.5 * np.sin(2 * np.pi * 1000 * (np.arange(16000) / 16000 - streaming.delay))
+        np.testing.assert_allclose(streamed[200:-200], expected[200:-200], atol=1e-4)
+
 
 class TestLogging(unittest.TestCase):
     """Test cases for logging configuration."""
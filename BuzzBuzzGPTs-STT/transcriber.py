@@ -6,36 +6,115 @@ Optimized for long sentences with silence-based finalization.
 import threading
 import queue
 import time
+from collections import deque
 import numpy as np
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 from config import Config
+from audio_buffer import AudioRingBuffer
+from local_agreement import LocalAgreement
+from metrics_registry import metrics_registry
+from model_registry import model_registry
+from scheduler import LiveScheduler
+from segmenter import split_on_silence
 from logger_config import get_logger
 from typing import Callable, Optional
 
 logger = get_logger(__name__)
 
 
+def acquire_whisper_model(model_name: str, cpu_threads: int = 4) -> WhisperModel:
+    """Get a WhisperModel from the shared registry, loading it on first use.
+    
+    Callers hand it back with model_registry.release() when done.
+    
+    Args:
+        model_name: Whisper model size (e.g. 'tiny.en')
+        cpu_threads: CPU threads used by the model's decoder
+        
+    Returns:
+        The shared WhisperModel
+    """
+    device = Config.get_device()
+    compute_type = "float16" if device == "cuda" else "int8"
+    
+    def loader():
+        return WhisperModel(
+            model_name, 
+            device=device, 
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=Config.MODEL_NUM_WORKERS  # Live and final passes decode concurrently
+        )
+    
+    return model_registry.acquire((model_name, device, compute_type, cpu_threads), loader)
+
+
 class WhisperTranscriber:
     """Real-time transcription using OpenAI Whisper, optimized for continuous flow."""
     
-    def __init__(self, audio_queue: queue.Queue, text_callback: Callable):
+    def __init__(self, audio_queue: queue.Queue, text_callback: Callable, engine=None):
+        """
+        Initialize the transcriber.
+        
+        Args:
+            audio_queue: Queue of captured audio chunks
+            text_callback: function(text, latency, timestamp, is_final)
+            engine: Optional BatchedInferenceEngine; live windows (LIVE_MODE=window)
+                    are then batched with other sessions and the engine's model is shared
+        """
         self.audio_queue = audio_queue
         self.text_callback = text_callback
+        self.engine = engine
+        self.session_id = f"transcriber-{id(self):x}"
         self.is_running = False
         self.transcribe_thread = None
-        self.model = None
+        self.finalize_thread = None
+        self.model = None  # Live-tier model
+        self.final_model = None  # Final-tier model (same object when both tiers use one model)
+        self.batched_model = None  # Batched pipeline over final_model for the segmented final pass
+        self._owns_model = False  # True when the models were acquired from the registry
         self._lock = threading.Lock()  # Thread safety for shared state
         self._model_loaded = threading.Event()
         
-        # Audio Buffer (holds current active sentence)
-        self.audio_buffer = np.zeros(0, dtype=np.float32)
+        # Audio Buffer (holds current active sentence). Preallocated once with
+        # headroom for a full queue drain on top of the emergency limit.
+        self.emergency_limit = int(Config.SAMPLE_RATE * Config.WINDOW_DURATION)
+        headroom = Config.BUFFER_SIZE * (Config.MAX_QUEUE_SIZE + 1)
+        self.audio_buffer = AudioRingBuffer(self.emergency_limit + headroom)
         self.last_finalized_text = ""  # Context memory for next sentence
+        # Sealed utterances waiting for the finalization worker (never dropped;
+        # the live loop blocks if the worker falls this far behind)
+        self.finalize_queue: queue.Queue = queue.Queue(maxsize=Config.FINALIZE_QUEUE_SIZE)
+        self.agreement = LocalAgreement()  # Committed words for LIVE_MODE=local_agreement
+        self.utterance_index = 0  # Sealed utterances so far; tags engine windows
+        self.scheduler = LiveScheduler(
+            latency_budget=Config.LIVE_LATENCY_BUDGET,
+            window_seconds=Config.LIVE_WINDOW_DURATION,
+            beam_size=Config.BEAM_SIZE
+        )
+        self.final_latencies: deque = deque(maxlen=50)  # Final-tier decode times (seconds)
+        
+        # Stage metrics (recorded lock-free from the live and finalization threads)
+        self._enqueue_stamps = metrics_registry.stamps(audio_queue)
+        self._queue_wait = metrics_registry.histogram(
+            "queue_wait_seconds", "Time a captured chunk waits in the audio queue"
+        )
+        self._live_decode = metrics_registry.histogram("live_decode_seconds", "Live update decode time")
+        self._final_decode = metrics_registry.histogram("final_decode_seconds", "Final pass decode time")
+        self._callback_time = metrics_registry.histogram(
+            "callback_seconds", "Time spent in the text callback"
+        )
         self.error_count = 0
         self.last_error: Optional[Exception] = None
         
     def load_model(self, max_retries: Optional[int] = None) -> bool:
         """Load the faster-whisper model with retry logic.
         
+        The live and final tiers (Config.get_live_model / get_final_model) are
+        loaded together. Models are shared through the process-wide registry,
+        so a model that is already loaded (or still cached from a previous
+        session) is reused, and equal tiers share one model.
+        
         Args:
             max_retries: Maximum retry attempts (uses Config.MAX_RETRIES if None)
             
@@ -45,25 +124,25 @@ class WhisperTranscriber:
         if max_retries is None:
             max_retries = Config.MAX_RETRIES
             
-        logger.info(f"Loading Faster-Whisper model '{Config.WHISPER_MODEL}'...")
-        device = Config.get_device()
-        compute_type = "float16" if device == "cuda" else "int8"
+        live_name = Config.get_live_model()
+        final_name = Config.get_final_model()
+        logger.info(f"Loading Faster-Whisper models (live='{live_name}', final='{final_name}')...")
+        self.release_model()
         
         for attempt in range(max_retries):
             try:
-                self.model = WhisperModel(
-                    Config.WHISPER_MODEL, 
-                    device=device, 
-                    compute_type=compute_type,
-                    cpu_threads=4
-                )
-                logger.info(f"Model loaded successfully on {device} (compute_type={compute_type})")
+                self.model = acquire_whisper_model(live_name)
+                self._owns_model = True
+                self.final_model = acquire_whisper_model(final_name)
+                self.batched_model = BatchedInferencePipeline(model=self.final_model)
+                logger.info(f"Models loaded successfully on {Config.get_device()}")
                 self._model_loaded.set()
                 return True
                 
             except Exception as e:
                 logger.error(f"Model loading attempt {attempt + 1}/{max_retries} failed: {e}")
                 self.last_error = e
+                self.release_model()  # Don't hold the live tier if the final tier failed
                 
                 if attempt < max_retries - 1:
                     delay = Config.RETRY_DELAY * (2 ** attempt)  # Exponential backoff
@@ -75,8 +154,34 @@ class WhisperTranscriber:
         
         return False
         
+    def warm_up(self) -> float:
+        """Run one throwaway inference on synthetic audio.
+        
+        The first transcribe call pays one-time costs (buffer allocation,
+        thread-pool spin-up, kernel selection); paying them here keeps them
+        out of the first live update.
+        
+        Returns:
+            Warm-up duration in seconds
+        """
+        audio = (np.random.default_rng(0).standard_normal(Config.SAMPLE_RATE) * 0.01).astype(np.float32)
+        start_t = time.time()
+        models = [self.model]
+        if self.final_model is not None and self.final_model is not self.model:
+            models.append(self.final_model)
+        for model in models:
+            segments, info = model.transcribe(audio, language="en", beam_size=self.scheduler.beam_size)
+            list(segments)  # Segments are lazy; force the decode
+        duration = time.time() - start_t
+        logger.info(f"Model warm-up completed in {duration:.2f}s")
+        return duration
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until a model is loaded (e.g. by a background prefetch)."""
+        return self._model_loaded.wait(timeout)
+        
     def start(self) -> bool:
-        """Start transcription thread.
+        """Start the live transcription and finalization threads.
         
         Returns:
             True if started successfully, False otherwise
@@ -86,20 +191,34 @@ class WhisperTranscriber:
                 logger.warning("Transcriber already running")
                 return True
                 
+            if self.model is None and self.engine is not None:
+                self.model = self.engine.model
+                self.final_model = self.engine.model
+                self.batched_model = self.engine.pipeline
+            
             if self.model is None:
                 logger.info("Model not loaded, loading now...")
                 if not self.load_model():
                     logger.error("Failed to start transcriber: model loading failed")
                     return False
                     
+            if self.engine is not None:
+                self.engine.register(self.session_id, self._on_engine_result)
+            
             self.is_running = True
             self.transcribe_thread = threading.Thread(target=self._transcribe_loop, daemon=True)
+            self.finalize_thread = threading.Thread(target=self._finalize_loop, daemon=True)
             self.transcribe_thread.start()
+            self.finalize_thread.start()
             logger.info("Transcriber started successfully")
             return True
         
-    def stop(self):
-        """Stop transcription thread."""
+    def stop(self, flush: bool = False):
+        """Stop transcription threads, letting already sealed utterances finish.
+        
+        Args:
+            flush: Also finalize the utterance still in progress (end of a finite stream)
+        """
         with self._lock:
             if not self.is_running:
                 return
@@ -112,6 +231,39 @@ class WhisperTranscriber:
                 logger.warning("Transcriber thread did not stop gracefully")
             else:
                 logger.info("Transcriber stopped successfully")
+                if flush:
+                    try:
+                        self._receive_audio(timeout=0)
+                    except queue.Empty:
+                        pass
+                    if len(self.audio_buffer) > 0:
+                        self._seal_utterance(beam_size=1)
+        
+        if self.engine is not None:
+            self.engine.unregister(self.session_id)
+        
+        if self.finalize_thread:
+            self.finalize_queue.put(None)  # Sentinel after any pending utterances
+            self.finalize_thread.join(timeout=10.0)
+            if self.finalize_thread.is_alive():
+                logger.warning("Finalization thread did not stop gracefully")
+        
+        # Hand the models back; they stay cached for the next session until evicted
+        if not (self.finalize_thread and self.finalize_thread.is_alive()):
+            self.release_model()
+
+    def release_model(self):
+        """Return registry-owned models so they can be shared or evicted."""
+        if self._owns_model:
+            # Each tier holds its own reference, even when both are the same model
+            for model in (self.model, self.final_model):
+                if model is not None:
+                    model_registry.release(model)
+            self.model = None
+            self.final_model = None
+            self.batched_model = None
+            self._model_loaded.clear()
+        self._owns_model = False
             
     def _transcribe_loop(self):
         """Main loop that only finalizes on a specific silence duration."""
@@ -119,95 +271,33 @@ class WhisperTranscriber:
         
         while self.is_running:
             try:
-                # 1. Get new audio
-                chunks = []
+                # 1 + 2. Move new audio into the utterance buffer (in-place, O(chunk))
                 try:
                     # Wait a bit for audio
-                    chunks.append(self.audio_queue.get(timeout=0.2))
+                    self._receive_audio(timeout=0.2)
                     last_audio_time = time.time() # Reset silence timer when audio received
                 except queue.Empty:
                     # check for Silence Finalization
                     silence_duration = time.time() - last_audio_time
                     if len(self.audio_buffer) > 0 and silence_duration >= Config.FINALIZATION_PAUSE:
-                        # FINALIZATION: Pause detected, save the buffer to history
-                        try:
-                            segments, info = self.model.transcribe(
-                                self.audio_buffer, 
-                                language="en", 
-                                beam_size=1
-                            )
-                            text = "".join([s.text for s in segments]).strip()
-                            if text:
-                                # Move to history
-                                self.text_callback(text, 0, time.time(), is_final=True)
-                                self.last_finalized_text = text  # Store for live context
-                                logger.debug(f"Finalized: {text[:50]}...")
-                        except Exception as e:
-                            logger.error(f"Error during finalization: {e}")
-                            self.error_count += 1
-                        
-                        # Reset buffer for the next sentence
-                        self.audio_buffer = np.zeros(0, dtype=np.float32)
+                        # FINALIZATION: Pause detected, hand the utterance to the final worker
+                        self._seal_utterance(beam_size=1)
                     continue
-
-                # Drain the rest of the queue
-                while not self.audio_queue.empty():
-                    try: chunks.append(self.audio_queue.get_nowait())
-                    except queue.Empty: break
                 
-                # 2. Update buffer
-                new_audio = np.concatenate(chunks)
-                self.audio_buffer = np.concatenate([self.audio_buffer, new_audio])
-                
-                # Emergency limit: Prevent memory leak if user never stops talking (10 mins)
-                emergency_limit = int(Config.SAMPLE_RATE * Config.WINDOW_DURATION)
-                if len(self.audio_buffer) > emergency_limit:
+                # Emergency limit: Bound utterance length if user never stops talking (10 mins)
+                if len(self.audio_buffer) > self.emergency_limit:
                     # Force a finalization if we hit the limit
                     logger.warning("Context limit reached. Finalizing current passage.")
-                    try:
-                        # Use slightly higher beam_size for the final pass to ensure quality
-                        segments, info = self.model.transcribe(
-                            self.audio_buffer, 
-                            language="en", 
-                            beam_size=2  # Higher accuracy final pass
-                        )
-                        res_text = "".join([s.text for s in segments]).strip()
-                        if res_text:
-                            self.text_callback(res_text, 0, time.time(), is_final=True)
-                            self.last_finalized_text = res_text
-                    except Exception as e:
-                        logger.error(f"Error during emergency finalization: {e}")
-                        self.error_count += 1
-                        
-                    self.audio_buffer = np.zeros(0, dtype=np.float32)
+                    # Use slightly higher beam_size for the final pass to ensure quality
+                    self._seal_utterance(beam_size=2)
                     continue
 
-                # 3. Live Update (Streaming) - OPTIMIZED
-                # Use a shorter 3s window for maximum speed with context for accuracy
-                if len(self.audio_buffer) > 0:
-                    # Reduced window to 3 seconds for lightning fast inference
-                    live_context_samples = int(Config.SAMPLE_RATE * 3.0)
-                    live_audio = self.audio_buffer[-live_context_samples:]
-                    
-                    start_t = time.time()
-                    try:
-                        segments, info = self.model.transcribe(
-                            live_audio,
-                            language="en",
-                            beam_size=1,
-                            initial_prompt=self.last_finalized_text  # Context memory
-                        )
-                        text = "".join([s.text for s in segments]).strip()
-                        duration = time.time() - start_t
-                        
-                        # Update the live display
-                        if text:
-                            # Add ellipsis if text was truncated
-                            prefix = "... " if len(self.audio_buffer) > live_context_samples else ""
-                            self.text_callback(prefix + text, duration, time.time(), is_final=False)
-                    except Exception as e:
-                        logger.error(f"Error during live transcription: {e}")
-                        self.error_count += 1
+                # 3. Live Update (Streaming), skipped or degraded when behind
+                if len(self.audio_buffer) > 0 and self.scheduler.should_run_live(self.audio_queue.qsize()):
+                    if Config.LIVE_MODE == "local_agreement":
+                        self._live_update_agreement()
+                    else:
+                        self._live_update_window()
                 
             except Exception as e:
                 logger.error(f"Error in transcription loop: {e}", exc_info=True)
@@ -216,5 +306,225 @@ class WhisperTranscriber:
         
         logger.info("Transcription loop ended")
 
+    def _receive_audio(self, timeout: float):
+        """Append everything waiting in the audio queue to the utterance buffer.
+
+        An SPSCAudioRing is read in place: its unread span is copied straight
+        into the buffer. Other queues are drained chunk by chunk.
+
+        Raises:
+            queue.Empty: If no audio arrives within ``timeout``
+        """
+        if hasattr(self.audio_queue, "acquire"):
+            _, span = self.audio_queue.acquire(timeout=timeout)
+            self.audio_buffer.append(span)
+            now = time.perf_counter()
+            for stamp in self.audio_queue.release():
+                self._queue_wait.observe(now - stamp)
+            return
+
+        chunks = [self.audio_queue.get(timeout=timeout)]
+        self._observe_queue_wait()
+        while not self.audio_queue.empty():
+            try: chunks.append(self.audio_queue.get_nowait())
+            except queue.Empty: break
+            self._observe_queue_wait()
+        for chunk in chunks:
+            self.audio_buffer.append(chunk)
+
+    def _observe_queue_wait(self):
+        """Record how long the chunk just taken sat in the queue (if it was stamped)."""
+        try:
+            self._queue_wait.observe(time.perf_counter() - self._enqueue_stamps.popleft())
+        except IndexError:
+            pass  # Producer without stamps (e.g. tests feeding the queue directly)
+
+    def _emit(self, text: str, latency: float, is_final: bool):
+        """Deliver text to the callback and time it."""
+        start_t = time.perf_counter()
+        self.text_callback(text, latency, time.time(), is_final=is_final)
+        self._callback_time.observe(time.perf_counter() - start_t)
+
+    def _seal_utterance(self, beam_size: int):
+        """Hand the current utterance to the finalization worker and reset for the next one."""
+        # Copy: the ring buffer is reused for the next sentence immediately
+        sealed = self.audio_buffer.view().copy()
+        self.finalize_queue.put((sealed, beam_size))
+        
+        self.audio_buffer.clear()
+        self.agreement.reset()
+        # Live windows of the sealed utterance are stale: its final replaces them
+        self.utterance_index += 1
+        if self.engine is not None:
+            self.engine.discard(self.session_id)
+
+    def _finalize_loop(self):
+        """Finalization worker: transcribes sealed utterances in order."""
+        while True:
+            item = self.finalize_queue.get()
+            if item is None:
+                break
+            audio, beam_size = item
+            self._finalize(audio, beam_size)
+        
+        logger.info("Finalization loop ended")
+
+    def _finalize(self, audio: np.ndarray, beam_size: int):
+        """Transcribe a complete utterance and emit it as final."""
+        try:
+            start_t = time.time()
+            text = self._transcribe_final(audio, beam_size)
+            duration = time.time() - start_t
+            self.final_latencies.append(duration)
+            self._final_decode.observe(duration)
+            if text:
+                # Move to history (replaces the live preview)
+                self._emit(text, duration, is_final=True)
+                self.last_finalized_text = text  # Store for live context
+                logger.debug(f"Finalized: {text[:50]}...")
+        except Exception as e:
+            logger.error(f"Error during finalization: {e}")
+            self.error_count += 1
+
+    def _transcribe_final(self, audio: np.ndarray, beam_size: int) -> str:
+        """Final-pass transcription of a complete utterance.
+        
+        Utterances longer than FINAL_SEGMENT_DURATION are split at low-energy
+        points and the pieces are decoded together by the batched pipeline,
+        so latency follows the longest piece rather than the total length.
+        """
+        sample_rate = Config.SAMPLE_RATE
+        pieces = split_on_silence(audio, sample_rate, max_segment=Config.FINAL_SEGMENT_DURATION)
+        
+        model = self.final_model or self.model
+        if len(pieces) <= 1 or self.batched_model is None:
+            segments, info = model.transcribe(audio, language="en", beam_size=beam_size)
+            return "".join([s.text for s in segments]).strip()
+        
+        logger.debug(f"Final pass: {len(audio) / sample_rate:.1f}s split into {len(pieces)} pieces")
+        segments, info = self.batched_model.transcribe(
+            audio,
+            language="en",
+            beam_size=beam_size,
+            batch_size=Config.FINAL_BATCH_SIZE,
+            clip_timestamps=[
+                {"start": start / sample_rate, "end": end / sample_rate}
+                for start, end in pieces
+            ]
+        )
+        # Segments come back in clip order; sort defensively before merging
+        ordered = sorted(segments, key=lambda s: s.start)
+        return " ".join(s.text.strip() for s in ordered if s.text.strip())
+
+    def _live_update_window(self):
+        """Re-transcribe the last few seconds of the utterance from scratch."""
+        # Short window for speed; the scheduler shrinks it when decoding falls behind
+        live_context_samples = int(Config.SAMPLE_RATE * self.scheduler.window_seconds)
+        live_audio = self.audio_buffer.tail(live_context_samples)
+        
+        if self.engine is not None:
+            # Batched with other sessions; _on_engine_result handles the result.
+            # Copy: the ring buffer view is overwritten by the next drain.
+            truncated = len(self.audio_buffer) > live_context_samples
+            self.engine.submit(
+                self.session_id,
+                live_audio.copy(),
+                beam_size=self.scheduler.beam_size,
+                initial_prompt=self.last_finalized_text,
+                context=(self.utterance_index, truncated)
+            )
+            return
+        
+        start_t = time.time()
+        try:
+            segments, info = self.model.transcribe(
+                live_audio,
+                language="en",
+                beam_size=self.scheduler.beam_size,
+                initial_prompt=self.last_finalized_text  # Context memory
+            )
+            text = "".join([s.text for s in segments]).strip()
+            duration = time.time() - start_t
+            self.scheduler.record(duration, len(live_audio) / Config.SAMPLE_RATE)
+            self._live_decode.observe(duration)
+            
+            # Update the live display
+            if text:
+                # Add ellipsis if text was truncated
+                prefix = "... " if len(self.audio_buffer) > live_context_samples else ""
+                self._emit(prefix + text, duration, is_final=False)
+        except Exception as e:
+            logger.error(f"Error during live transcription: {e}")
+            self.error_count += 1
+
+    def _on_engine_result(self, text: str, window):
+        """Engine thread: a batched live window was decoded."""
+        utterance_index, truncated = window.context
+        # The batched decode time is this stream's live cost, so the scheduler degrades on it too
+        self.scheduler.record(window.decode_seconds, window.audio_seconds)
+        if text and utterance_index == self.utterance_index:
+            prefix = "... " if truncated else ""
+            self._emit(prefix + text, window.latency, is_final=False)
+
+    def _live_update_agreement(self):
+        """Decode only the unconfirmed tail and commit words two passes agree on."""
+        sample_rate = Config.SAMPLE_RATE
+        start_sample = int(self.agreement.confirmed_until * sample_rate)
+        
+        # Bound the decode window if hypotheses keep disagreeing
+        tail_samples = len(self.audio_buffer) - start_sample
+        if tail_samples > Config.AGREEMENT_MAX_TAIL * sample_rate:
+            skip_to = (len(self.audio_buffer) / sample_rate) - Config.AGREEMENT_MAX_TAIL / 2
+            self.agreement.force_commit(skip_to)
+            start_sample = int(self.agreement.confirmed_until * sample_rate)
+        
+        live_audio = self.audio_buffer.view(start_sample)
+        if len(live_audio) == 0:
+            return
+        
+        # Committed text is the prompt: the model continues from it
+        prompt = f"{self.last_finalized_text} {self.agreement.committed_text}".strip()
+        
+        start_t = time.time()
+        try:
+            segments, info = self.model.transcribe(
+                live_audio,
+                language="en",
+                beam_size=self.scheduler.beam_size,
+                word_timestamps=True,
+                initial_prompt=prompt[-200:] or None
+            )
+            words = [
+                (w.start, w.end, w.word)
+                for s in segments
+                for w in (s.words or [])
+            ]
+            duration = time.time() - start_t
+            self.scheduler.record(duration, len(live_audio) / sample_rate)
+            self._live_decode.observe(duration)
+            
+            self.agreement.insert(words, offset=start_sample / sample_rate)
+            text = self.agreement.text
+            if text:
+                self._emit(text, duration, is_final=False)
+        except Exception as e:
+            logger.error(f"Error during live transcription: {e}")
+            self.error_count += 1
+
+    @property
+    def degradation_level(self) -> int:
+        """Current live-update degradation level (0 = full quality)."""
+        return self.scheduler.level
+
     def get_average_latency(self):
-        return 0.0 # Standard latency reporting
+        return self.scheduler.average_decode_time
+
+    def get_tier_latency(self) -> dict:
+        """Average decode time per tier (live previews vs final passes)."""
+        final = sum(self.final_latencies) / len(self.final_latencies) if self.final_latencies else 0.0
+        return {
+            "live_model": Config.get_live_model(),
+            "final_model": Config.get_final_model(),
+            "live_latency": self.scheduler.average_decode_time,
+            "final_latency": final,
+        }
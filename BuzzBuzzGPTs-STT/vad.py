@@ -0,0 +1,181 @@
+"""
+Pluggable voice activity detection stage for the capture loop.
+"""
+
+import os
+import numpy as np
+from audio_dsp import rms
+from config import Config
+from logger_config import get_logger
+from typing import Optional
+
+logger = get_logger(__name__)
+
+
+class VoiceActivityDetector:
+    """Base class for VAD stages.
+
+    A VAD turns each captured chunk into a speech probability. Chunks below
+    ``threshold`` are not queued, so they never trigger a decode, and the gap
+    they leave is what the transcriber's FINALIZATION_PAUSE timer measures.
+    """
+
+    threshold = 0.5
+
+    def speech_probability(self, chunk: np.ndarray) -> float:
+        """Return the probability that ``chunk`` (16 kHz mono float32) contains speech."""
+        raise NotImplementedError
+
+    def is_speech(self, chunk: np.ndarray, level: Optional[float] = None) -> bool:
+        """Gate decision; ``level`` is the chunk's RMS if the caller already has it."""
+        return self.speech_probability(chunk) >= self.threshold
+
+    def reset(self):
+        """Forget stream state (e.g. after a device switch)."""
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """Fixed RMS threshold (the original VAD_THRESHOLD gate)."""
+
+    def __init__(self, rms_threshold: float):
+        self.rms_threshold = rms_threshold
+
+    def speech_probability(self, chunk: np.ndarray) -> float:
+        return 1.0 if rms(chunk) >= self.rms_threshold else 0.0
+
+    def is_speech(self, chunk: np.ndarray, level: Optional[float] = None) -> bool:
+        return (rms(chunk) if level is None else level) >= self.rms_threshold
+
+
+class SileroVAD(VoiceActivityDetector):
+    """Silero VAD ONNX model run through onnxruntime on batched frames.
+
+    Each chunk is cut into 512-sample frames (plus 64 samples of left
+    context) and all frames go through the model in a single session call;
+    the recurrent state and any leftover samples carry over to the next
+    chunk. By default the model bundled with faster-whisper is used.
+    """
+
+    FRAME_SIZE = 512
+    CONTEXT_SIZE = 64
+
+    def __init__(self, model_path: Optional[str] = None, threshold: float = 0.5, sample_rate: int = 16000):
+        """
+        Initialize the ONNX session.
+
+        Args:
+            model_path: Path to a Silero VAD ONNX model (bundled faster-whisper model if None)
+            threshold: Speech probability threshold
+            sample_rate: Input sample rate (the model expects 16 kHz)
+
+        Raises:
+            ValueError: If the sample rate is not 16 kHz
+            ImportError: If onnxruntime is not installed
+        """
+        if sample_rate != 16000:
+            raise ValueError(f"Silero VAD requires 16 kHz audio, got {sample_rate}")
+        import onnxruntime
+
+        if model_path is None:
+            from faster_whisper.utils import get_assets_path
+            model_path = os.path.join(get_assets_path(), "silero_vad_v6.onnx")
+
+        options = onnxruntime.SessionOptions()
+        options.inter_op_num_threads = 1
+        options.intra_op_num_threads = 1
+        options.log_severity_level = 4
+        self.session = onnxruntime.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"], sess_options=options
+        )
+        self.threshold = threshold
+        self.last_probability = 0.0
+        self.reset()
+
+    def reset(self):
+        self._h = np.zeros((1, 1, 128), dtype=np.float32)
+        self._c = np.zeros((1, 1, 128), dtype=np.float32)
+        self._context = np.zeros(self.CONTEXT_SIZE, dtype=np.float32)
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def frame_probabilities(self, chunk: np.ndarray) -> np.ndarray:
+        """Speech probability of every complete frame in ``chunk`` (leftovers are kept)."""
+        audio = np.concatenate([self._remainder, chunk]) if len(self._remainder) else chunk
+        num_frames = len(audio) // self.FRAME_SIZE
+        self._remainder = audio[num_frames * self.FRAME_SIZE:].astype(np.float32, copy=True)
+        if num_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        frames = audio[:num_frames * self.FRAME_SIZE].reshape(num_frames, self.FRAME_SIZE)
+        batch = np.empty((num_frames, self.CONTEXT_SIZE + self.FRAME_SIZE), dtype=np.float32)
+        batch[:, self.CONTEXT_SIZE:] = frames
+        batch[0, :self.CONTEXT_SIZE] = self._context
+        batch[1:, :self.CONTEXT_SIZE] = frames[:-1, -self.CONTEXT_SIZE:]
+        self._context = frames[-1, -self.CONTEXT_SIZE:].copy()
+
+        probabilities, self._h, self._c = self.session.run(
+            None, {"input": batch, "h": self._h, "c": self._c}
+        )
+        return probabilities.reshape(-1)
+
+    def speech_probability(self, chunk: np.ndarray) -> float:
+        probabilities = self.frame_probabilities(chunk)
+        if len(probabilities):
+            self.last_probability = float(probabilities.max())
+        return self.last_probability
+
+
+class SpeechGate:
+    """Per-chunk gate: the VAD decision plus a hangover of trailing chunks.
+
+    Used by the capture loop and by the streaming server, so gated stretches
+    look the same to the transcriber whichever way the audio arrives.
+    """
+
+    def __init__(self, vad: Optional[VoiceActivityDetector], hangover_chunks: int = 0):
+        self.vad = vad
+        self.hangover_chunks = hangover_chunks
+        self._hangover = 0
+
+    def admit(self, chunk: np.ndarray, level: Optional[float] = None) -> bool:
+        """Whether ``chunk`` should reach the transcriber (always True without a VAD)."""
+        if self.vad is None:
+            return True
+        if self.vad.is_speech(chunk, level):
+            self._hangover = self.hangover_chunks
+            return True
+        if self._hangover > 0:
+            self._hangover -= 1
+            return True
+        return False
+
+    def reset(self):
+        """Forget stream state (e.g. after a device switch)."""
+        self._hangover = 0
+        if self.vad is not None:
+            self.vad.reset()
+
+
+def create_speech_gate() -> SpeechGate:
+    """SpeechGate over the VAD selected by Config."""
+    return SpeechGate(create_vad(), Config.VAD_HANGOVER_CHUNKS)
+
+
+def create_vad() -> Optional[VoiceActivityDetector]:
+    """Build the VAD stage selected by Config (None when VAD is disabled).
+
+    Falls back to the energy gate if the neural model cannot be loaded.
+    """
+    if not Config.ENABLE_VAD:
+        return None
+    if Config.VAD_BACKEND == "silero":
+        try:
+            vad = SileroVAD(
+                model_path=Config.VAD_MODEL_PATH,
+                threshold=Config.VAD_SPEECH_THRESHOLD,
+                sample_rate=Config.SAMPLE_RATE
+            )
+            logger.info("Using Silero VAD (onnxruntime)")
+            return vad
+        except Exception as e:
+            logger.warning(f"Silero VAD unavailable ({e}), falling back to energy VAD")
+    return EnergyVAD(Config.VAD_THRESHOLD)
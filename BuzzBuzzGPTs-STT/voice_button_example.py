@@ -1,9 +1,8 @@
-import queue
 import threading
 from audio_capture import AudioCapture
+from audio_ring import create_audio_ring
 from transcriber import WhisperTranscriber
 from utils import apply_patches
-from config import Config
 
 class VoiceTranscriptionManager:
     """
@@ -36,7 +35,7 @@ class VoiceTranscriptionManager:
                 return
             
             print("[VoiceManager] Starting session...")
-            self.audio_queue = queue.Queue(maxsize=Config.MAX_QUEUE_SIZE)
+            self.audio_queue = create_audio_ring()
             
             # Initialize components
             self.capture = AudioCapture(self.audio_queue)
@@ -0,0 +1,470 @@
+"""
+Out-of-process transcription backend.
+Runs WhisperTranscriber in worker processes fed through shared-memory audio
+rings, so model inference never competes with capture or the UI for the GIL.
+"""
+
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from config import Config
+from logger_config import get_logger
+from typing import Callable, Dict, Optional
+
+logger = get_logger(__name__)
+
+_HEADER_BYTES = 16  # uint64 write position, uint64 read position (monotonic sample counts)
+_POLL_INTERVAL = 0.01
+
+
+class SharedAudioRing:
+    """Single-producer/single-consumer float32 ring in shared memory.
+
+    The producer (parent process) and consumer (worker process) each see the
+    ring through a queue-like adapter, so AudioCapture and WhisperTranscriber
+    use it exactly like their usual ``queue.Queue``. Positions are monotonic
+    sample counters; the producer publishes the write position only after the
+    samples are in place.
+    """
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        """
+        Create (name=None) or attach to (name given) a shared ring.
+
+        Args:
+            capacity: Ring size in samples
+            name: Existing shared-memory block to attach to
+        """
+        self.capacity = int(capacity)
+        self._owner = name is None
+        size = _HEADER_BYTES + 4 * self.capacity
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Spawned workers share the parent's resource tracker, so attaching
+            # does not take ownership; only the creator unlinks the block
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._positions = np.ndarray((2,), dtype=np.uint64, buffer=self.shm.buf[:_HEADER_BYTES])
+        self._data = np.ndarray((self.capacity,), dtype=np.float32, buffer=self.shm.buf[_HEADER_BYTES:size])
+        if self._owner:
+            self._positions[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def available(self) -> int:
+        """Samples written but not yet read."""
+        return int(self._positions[0] - self._positions[1])
+
+    def write(self, samples: np.ndarray) -> bool:
+        """Write all samples, or nothing if there is not enough free space."""
+        n = len(samples)
+        write_pos = int(self._positions[0])
+        if n > self.capacity - (write_pos - int(self._positions[1])):
+            return False
+        start = write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self._positions[0] = write_pos + n  # Publish after the data is in place
+        return True
+
+    def read(self, max_samples: Optional[int] = None) -> np.ndarray:
+        """Read (and consume) up to ``max_samples`` available samples as a new array."""
+        read_pos = int(self._positions[1])
+        n = int(self._positions[0]) - read_pos
+        if max_samples is not None:
+            n = min(n, max_samples)
+        if n <= 0:
+            return np.zeros(0, dtype=np.float32)
+        start = read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self._data[start:start + first]
+        if first < n:
+            out[first:] = self._data[:n - first]
+        self._positions[1] = read_pos + n
+        return out
+
+    def close(self):
+        """Detach; the creating side also frees the block."""
+        self._positions = None
+        self._data = None
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class RingWriterQueue:
+    """Producer side of a SharedAudioRing with the queue.Queue methods AudioCapture uses."""
+
+    copies_items = True  # put() copies into shared memory
+
+    def __init__(self, ring: SharedAudioRing):
+        self.ring = ring
+
+    def put(self, chunk: np.ndarray, block: bool = True, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.ring.write(chunk):
+            if not block or (deadline is not None and time.time() >= deadline):
+                raise queue.Full
+            time.sleep(_POLL_INTERVAL)
+
+    def put_nowait(self, chunk: np.ndarray):
+        self.put(chunk, block=False)
+
+    def qsize(self) -> int:
+        return -(-self.ring.available() // Config.BUFFER_SIZE)  # In chunks, rounded up
+
+    def empty(self) -> bool:
+        return self.ring.available() == 0
+
+    def full(self) -> bool:
+        return self.ring.capacity - self.ring.available() < Config.BUFFER_SIZE
+
+
+class RingReaderQueue:
+    """Consumer side of a SharedAudioRing with the queue.Queue methods WhisperTranscriber uses."""
+
+    def __init__(self, ring: SharedAudioRing):
+        self.ring = ring
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> np.ndarray:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            chunk = self.ring.read()
+            if len(chunk):
+                return chunk
+            if not block or (deadline is not None and time.time() >= deadline):
+                raise queue.Empty
+            time.sleep(_POLL_INTERVAL)
+
+    def get_nowait(self) -> np.ndarray:
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        return -(-self.ring.available() // Config.BUFFER_SIZE)
+
+    def empty(self) -> bool:
+        return self.ring.available() == 0
+
+
+def _worker_main(conn):
+    """Worker process entry point: hosts one WhisperTranscriber per attached stream."""
+    from logger_config import setup_logging
+    from transcriber import WhisperTranscriber
+    
+    # Console only: the parent owns the rotating log files. main.py skips its
+    # own setup_logging when re-imported here as __mp_main__ under spawn.
+    setup_logging(log_level=Config.LOG_LEVEL, console=Config.ENABLE_CONSOLE_LOGGING, file_logging=False)
+
+    send_lock = threading.Lock()
+    streams_lock = threading.Lock()
+    streams = {}
+    shutting_down = threading.Event()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    def make_callback(stream_id):
+        def callback(text, latency, timestamp, is_final=False):
+            send(("text", stream_id, text, latency, timestamp, is_final))
+        return callback
+
+    def open_stream(stream_id, transcriber):
+        # Runs on its own thread so a slow load never blocks the command loop
+        load_start = time.time()
+        ok = transcriber.load_model()
+        load_seconds = time.time() - load_start
+        warmup_seconds = 0.0
+        if ok and Config.ENABLE_WARMUP:
+            warmup_seconds = transcriber.warm_up()
+        with streams_lock:
+            # The stream may have been closed while it was loading
+            attached = streams.get(stream_id, (None, None))[0] is transcriber
+            if ok and attached and not shutting_down.is_set():
+                ok = transcriber.start()
+            elif ok:
+                transcriber.release_model()
+                ok = False
+        send(("ready", stream_id, ok, load_seconds, warmup_seconds))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break  # Parent went away
+        command = message[0]
+
+        if command == "open":
+            _, stream_id, shm_name, capacity = message
+            ring = SharedAudioRing(capacity, name=shm_name)
+            transcriber = WhisperTranscriber(RingReaderQueue(ring), make_callback(stream_id))
+            with streams_lock:
+                streams[stream_id] = (transcriber, ring)
+            threading.Thread(
+                target=open_stream, args=(stream_id, transcriber), name=f"stt-open-{stream_id}", daemon=True
+            ).start()
+
+        elif command == "close":
+            _, stream_id = message
+            with streams_lock:
+                transcriber, ring = streams.pop(stream_id, (None, None))
+            if transcriber:
+                transcriber.stop()
+                ring.close()
+
+        elif command == "status":
+            with streams_lock:
+                attached = list(streams.items())
+            for stream_id, (transcriber, _) in attached:
+                send(("status", stream_id, {
+                    "error_count": transcriber.error_count,
+                    **transcriber.scheduler.get_status()
+                }))
+
+        elif command == "shutdown":
+            break
+
+    shutting_down.set()
+    with streams_lock:
+        attached = list(streams.values())
+        streams.clear()
+    for transcriber, ring in attached:
+        transcriber.stop()
+        ring.close()
+
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, index: int, context):
+        self.index = index
+        parent_conn, child_conn = context.Pipe()
+        self.conn = parent_conn
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), name=f"stt-worker-{index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.streams: Dict[str, "RemoteTranscriber"] = {}
+        self.send_lock = threading.Lock()
+        self.receiver: Optional[threading.Thread] = None
+
+    def send(self, message) -> bool:
+        with self.send_lock:
+            try:
+                self.conn.send(message)
+                return True
+            except (BrokenPipeError, EOFError, OSError):
+                return False
+
+
+class TranscriptionWorkerPool:
+    """Pool of transcription worker processes serving several streams.
+
+    Streams are placed on the worker with the fewest streams. If a worker
+    crashes, its streams report the error, the worker is respawned and the
+    streams are re-opened on it; the shared rings live in the parent, so
+    capture keeps writing and buffered audio is not lost.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, restart_on_crash: bool = True):
+        self.num_workers = num_workers or Config.WORKER_PROCESSES
+        self.restart_on_crash = restart_on_crash
+        self.crash_count = 0
+        self._context = mp.get_context("spawn")  # Fork is unsafe with inference thread pools
+        self._workers = []
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        """Spawn the worker processes."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for index in range(self.num_workers):
+                self._workers.append(self._spawn(index))
+        logger.info(f"Started {self.num_workers} transcription worker process(es)")
+
+    def stop(self):
+        """Shut down all workers."""
+        with self._lock:
+            self._running = False
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.send(("shutdown",))
+            worker.process.join(timeout=5.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+        logger.info("Transcription worker pool stopped")
+
+    def attach(self, stream: "RemoteTranscriber"):
+        """Open a stream on the least loaded worker."""
+        if not self._running:
+            self.start()
+        with self._lock:
+            worker = min(self._workers, key=lambda w: len(w.streams))
+            worker.streams[stream.stream_id] = stream
+        stream.worker_index = worker.index
+        worker.send(("open", stream.stream_id, stream.ring.name, stream.ring.capacity))
+
+    def detach(self, stream: "RemoteTranscriber"):
+        """Close a stream on its worker."""
+        with self._lock:
+            for worker in self._workers:
+                if worker.streams.pop(stream.stream_id, None) is not None:
+                    worker.send(("close", stream.stream_id))
+
+    def request_status(self):
+        """Ask every worker to report per-stream status (delivered asynchronously)."""
+        for worker in list(self._workers):
+            worker.send(("status",))
+
+    def _spawn(self, index: int) -> _Worker:
+        worker = _Worker(index, self._context)
+        worker.receiver = threading.Thread(target=self._receive_loop, args=(worker,), daemon=True)
+        worker.receiver.start()
+        return worker
+
+    def _receive_loop(self, worker: _Worker):
+        """Dispatch worker messages to streams; detect crashes."""
+        while True:
+            try:
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            stream = worker.streams.get(message[1])
+            if stream is not None:
+                stream._on_message(message)
+
+        if self._running:
+            self._handle_crash(worker)
+
+    def _handle_crash(self, worker: _Worker):
+        worker.process.join(timeout=1.0)
+        exit_code = worker.process.exitcode
+        self.crash_count += 1
+        logger.error(f"Transcription worker {worker.index} died (exit code {exit_code})")
+        for stream in worker.streams.values():
+            stream._on_worker_crash(exit_code, restarting=self.restart_on_crash)
+
+        if not self.restart_on_crash:
+            return
+        with self._lock:
+            if not self._running or worker not in self._workers:
+                return
+            replacement = self._spawn(worker.index)
+            replacement.streams = worker.streams
+            self._workers[self._workers.index(worker)] = replacement
+        for stream in replacement.streams.values():
+            logger.info(f"Re-opening stream {stream.stream_id} on restarted worker {worker.index}")
+            replacement.send(("open", stream.stream_id, stream.ring.name, stream.ring.capacity))
+
+
+_default_pool: Optional[TranscriptionWorkerPool] = None
+_stream_ids = itertools.count(1)
+
+
+def get_default_pool() -> TranscriptionWorkerPool:
+    """Process-wide worker pool (created on first use)."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = TranscriptionWorkerPool()
+    return _default_pool
+
+
+class RemoteTranscriber:
+    """Drop-in stand-in for WhisperTranscriber that transcribes in a worker process.
+
+    Hand ``audio_queue`` (a shared-memory ring writer) to AudioCapture; results
+    arrive on ``text_callback`` from the pool's receiver thread.
+    """
+
+    def __init__(self, text_callback: Callable, pool: Optional[TranscriptionWorkerPool] = None,
+                 ring_seconds: Optional[float] = None):
+        ring_seconds = ring_seconds or Config.WORKER_RING_SECONDS
+        self.text_callback = text_callback
+        self.pool = pool or get_default_pool()
+        self.stream_id = f"stream-{next(_stream_ids)}"
+        self.ring = SharedAudioRing(int(Config.SAMPLE_RATE * ring_seconds))
+        self.audio_queue = RingWriterQueue(self.ring)
+        self.worker_index: Optional[int] = None
+        self.is_running = False
+        self.error_count = 0
+        self.last_error: Optional[Exception] = None
+        self.remote_status: dict = {}
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self._attached = False
+        self._ready = threading.Event()
+        self._load_ok = False
+
+    def load_model(self, max_retries: Optional[int] = None) -> bool:
+        """Open the stream on a worker and wait until its model is loaded."""
+        if not self._attached:
+            self._attached = True
+            self.pool.attach(self)
+        self._ready.wait()
+        return self._load_ok
+
+    def warm_up(self) -> float:
+        """Workers warm up as part of loading; report how long it took."""
+        return self.warmup_seconds
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout) and self._load_ok
+
+    def start(self) -> bool:
+        self.is_running = self.load_model()
+        return self.is_running
+
+    def stop(self):
+        if not self._attached:
+            return
+        self.is_running = False
+        self._attached = False
+        self.pool.detach(self)
+        self.ring.close()
+
+    def get_average_latency(self):
+        return self.remote_status.get("average_decode_time", 0.0)
+
+    def _on_message(self, message):
+        kind = message[0]
+        if kind == "text":
+            _, _, text, latency, timestamp, is_final = message
+            try:
+                self.text_callback(text, latency, timestamp, is_final=is_final)
+            except Exception as e:
+                logger.error(f"Text callback failed: {e}")
+        elif kind == "ready":
+            _, _, ok, self.load_seconds, self.warmup_seconds = message
+            self._load_ok = ok
+            self._ready.set()
+        elif kind == "status":
+            self.remote_status = message[2]
+
+    def _on_worker_crash(self, exit_code, restarting: bool):
+        self.error_count += 1
+        self.last_error = RuntimeError(f"Transcription worker exited with code {exit_code}")
+        if not restarting:
+            # Nothing will re-open this stream; release anyone waiting on the load
+            self._load_ok = False
+            self.is_running = False
+            self._ready.set()